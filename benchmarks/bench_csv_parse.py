@@ -0,0 +1,131 @@
+"""CSV parse throughput: string-then-convert loading vs the shared hxl_csv reader.
+
+Writes a synthetic HNO-shaped CSV (header, HXL tag row, N data rows) and
+times four ways of getting typed numbers out of it:
+
+    str+drop   pd.read_csv(dtype=str), drop the HXL row by index, to_numeric
+               (the old fix_country_summary.py)
+    sniff      pd.read_csv, detect HXL via iloc[0].str.startswith('#'),
+               drop it, to_numeric per column (the forecasting notebook)
+    hxl_csv    hxl_csv.read_csv: HXL skipped at parse time, declared schema
+    stream     hxl_csv.iter_csv: the same, in record batches (hno_ingest)
+
+    python benchmarks/bench_csv_parse.py --rows 100000 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import hxl_csv  # noqa: E402
+
+COLUMNS = ['Country ISO3', 'Admin 1 PCode', 'Admin 1 Name', 'Admin 2 PCode', 'Admin 2 Name',
+           'Cluster', 'Category', 'Population', 'In Need', 'Targeted', 'Affected', 'Reached']
+HXL = ['#country+code', '#adm1+code', '#adm1+name', '#adm2+code', '#adm2+name',
+       '#sector+cluster+code', '#category+name', '#population+total', '#inneed', '#targeted',
+       '#affected', '#reached']
+NUMERIC = ['Population', 'In Need', 'Targeted', 'Affected', 'Reached']
+SCHEMA = hxl_csv.SCHEMAS['hpc_hno_2025.csv']
+
+
+def synthesise(path, n, seed=0):
+    rng = np.random.default_rng(seed)
+    iso = rng.choice(['AFG', 'SDN', 'YEM', 'COD', 'SOM', 'UKR', 'HTI', 'MMR'], n)
+    adm1 = rng.integers(0, 30, n)
+    df = pd.DataFrame({
+        'Country ISO3':  iso,
+        'Admin 1 PCode': np.char.add(iso.astype(str), np.char.mod('%02d', adm1)),
+        'Admin 1 Name':  np.char.mod('Province %d', adm1),
+        'Admin 2 PCode': np.char.mod('P2%06d', rng.integers(0, 10**6, n)),
+        'Admin 2 Name':  np.char.mod('District %d', rng.integers(0, 500, n)),
+        'Cluster':       rng.choice(['ALL', 'PRO', 'FSC', 'HEA', 'WSH', 'EDU', 'SHL', 'NUT'], n),
+        'Category':      np.where(rng.random(n) < 0.6, '', rng.choice(['Girls', 'Boys', 'IDPs'], n)),
+        'Population':    rng.integers(1_000, 2_000_000, n),
+        'In Need':       rng.integers(0, 900_000, n),
+        'Targeted':      rng.integers(0, 500_000, n),
+        'Affected':      np.where(rng.random(n) < 0.5, np.nan, rng.integers(0, 900_000, n)),
+        'Reached':       np.where(rng.random(n) < 0.7, np.nan, rng.integers(0, 400_000, n)),
+    })
+    with open(path, 'w', encoding='utf-8', newline='') as fh:
+        fh.write(','.join(COLUMNS) + '\n' + ','.join(HXL) + '\n')
+        df.to_csv(fh, header=False, index=False)
+
+
+def load_str_drop(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False).drop(index=0).reset_index(drop=True)
+    for c in NUMERIC:
+        df[c] = pd.to_numeric(df[c], errors='coerce')
+    return df
+
+
+def load_sniff(path):
+    with warnings.catch_warnings():
+        # The HXL row makes every numeric column mixed-type — that's the point
+        warnings.simplefilter('ignore', pd.errors.DtypeWarning)
+        df = pd.read_csv(path)
+    if df.iloc[0].astype(str).str.startswith('#').any():
+        df = df.drop(0).reset_index(drop=True)
+    for c in df.columns:
+        try:
+            df[c] = pd.to_numeric(df[c])
+        except (ValueError, TypeError):
+            pass
+    return df
+
+
+def load_hxl_csv(path):
+    return hxl_csv.read_csv(path, SCHEMA)
+
+
+def load_stream(path):
+    n = 0
+    for chunk in hxl_csv.iter_csv(path, SCHEMA):
+        n += len(chunk)
+    return n
+
+
+def _time(fn, path, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(path)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    loaders = [('str+drop', load_str_drop), ('sniff', load_sniff),
+               ('hxl_csv', load_hxl_csv), ('stream', load_stream)]
+    if hxl_csv.pa is None:
+        print('pyarrow not installed: hxl_csv / stream time the pandas fallback')
+
+    print(f"{'rows':>9}  {'MB':>6}  " + '  '.join(f'{name + " MB/s":>14}' for name, _ in loaders)
+          + '  types match')
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in args.rows:
+            path = os.path.join(tmp, 'hpc_hno_bench.csv')
+            synthesise(path, n)
+            mb = os.path.getsize(path) / 1e6
+            rates = [mb / _time(fn, path, args.repeats) for _, fn in loaders]
+
+            old, new = load_str_drop(path), load_hxl_csv(path)
+            same = all(np.allclose(old[c].to_numpy(float), new[c].to_numpy(float), equal_nan=True)
+                       for c in NUMERIC) and len(old) == len(new) == n
+            print(f'{n:>9}  {mb:>6.1f}  ' + '  '.join(f'{r:>14.1f}' for r in rates) + f'  {same}')
+
+
+if __name__ == '__main__':
+    main()
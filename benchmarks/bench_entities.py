@@ -0,0 +1,112 @@
+"""Globe entity building: row-wise iterrows loop vs the vectorised pipeline.
+
+Synthesises summary / metrics / coordinate tables with N admin units (about a
+quarter without a metrics row, to exercise the quartile and mismatch
+fallbacks) and times health_regions.build_entities against the previous
+iterrows implementation.
+
+    python benchmarks/bench_entities.py --sizes 22 1000 5000 20000
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from health_regions import build_entities, _SEVERITY_NUM  # noqa: E402
+
+
+def synthesise(n, seed=0):
+    rng = np.random.default_rng(seed)
+    codes = np.char.mod('U%05d', np.arange(n))
+    in_need = rng.integers(20_000, 30_000_000, n)
+    summary = pd.DataFrame({
+        'Country ISO3':   codes,
+        'In Need':        in_need,
+        'Targeted':       np.where(rng.random(n) < 0.05, np.nan, in_need * rng.uniform(0.2, 1.0, n)),
+        'Severity_Score': rng.gamma(1.5, 0.8, n),
+    })
+    has_metrics = rng.random(n) < 0.75
+    metrics = pd.DataFrame({
+        'Country ISO3':      codes[has_metrics],
+        'Severity Quartile': rng.choice(['Critical', 'High', 'Medium', 'Low'], has_metrics.sum()),
+        'Mismatch Score':    rng.uniform(-0.3, 0.7, has_metrics.sum()),
+    })
+    coords = pd.DataFrame({
+        'Country ISO3': codes,
+        'lat':  rng.uniform(-40, 60, n).round(3),
+        'lon':  rng.uniform(-120, 140, n).round(3),
+        'name': np.char.mod('Admin unit %d', np.arange(n)),
+    })
+    return summary, metrics, coords
+
+
+def legacy_entities(summary, metrics, coords):
+    """The previous implementation, generalised to a coordinate table."""
+    coord_map = {r[0]: (r[1], r[2], r[3]) for r in coords.itertuples(index=False)}
+    df = summary.merge(metrics[['Country ISO3', 'Severity Quartile', 'Mismatch Score']],
+                       on='Country ISO3', how='left')
+
+    def quartile_of(score):
+        return 'Critical' if score >= 2.0 else 'High' if score >= 0.8 else 'Medium' if score >= 0.3 else 'Low'
+
+    def fmt(n):
+        return f"{n / 1e6:.1f}M" if n >= 1e6 else f"{n / 1e3:.0f}K"
+
+    rows = []
+    for _, row in df.iterrows():
+        iso3 = row['Country ISO3']
+        if iso3 not in coord_map:
+            continue
+        lat, lon, name = coord_map[iso3]
+        quartile = row.get('Severity Quartile')
+        if not isinstance(quartile, str) or pd.isna(quartile):
+            quartile = quartile_of(float(row['Severity_Score']))
+        sev = _SEVERITY_NUM.get(quartile, 3)
+        in_need = float(row['In Need'])
+        targeted = float(row['Targeted']) if pd.notna(row['Targeted']) else 0.0
+        fund = round(targeted / in_need * 100, 1) if in_need > 0 else 0.0
+        mismatch = row.get('Mismatch Score')
+        hvi = (round(min(float(row['Severity_Score']) / 4.0, 1.0), 2) if pd.isna(mismatch)
+               else round(float(mismatch), 2))
+        rows.append({'name': name, 'iso3': iso3, 'severity': sev, 'sev_label': quartile,
+                     'lat': lat, 'lon': lon, 'hvi': hvi, 'fund': fund,
+                     'in_need': fmt(in_need), 'projects': fmt(in_need)})
+    out = pd.DataFrame(rows)
+    out['_sort'] = out['severity'].map({5: 0, 4: 1, 3: 2, 2: 3})
+    return out.sort_values(['_sort', 'name']).drop(columns='_sort').reset_index(drop=True)
+
+
+def _median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e3)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[22, 1000, 5000, 20000])
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'units':>7}  {'iterrows ms':>12}  {'vectorised ms':>14}  {'speed-up':>9}  match")
+    for n in args.sizes:
+        summary, metrics, coords = synthesise(n)
+        new = build_entities(summary, metrics, coords)
+        old = legacy_entities(summary, metrics, coords)
+        same = old.astype(str).equals(new.astype(str))
+        legacy_ms = _median_ms(lambda: legacy_entities(summary, metrics, coords), args.repeats)
+        vector_ms = _median_ms(lambda: build_entities(summary, metrics, coords), args.repeats)
+        print(f"{n:>7}  {legacy_ms:>12.1f}  {vector_ms:>14.2f}  {legacy_ms / vector_ms:>8.0f}×  {same}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Feature engineering: per-group lambdas (the notebook) vs native grouped kernels.
+
+Takes the merged HRP + summary frame and replicates it ×1, ×10 and ×100. Each
+copy gets its own ISO3 keys, standing in for appeal-level history where every
+appeal is its own series. Times two versions:
+
+    lambda     groupby().transform(lambda x: x.ffill().bfill()) and a per-group
+               rolling lambda (models/ML_Forecasting.ipynb)
+    grouped    forecast_features.add_features on a string iso3
+    category   the same on an already-categorical iso3 (no conversion)
+
+and checks that every feature column matches the lambda output.
+
+    python benchmarks/bench_features.py --scales 1 10 100
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import forecast_data  # noqa: E402
+import forecast_features  # noqa: E402
+from forecast_features import FILL_STRATEGIES, FILLED  # noqa: E402
+
+CHECKED = FILLED + list(FILL_STRATEGIES)
+
+
+def lambda_features(df):
+    """The notebook's feature cell, unchanged apart from the column-existence checks."""
+    df = df.sort_values(['iso3', 'year']).reset_index(drop=True)
+    for col in FILLED:
+        df[col] = pd.to_numeric(df[col], errors='coerce').replace(0, np.nan)
+        df[col] = df.groupby('iso3')[col].transform(lambda x: x.ffill().bfill())
+    df['Dependency Ratio'] = df['In Need'] / df['Total_Population']
+    df['In_Need_Pct_Change'] = df.groupby('iso3')['In Need'].pct_change(fill_method=None)
+    df['Population Velocity'] = df.groupby('iso3')['In_Need_Pct_Change'].transform(
+        lambda x: x.rolling(window=3, min_periods=1).mean())
+    df = df.drop(columns=['In_Need_Pct_Change'])
+    df['Lagged Requirements'] = df.groupby('iso3')['revisedRequirements'].shift(1)
+    df['Cost per Beneficiary'] = (df['revisedRequirements'] / df['Targeted']).replace([np.inf, -np.inf], np.nan)
+    df['Cost Inflation'] = df.groupby('iso3')['Cost per Beneficiary'].pct_change(fill_method=None)
+    for col, strategy in FILL_STRATEGIES.items():
+        df[col] = df[col].fillna(df[col].median() if strategy == 'median' else strategy)
+    return df
+
+
+def replicate(df, k):
+    if k == 1:
+        return df
+    return pd.concat([df.assign(iso3=df['iso3'] + f'#{i}') for i in range(k)], ignore_index=True)
+
+
+def _keys(df):
+    return df['iso3'].astype(object).fillna('')
+
+
+def _time(fn, df, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn(df)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    base = forecast_data.load_merged()
+    print(f"{'scale':>6}  {'rows':>7}  {'groups':>7}  {'lambda s':>9}  {'grouped s':>9}  "
+          f"{'category s':>10}  {'speed-up':>8}  match")
+    for k in args.scales:
+        df = replicate(base, k)
+        cat = df.assign(iso3=df['iso3'].astype('category'))
+        t_lambda = _time(lambda_features, df, args.repeats)
+        t_grouped = _time(forecast_features.add_features, df, args.repeats)
+        t_cat = _time(forecast_features.add_features, cat, args.repeats)
+
+        ref, new = lambda_features(df), forecast_features.add_features(cat)
+        same = all(np.allclose(ref[c].to_numpy(float), new[c].to_numpy(float), rtol=1e-12, equal_nan=True)
+                   for c in CHECKED) and _keys(ref).equals(_keys(new))
+        print(f'{k:>5}×  {len(df):>7}  {df["iso3"].nunique():>7}  {t_lambda:>9.3f}  {t_grouped:>9.3f}  '
+              f'{t_cat:>10.3f}  {t_lambda / t_grouped:>7.1f}×  {same}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Funding engines: fit time and backtest error, Prophet vs the batch engines.
+
+Speed: fits every country's funding series with each engine. The batch
+engines are also timed on the series replicated ×10 and ×100, standing in
+for sub-national or multi-scenario runs. Prophet is only timed at ×1.
+
+Backtest: rolling origin. For each origin year the engines see the history up
+to that year (same ≥ 3-point rule as the pipeline) and forecast the next
+`--horizon` years. The errors are scored against the recorded
+revisedRequirements:
+
+    MAE $M     mean absolute error
+    MdAPE %    median absolute percentage error
+    bias %     median signed percentage error (+ = over-forecast)
+
+    python benchmarks/bench_funding_engines.py
+    python benchmarks/bench_funding_engines.py --origins 2014 2016 2018 2020 2022 --workers 4
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import forecast_data  # noqa: E402
+from funding_forecast import ENGINES, WORKERS, forecast_funding  # noqa: E402
+
+
+def replicate(history, k):
+    """`history` with every country copied k times under distinct keys."""
+    return pd.concat([history.assign(iso3=history['iso3'] + f'#{i}') for i in range(k)],
+                     ignore_index=True)
+
+
+def fit_time(history, engine, workers, repeats=1):
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        forecast_funding(history, engine=engine, workers=workers)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def backtest(df, engine, origins, horizon, workers):
+    """Long (origin, iso3, year, predicted, actual) frame over every origin."""
+    actual = forecast_data.funding_history(df, min_points=1)
+    rows = []
+    for origin in origins:
+        history = forecast_data.funding_history(df, train_end=origin)
+        years = list(range(origin + 1, origin + 1 + horizon))
+        pred, _ = forecast_funding(history, years, engine=engine, workers=workers)
+        rows.append(pred.assign(origin=origin))
+    out = pd.concat(rows, ignore_index=True).merge(actual, on=['iso3', 'year'], how='inner')
+    return out.rename(columns={'Predicted_Funding': 'predicted', 'revisedRequirements': 'actual'})
+
+
+def score(bt):
+    err = bt['predicted'] - bt['actual']
+    pct = err / bt['actual'].abs()
+    return {
+        'MAE $M':  err.abs().mean() / 1e6,
+        'MdAPE %': pct.abs().median() * 100,
+        'bias %':  pct.median() * 100,
+        'points':  len(bt),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--engines', nargs='+', default=ENGINES, choices=ENGINES)
+    parser.add_argument('--origins', type=int, nargs='+', default=[2016, 2018, 2020, 2022])
+    parser.add_argument('--horizon', type=int, default=3, help='years forecast past each origin')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Prophet worker processes')
+    parser.add_argument('--repeats', type=int, default=3, help='timing repeats for the batch engines')
+    args = parser.parse_args()
+
+    df = forecast_data.load_features()
+    history = forecast_data.funding_history(df)
+    n = history['iso3'].nunique()
+
+    print(f'fit time, {n} countries × scale ({args.workers} Prophet workers)')
+    print(f"{'engine':>8}  " + '  '.join(f'{f"×{k} s":>10}' for k in args.scales))
+    for engine in args.engines:
+        cells = []
+        for k in args.scales:
+            if engine == 'prophet' and k > 1:
+                cells.append(f'{"—":>10}')
+                continue
+            t = fit_time(replicate(history, k) if k > 1 else history, engine, args.workers,
+                         1 if engine == 'prophet' else args.repeats)
+            cells.append(f'{t:>10.3f}')
+        print(f'{engine:>8}  ' + '  '.join(cells))
+
+    print(f'\nbacktest, origins {args.origins}, {args.horizon}-year horizon')
+    print(f"{'engine':>8}  {'MAE $M':>9}  {'MdAPE %':>8}  {'bias %':>7}  {'points':>6}  {'seconds':>7}")
+    for engine in args.engines:
+        t0 = time.perf_counter()
+        s = score(backtest(df, engine, args.origins, args.horizon, args.workers))
+        print(f"{engine:>8}  {s['MAE $M']:>9.1f}  {s['MdAPE %']:>8.1f}  {s['bias %']:>7.1f}  "
+              f"{s['points']:>6}  {time.perf_counter() - t0:>7.2f}")
+
+
+if __name__ == '__main__':
+    main()
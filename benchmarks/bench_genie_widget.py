@@ -0,0 +1,96 @@
+"""Rerun cost of the Genie chat widget against conversation length.
+
+Compares the old protocol (rebuild the whole history HTML and re-inject CSS,
+markup and history on every rerun) with the delta protocol in
+src/genie_widget.py, where a steady-state rerun ships only the new user
+message and its pending bubble. Reports the median Python-side build time and
+the payload size handed to components.html.
+
+    python benchmarks/bench_genie_widget.py --lengths 10 50 100 250 500 1000
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import genie_widget  # noqa: E402
+
+_TABLE = (
+    '<div class="genie-tbl-wrap"><table class="genie-tbl"><thead><tr>'
+    '<th>country</th><th>mismatch_score</th><th>in_need</th></tr></thead><tbody>'
+    + ''.join(f'<tr><td>Country {i}</td><td>{0.9 - i / 100:.3f}</td><td>{1_000_000 + i}</td></tr>'
+              for i in range(10))
+    + '</tbody></table></div>'
+)
+
+
+def make_history(n):
+    history = []
+    for i in range(n):
+        if i % 2 == 0:
+            history.append({"id": f"m{i}", "role": "user", "html": f"Question {i} about funding gaps?", "err": False})
+        else:
+            history.append({"id": f"m{i}", "role": "bot", "html": f"Answer {i}.<br>{_TABLE}", "err": False})
+    return history
+
+
+def legacy_payload(history):
+    """The pre-delta render: full history HTML plus every asset, JSON-encoded."""
+    history_html = ""
+    for msg in history:
+        history_html += genie_widget.render_message(msg)
+    return (json.dumps(genie_widget.GENIE_CSS) + json.dumps(genie_widget.GENIE_HTML)
+            + genie_widget.GENIE_JS + json.dumps(history_html))
+
+
+def _median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1e3)
+    return statistics.median(times)
+
+
+def bench(n, repeats):
+    history = make_history(n)
+    legacy_ms = _median_ms(lambda: legacy_payload(history), repeats)
+    legacy_bytes = len(legacy_payload(history))
+
+    # Steady state: the browser already has n messages; the rerun adds a
+    # user message and a pending bot bubble.
+    def delta_rerun():
+        state = {"genie_history": list(history), "genie_widget_revs": dict(revs)}
+        state["genie_history"] += [
+            {"id": "new-u", "role": "user", "html": "Follow-up?", "err": False},
+            {"id": "new-b", "role": "bot", "html": "", "err": False, "pending": True},
+        ]
+        t0 = time.perf_counter()
+        out = genie_widget.widget_script(state)
+        return (time.perf_counter() - t0) * 1e3, len(out)
+
+    revs = {}
+    genie_widget.build_delta(history, revs)
+    runs = [delta_rerun() for _ in range(repeats)]
+    delta_ms = statistics.median(r[0] for r in runs)
+    return legacy_ms, legacy_bytes, delta_ms, runs[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lengths', type=int, nargs='+', default=[10, 50, 100, 250, 500, 1000])
+    parser.add_argument('--repeats', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'messages':>9}  {'full ms':>9}  {'full KB':>9}  {'delta ms':>9}  {'delta KB':>9}")
+    for n in args.lengths:
+        legacy_ms, legacy_bytes, delta_ms, delta_bytes = bench(n, args.repeats)
+        print(f"{n:>9}  {legacy_ms:>9.3f}  {legacy_bytes / 1024:>9.1f}  {delta_ms:>9.3f}  {delta_bytes / 1024:>9.1f}")
+
+
+if __name__ == '__main__':
+    main()
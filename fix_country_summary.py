@@ -1,42 +1,22 @@
-import pandas as pd
-import numpy as np
+"""Recompute In Need / Targeted in country_level_summary (1).csv from the HNO.
 
-hpc_path = "data/hpc_hno_2025.csv"
-summary_path = "data/country_level_summary (1).csv"
+Kept for existing workflows; the work is done by src/hno_ingest.py, which in
+the same pass also refreshes the admin-1 summary and sector benchmarking
+tables and writes data/hno_ingest_manifest.json.
+"""
+import os
+import sys
 
-# Skip the HXL tag row (row index 1) by reading and dropping it
-hpc_raw = pd.read_csv(hpc_path, dtype=str, keep_default_na=False)
-hpc_raw = hpc_raw.drop(index=0).reset_index(drop=True)  # drop HXL row
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
 
-# Normalise column names
-hpc_raw.columns = hpc_raw.columns.str.strip()
+import hno_ingest  # noqa: E402
+import hxl_csv  # noqa: E402
 
-# Filter: Cluster == "ALL" and Category is blank/NaN
-mask = (hpc_raw["Cluster"] == "ALL") & (hpc_raw["Category"].str.strip() == "")
-filtered = hpc_raw[mask].copy()
+manifest = hno_ingest.ingest()
 
-# Keep first occurrence per country
-first_per_country = filtered.drop_duplicates(subset=["Country ISO3"], keep="first")
-
-# Cast In Need / Targeted to numeric
-first_per_country["In Need"] = pd.to_numeric(first_per_country["In Need"], errors="coerce")
-first_per_country["Targeted"] = pd.to_numeric(first_per_country["Targeted"], errors="coerce")
-
-lookup = first_per_country.set_index("Country ISO3")[["In Need", "Targeted"]]
-
-print("Lookup values extracted from hpc_hno_2025.csv:")
-print(lookup.to_string())
-
-# Load summary file
-summary = pd.read_csv(summary_path)
-
-# Overwrite In Need and Targeted from lookup
-summary["In Need"] = summary["Country ISO3"].map(lookup["In Need"])
-summary["Targeted"] = summary["Country ISO3"].map(lookup["Targeted"])
-
-# Write back to the same file
-summary.to_csv(summary_path, index=False)
-
-print("\nUpdated country_level_summary (1).csv:")
+summary = hxl_csv.read_csv(hno_ingest.SUMMARY_PATH)
+print("Updated country_level_summary (1).csv:")
 print(summary[["Country ISO3", "In Need", "Targeted"]].to_string(index=False))
-print("\nDone — file overwritten successfully.")
+for name, out in manifest["outputs"].items():
+    print(f"  {name}: {out['rows']} rows")
+print("\nDone — files written atomically, provenance in data/hno_ingest_manifest.json.")
@@ -0,0 +1,108 @@
+"""Load test for the Genie chat path against the local mock server.
+
+Each simulated session owns a plain dict standing in for st.session_state and
+goes through the same calls render_genie_chatbot makes on every rerun:
+genie.submit_message() when the user sends, then genie.collect_finished() on
+each poller tick until the answer lands. Latency is measured from send to the
+tick that picks the answer up, i.e. what the analyst actually waits.
+
+    python loadtest/genie_loadtest.py --sessions 50 --messages 3 --spawn-mock --median 2
+
+Without --spawn-mock, point DATABRICKS_HOST at an already running mock.
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'src'))
+sys.path.insert(0, HERE)
+
+import genie_mock_server  # noqa: E402
+
+QUESTIONS = [
+    "Which regions are most underfunded?",
+    "Top crisis countries by severity",
+    "Funding gap forecast 2026",
+    "High neglect risk countries",
+    "Sudan funding gap",
+]
+
+
+def _pct(values, q):
+    if not values:
+        return float("nan")
+    vals = sorted(values)
+    return vals[min(len(vals) - 1, int(round(q * (len(vals) - 1))))]
+
+
+def run_session(genie, n_messages, tick, think, rng, out, lock):
+    """One analyst: send, wait for the answer on poller ticks, think, repeat."""
+    state = {}
+    for _ in range(n_messages):
+        bot_id = genie.submit_message(state, rng.choice(QUESTIONS))
+        sent = time.monotonic()
+        while genie.has_pending(state):
+            time.sleep(tick)
+            genie.collect_finished(state)
+        msg = next(m for m in state["genie_history"] if m.get("id") == bot_id)
+        with lock:
+            out.append((time.monotonic() - sent, msg.get("err", False)))
+        time.sleep(think * rng.random())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive N concurrent simulated Genie chat sessions.")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=3, help="messages per session")
+    parser.add_argument("--tick", type=float, default=1.0, help="poller interval (run_every) in seconds")
+    parser.add_argument("--think", type=float, default=2.0, help="max think time between messages (s)")
+    parser.add_argument("--ramp", type=float, default=2.0, help="seconds over which sessions start")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--spawn-mock", action="store_true", help="start the mock server in-process")
+    parser.add_argument("--port", type=int, default=8765)
+    genie_mock_server.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.spawn_mock:
+        genie_mock_server.serve(genie_mock_server.config_from_args(args), port=args.port, seed=args.seed)
+        os.environ["DATABRICKS_HOST"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("DATABRICKS_HOST", f"http://127.0.0.1:{args.port}")
+    os.environ.setdefault("DATABRICKS_TOKEN", "mock-token")
+    os.environ.setdefault("GENIE_SPACE_ID", "mock-space")
+    os.environ.setdefault("GENIE_CACHE_ENABLED", "0")   # measure the live path
+
+    import genie   # reads the env above at import time
+
+    results, lock = [], threading.Lock()
+    threads = []
+    t0 = time.monotonic()
+    for i in range(args.sessions):
+        rng = random.Random(args.seed + i)
+        t = threading.Thread(target=run_session,
+                             args=(genie, args.messages, args.tick, args.think, rng, results, lock))
+        t.start()
+        threads.append(t)
+        time.sleep(args.ramp / max(1, args.sessions))
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - t0
+
+    lat = [r[0] for r in results]
+    errors = sum(1 for r in results if r[1])
+    print(f"sessions={args.sessions}  messages={len(results)}  errors={errors}  "
+          f"executor_workers={genie.GENIE_MAX_WORKERS}")
+    print(f"latency (s)  p50={_pct(lat, 0.50):.2f}  p95={_pct(lat, 0.95):.2f}  p99={_pct(lat, 0.99):.2f}  "
+          f"max={max(lat) if lat else float('nan'):.2f}")
+    print(f"throughput   {len(results) / wall:.2f} answers/s over {wall:.1f} s")
+    m = genie.poll_metrics()
+    fmt = lambda v: "n/a" if v is None else f"{v:.2f}"
+    print(f"polling      polls/answer mean={fmt(m['polls_mean'])} p95={fmt(m['polls_p95'])}  "
+          f"ttft p50={fmt(m['ttft_p50'])} p95={fmt(m['ttft_p95'])}")
+
+
+if __name__ == "__main__":
+    main()
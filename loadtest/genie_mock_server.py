@@ -0,0 +1,204 @@
+"""Local stand-in for the Databricks Genie endpoints used by src/genie.py.
+
+Implements start-conversation, conversations/{id}/messages and the message
+poll endpoint with configurable answer latency, failure and throttling rates,
+and canned text / query / table attachments. Standard library only.
+
+    python loadtest/genie_mock_server.py --port 8765 --dist lognormal --median 3 --sigma 0.5
+
+Point the app (or genie_loadtest.py) at it with
+DATABRICKS_HOST=http://127.0.0.1:8765, any DATABRICKS_TOKEN and GENIE_SPACE_ID.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_START = re.compile(r"^/api/2\.0/genie/spaces/([^/]+)/start-conversation$")
+_FOLLOW = re.compile(r"^/api/2\.0/genie/spaces/([^/]+)/conversations/([^/]+)/messages$")
+_POLL = re.compile(r"^/api/2\.0/genie/spaces/([^/]+)/conversations/([^/]+)/messages/([^/]+)$")
+
+
+# ── Behaviour ─────────────────────────────────────────────────────────────────
+
+def sample_latency(cfg, rng):
+    """Seconds until a message completes, drawn from the configured distribution."""
+    if cfg["dist"] == "fixed":
+        return cfg["median"]
+    if cfg["dist"] == "uniform":
+        return rng.uniform(cfg["min"], cfg["max"])
+    # lognormal parameterised by its median
+    return min(cfg["max"], max(cfg["min"], rng.lognormvariate(math.log(cfg["median"]), cfg["sigma"])))
+
+
+def canned_attachments(kinds, content, table_rows):
+    atts = []
+    if "text" in kinds:
+        atts.append({"text": {"content": f"Mock answer for: {content}\nTop result: Sudan."}})
+    if "query" in kinds:
+        atts.append({"query": {
+            "description": "Countries ranked by mismatch score",
+            "query": "SELECT country, mismatch_score FROM metrics ORDER BY mismatch_score DESC",
+        }})
+    if "table" in kinds:
+        atts.append({"table": {
+            "columns": [{"name": "country"}, {"name": "mismatch_score"}, {"name": "in_need"}],
+            "rows": [[f"Country {i}", round(0.9 - i * 0.01, 3), 1_000_000 + i * 1000]
+                     for i in range(table_rows)],
+        }})
+    return atts
+
+
+class MockGenie:
+    """In-memory conversation/message state shared by all handler threads."""
+
+    def __init__(self, cfg, seed=None):
+        self.cfg = cfg
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.messages = {}   # msg id → {conv, content, ready_at, fails}
+
+    def new_message(self, conv_id, content):
+        with self.lock:
+            mid = uuid.uuid4().hex[:16]
+            self.messages[mid] = {
+                "conv": conv_id,
+                "content": content,
+                "ready_at": time.monotonic() + sample_latency(self.cfg, self.rng),
+                "fails": self.rng.random() < self.cfg["failure_rate"],
+            }
+            return mid
+
+    def throttle(self):
+        with self.lock:
+            return self.rng.random() < self.cfg["throttle_rate"]
+
+    def poll(self, conv_id, mid):
+        with self.lock:
+            m = self.messages.get(mid)
+        if m is None or m["conv"] != conv_id:
+            return None
+        if time.monotonic() < m["ready_at"]:
+            return {"id": mid, "conversation_id": conv_id, "status": "EXECUTING_QUERY"}
+        if m["fails"]:
+            return {"id": mid, "conversation_id": conv_id, "status": "FAILED",
+                    "error": "Mock failure injected by genie_mock_server."}
+        return {
+            "id": mid, "conversation_id": conv_id, "status": "COMPLETED",
+            "attachments": canned_attachments(self.cfg["attachments"], m["content"], self.cfg["table_rows"]),
+        }
+
+
+# ── HTTP ──────────────────────────────────────────────────────────────────────
+
+def make_handler(genie):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"   # keep-alive, like the real workspace
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code, payload, headers=None):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            n = int(self.headers.get("Content-Length") or 0)
+            return json.loads(self.rfile.read(n) or b"{}")
+
+        def _throttled(self):
+            if genie.throttle():
+                self._send(429, {"error_code": "RESOURCE_EXHAUSTED"},
+                           {"Retry-After": str(genie.cfg["retry_after"])})
+                return True
+            return False
+
+        def do_POST(self):
+            body = self._body()
+            if self._throttled():
+                return
+            if _START.match(self.path):
+                conv_id = uuid.uuid4().hex[:16]
+                mid = genie.new_message(conv_id, body.get("content", ""))
+                return self._send(200, {
+                    "conversation": {"id": conv_id},
+                    "message": {"id": mid, "status": "SUBMITTED"},
+                })
+            m = _FOLLOW.match(self.path)
+            if m:
+                mid = genie.new_message(m.group(2), body.get("content", ""))
+                return self._send(200, {"id": mid, "status": "SUBMITTED"})
+            self._send(404, {"error_code": "NOT_FOUND"})
+
+        def do_GET(self):
+            m = _POLL.match(self.path)
+            if not m:
+                return self._send(404, {"error_code": "NOT_FOUND"})
+            if self._throttled():
+                return
+            msg = genie.poll(m.group(2), m.group(3))
+            if msg is None:
+                return self._send(404, {"error_code": "NOT_FOUND"})
+            self._send(200, msg)
+
+    return Handler
+
+
+def serve(cfg, host="127.0.0.1", port=8765, seed=None):
+    """Start the mock in a daemon thread; returns the ThreadingHTTPServer."""
+    server = ThreadingHTTPServer((host, port), make_handler(MockGenie(cfg, seed)))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="genie-mock").start()
+    return server
+
+
+def add_arguments(parser):
+    parser.add_argument("--dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--median", type=float, default=3.0, help="median answer latency (s)")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal shape")
+    parser.add_argument("--min", type=float, default=0.2, help="lower latency bound (s)")
+    parser.add_argument("--max", type=float, default=60.0, help="upper latency bound (s)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of messages that FAIL")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on 429")
+    parser.add_argument("--attachments", default="text,query,table", help="comma list of text,query,table")
+    parser.add_argument("--table-rows", type=int, default=40)
+
+
+def config_from_args(args):
+    return {
+        "dist": args.dist, "median": args.median, "sigma": args.sigma,
+        "min": args.min, "max": args.max,
+        "failure_rate": args.failure_rate, "throttle_rate": args.throttle_rate,
+        "retry_after": args.retry_after,
+        "attachments": set(a.strip() for a in args.attachments.split(",") if a.strip()),
+        "table_rows": args.table_rows,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Genie-compatible mock server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=None)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    srv = serve(config_from_args(args), args.host, args.port, args.seed)
+    print(f"Mock Genie listening on http://{args.host}:{args.port}  (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        srv.shutdown()
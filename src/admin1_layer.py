@@ -0,0 +1,238 @@
+"""Admin-1 (province / state) entity layer for the crisis globe.
+
+Sub-national rows from updated_admin1_summary_data.csv get centroids from the
+local gazetteer data/admin1_centroids.csv (hand-compiled, accurate to a few
+tens of kilometres; provenance in the README) and go through the same
+health_regions.build_entities pipeline as the country layer. A uniform
+lat/lng grid index answers bounding-box queries, and `lod_subset()` picks
+what the browser should receive for a globe view:
+
+    altitude > 1.8         none: countries only
+    0.9 < altitude ≤ 1.8   in view, thinned to the largest needs per grid cell
+    altitude ≤ 0.9         every admin-1 unit in view
+
+Admin-1 severity has no country-style metrics row. Units with a population
+figure are ranked into quartiles by need prevalence; the rest inherit their
+country's quartile.
+"""
+import math
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_store import read_table, snapshot_version
+from registry import dataset, get_dataset
+
+DATA_DIR       = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+ADMIN1_PATH    = os.path.join(DATA_DIR, 'updated_admin1_summary_data.csv')
+GAZETTEER_PATH = os.path.join(DATA_DIR, 'admin1_centroids.csv')
+
+CELL_DEG = 5.0                 # grid index cell size
+COUNTRY_ONLY_ALTITUDE = 1.8    # above this, no admin-1 points at all
+THIN_ALTITUDE = 0.9            # above this, keep the top THIN_PER_CELL per cell
+THIN_PER_CELL = 2
+
+_QUARTILES = ['Low', 'Medium', 'High', 'Critical']
+
+
+# ── Entities ──────────────────────────────────────────────────────────────────
+
+def _admin1_quartiles(admin1: pd.DataFrame, country_metrics: pd.DataFrame) -> pd.Series:
+    pop = admin1['Population'].to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        prevalence = pd.Series(np.where(pop > 0, admin1['In Need'] / pop, np.nan), index=admin1.index)
+    ranked = prevalence.dropna()
+    quartile = pd.Series(np.nan, index=admin1.index, dtype=object)
+    if len(ranked) >= len(_QUARTILES):
+        quartile[ranked.index] = pd.qcut(ranked.rank(method='first'), 4, labels=_QUARTILES).astype(object)
+    parent = admin1['Country ISO3'].map(country_metrics.set_index('Country ISO3')['Severity Quartile'])
+    return quartile.fillna(parent)
+
+
+@dataset('admin1_entities')
+def _admin1_entities() -> pd.DataFrame:
+    from health_regions import build_entities, _ISO3_COORDS
+
+    admin1    = read_table(ADMIN1_PATH)
+    gazetteer = read_table(GAZETTEER_PATH)
+    metrics   = read_table(os.path.join(DATA_DIR, 'humanitarian_analysis_country_metrics.csv'))
+
+    # build_entities joins on 'Country ISO3'; use a per-unit key in that column
+    unit = admin1['Country ISO3'] + ':' + admin1['Admin 1 Name']
+    summary = admin1.assign(**{'Country ISO3': unit})
+    unit_metrics = pd.DataFrame({
+        'Country ISO3':      unit,
+        'Severity Quartile': _admin1_quartiles(admin1, metrics),
+        'Mismatch Score':    np.nan,
+    })
+    coords = pd.DataFrame({
+        'Country ISO3': gazetteer['Country ISO3'] + ':' + gazetteer['Admin 1 Name'],
+        'lat':          gazetteer['lat'],
+        'lon':          gazetteer['lon'],
+        'name':         gazetteer['Admin 1 Name'],
+    })
+
+    out = build_entities(summary, unit_metrics, coords)
+    key = out['iso3'].str.split(':', n=1, expand=True)
+    country_names = {iso3: name for iso3, (_, _, name) in _ISO3_COORDS.items()}
+    in_need = admin1.set_index(unit)['In Need']
+    return out.assign(
+        iso3=key[0],
+        admin1=key[1],
+        parent=key[0].map(country_names).fillna(key[0]),
+        in_need_n=out['iso3'].map(in_need).to_numpy(dtype=float),
+        admin=True,
+    )
+
+
+def admin1_entities() -> pd.DataFrame:
+    """All admin-1 entities with centroids (shared registry view)."""
+    return get_dataset('admin1_entities')
+
+
+def countries_with_admin1() -> dict:
+    """{iso3: country name} for every country with admin-1 rows."""
+    df = admin1_entities()[['iso3', 'parent']].drop_duplicates()
+    return dict(sorted(zip(df['iso3'], df['parent']), key=lambda kv: kv[1]))
+
+
+# ── Spatial index ─────────────────────────────────────────────────────────────
+
+_INDEX = {'version': None, 'cells': None}
+
+
+def _cell(lat, lng):
+    return (np.floor((np.asarray(lat) + 90.0) / CELL_DEG).astype(int),
+            np.floor((np.asarray(lng) + 180.0) / CELL_DEG).astype(int))
+
+
+def get_index():
+    """{(row, col) grid cell: entity positions}, rebuilt when the data changes."""
+    version = snapshot_version()
+    if _INDEX['version'] != version:
+        df = admin1_entities()
+        rows, cols = _cell(df['lat'], df['lon'])
+        cells = {}
+        for pos, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            cells.setdefault(key, []).append(pos)
+        _INDEX['cells'] = {k: np.asarray(v) for k, v in cells.items()}
+        _INDEX['version'] = version
+    return _INDEX['cells']
+
+
+def query_bbox(lat_min, lat_max, lng_min, lng_max) -> pd.DataFrame:
+    """Admin-1 entities inside a lat/lng box; lng_min > lng_max wraps the antimeridian."""
+    df = admin1_entities()
+    cells = get_index()
+    r0, c0 = _cell(max(lat_min, -90.0), lng_min)
+    r1, c1 = _cell(min(lat_max, 89.999), lng_max)
+    n_cols = int(360 / CELL_DEG)
+    col_range = range(c0, c1 + 1) if c0 <= c1 else list(range(c0, n_cols)) + list(range(0, c1 + 1))
+
+    hits = [cells[(r, c)] for r in range(r0, r1 + 1) for c in col_range if (r, c) in cells]
+    if not hits:
+        return df.iloc[0:0]
+    sub = df.iloc[np.sort(np.concatenate(hits))]
+    lat, lng = sub['lat'], sub['lon']
+    in_lng = (lng >= lng_min) & (lng <= lng_max) if lng_min <= lng_max else (lng >= lng_min) | (lng <= lng_max)
+    return sub[(lat >= lat_min) & (lat <= lat_max) & in_lng]
+
+
+# ── Level of detail ───────────────────────────────────────────────────────────
+
+def view_bbox(lat, lng, altitude, aspect=1.6):
+    """
+    Approximate lat/lng box visible from a globe.gl point of view. Half-height
+    is the smaller of the horizon angle and the camera's ~50° field of view
+    projected at this altitude, with a 25% margin for panning.
+    """
+    horizon = math.degrees(math.acos(1.0 / (1.0 + altitude)))
+    half_lat = min(horizon, math.degrees(altitude * math.tan(math.radians(25.0)))) * 1.25
+    half_lng = min(180.0, half_lat * aspect / max(math.cos(math.radians(min(abs(lat), 80.0))), 0.2))
+
+    lng_min = (lng - half_lng + 180.0) % 360.0 - 180.0
+    lng_max = (lng + half_lng + 180.0) % 360.0 - 180.0
+    if half_lng >= 180.0:
+        lng_min, lng_max = -180.0, 180.0
+    return max(-90.0, lat - half_lat), min(90.0, lat + half_lat), lng_min, lng_max
+
+
+def lod_level(altitude) -> int:
+    """0 = countries only, 1 = thinned admin-1, 2 = every admin-1 unit."""
+    if altitude > COUNTRY_ONLY_ALTITUDE:
+        return 0
+    return 1 if altitude > THIN_ALTITUDE else 2
+
+
+def _thin(sub: pd.DataFrame) -> pd.DataFrame:
+    rows, cols = _cell(sub['lat'], sub['lon'])
+    return (sub.assign(_r=rows, _c=cols)
+               .sort_values('in_need_n', ascending=False)
+               .groupby(['_r', '_c'], sort=False).head(THIN_PER_CELL)
+               .drop(columns=['_r', '_c']))
+
+
+def lod_subset(view) -> pd.DataFrame:
+    """Admin-1 entities the browser should receive for `view` = (lat, lng, altitude)."""
+    df = admin1_entities()
+    if view is None or lod_level(view[2]) == 0:
+        return df.iloc[0:0]
+    sub = query_bbox(*view_bbox(*view))
+    if lod_level(view[2]) == 1 and len(sub):
+        sub = _thin(sub)
+    return sub
+
+
+# ── Tiles ─────────────────────────────────────────────────────────────────────
+# Tile ids are "<level>/<row>/<col>" over the grid index: a level-1 tile holds
+# the thinned units of one cell, a level-2 tile all of them. Used by the
+# globe's point feed (globe_feed.py) to ship a view in bounded batches.
+
+def tiles_for_view(view) -> list:
+    """Non-empty tiles covering `view`, nearest to its centre first."""
+    if view is None:
+        return []
+    level = lod_level(view[2])
+    if level == 0:
+        return []
+    lat_min, lat_max, lng_min, lng_max = view_bbox(*view)
+    r0, c0 = _cell(lat_min, lng_min)
+    r1, c1 = _cell(min(lat_max, 89.999), lng_max)
+    n_cols = int(360 / CELL_DEG)
+    col_range = range(c0, c1 + 1) if c0 <= c1 else list(range(c0, n_cols)) + list(range(0, c1 + 1))
+
+    cells = get_index()
+    vr, vc = _cell(view[0], view[1])
+    found = [(r, c) for r in range(int(r0), int(r1) + 1) for c in col_range if (r, c) in cells]
+
+    def dist(rc):
+        dc = abs(rc[1] - vc)
+        return (rc[0] - vr) ** 2 + min(dc, n_cols - dc) ** 2
+    return [f'{level}/{r}/{c}' for r, c in sorted(found, key=dist)]
+
+
+def tile_entities(tile_id) -> pd.DataFrame:
+    level, r, c = (int(x) for x in tile_id.split('/'))
+    df = admin1_entities()
+    positions = get_index().get((r, c))
+    if positions is None:
+        return df.iloc[0:0]
+    sub = df.iloc[positions]
+    return _thin(sub) if level == 1 else sub
+
+
+def quantise_view(view):
+    """Snap a view to a coarse grid so nearby views share one cached globe document."""
+    if view is None:
+        return None
+    lat, lng, altitude = view
+    step = CELL_DEG if altitude > THIN_ALTITUDE else CELL_DEG / 2
+    return (round(lat / step) * step, round(lng / step) * step, round(altitude, 1))
+
+
+def country_view(iso3, altitude=0.8):
+    """Point of view centred on a country's admin-1 units, close enough to show all of them."""
+    units = admin1_entities()
+    units = units[units['iso3'] == iso3]
+    return (round(float(units['lat'].mean()), 2), round(float(units['lon'].mean()), 2), altitude)
@@ -0,0 +1,303 @@
+"""Walk-forward backtests of both forecast stages, folds run in parallel.
+
+Each fold is an origin year. It sees only the HRP rows up to that year,
+rebuilds the features from them, refits every model variant and forecasts the
+following `horizon` years, the way the pipeline forecasts 2026–2030 from 2025:
+
+    funding   FUNDING_VARIANTS, the funding engines, on funding_history(≤ origin)
+    needs     NEEDS_VARIANTS, XGBoost parameter sets trained on the fold's
+              complete rows and scored on its future_features, plus a
+              last-value baseline
+
+Forecasts are scored against the recorded values per country and year
+(revisedRequirements summed over a year's plans, In Need as recorded).
+Every (stage, variant, fold) is one task on a spawn-context process pool
+(FORECAST_WORKERS); Prophet fits serially inside its task. Each fold's feature
+matrix is cached under build/backtest_cache/, keyed by the input and feature
+code hashes, so variants and reruns share it.
+
+Writes models/backtest/, which the Forecast page reads:
+
+    predictions.csv        one row per scored forecast: origin, lead, predicted, actual
+    errors_summary.csv     MAE, RMSE, MdAPE and bias per stage, variant and target
+    errors_by_country.csv  the same per country
+    errors_by_year.csv     the same per target year
+    manifest.json          origins, horizon, variants, input hashes, failures
+
+Running a subset of variants keeps the other variants' results as long as the
+origins, horizon and inputs are unchanged, so a new variant can be compared
+without refitting the rest.
+
+    python src/backtest.py                                 # every variant, origins 2016–2022
+    python src/backtest.py --funding bayes damped --needs xgb xgb-shallow
+    python src/backtest.py --origins 2014 2016 2018 2020 --horizon 5 --workers 8
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+import forecast_data
+import forecast_features
+import hxl_csv
+import model_registry
+from data_store import ROOT_DIR, file_sha256
+from forecast_data import FEATURES, TARGETS
+from funding_forecast import ENGINES, WORKERS, forecast_funding
+
+BACKTEST_DIR = os.path.join(ROOT_DIR, 'models', 'backtest')
+CACHE_DIR    = os.path.join(ROOT_DIR, 'build', 'backtest_cache')
+
+HORIZON = 3                                                      # years forecast past each origin
+ORIGINS = list(range(2016, forecast_data.TRAIN_END - HORIZON + 1))   # last fold ends at TRAIN_END
+
+FUNDING_VARIANTS = list(ENGINES)
+NEEDS_VARIANTS = {
+    'xgb':         model_registry.XGB_PARAMS,                     # the published models
+    'xgb-shallow': dict(model_registry.XGB_PARAMS, max_depth=3),
+    'last-value':  None,                                          # last observed target, carried forward
+}
+
+# How recorded values are totalled per country and year
+_ACTUALS = {'In Need': 'first', 'revisedRequirements': 'sum'}
+_STAGE_TARGETS = {'funding': ['revisedRequirements'], 'needs': TARGETS}
+
+_FILES = {
+    'predictions': 'predictions.csv',
+    'summary':     'errors_summary.csv',
+    'country':     'errors_by_country.csv',
+    'year':        'errors_by_year.csv',
+}
+
+
+# ── Fold features ─────────────────────────────────────────────────────────────
+
+def _inputs():
+    return {os.path.basename(p): file_sha256(p) for p in (forecast_data.HRP_PATH, forecast_data.SUMMARY_PATH)}
+
+
+def _features_key():
+    """Digest over the inputs and the code that turns them into features."""
+    h = hashlib.sha256()
+    code = (forecast_data.__file__, forecast_features.__file__, hxl_csv.__file__)
+    for digest in list(_inputs().values()) + [file_sha256(p) for p in code]:
+        h.update(digest.encode())
+    return h.hexdigest()[:16]
+
+
+def fold_features(merged, origin, key=None):
+    """Path of the cached feature frame built from the rows of `merged` up to `origin`."""
+    key = key or _features_key()
+    path = os.path.join(CACHE_DIR, f'features_{key}_{origin}.pkl')
+    if not os.path.exists(path):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        forecast_features.add_features(merged[merged['year'] <= origin]).to_pickle(f'{path}.tmp')
+        os.replace(f'{path}.tmp', path)
+    return path
+
+
+# ── Fold predictions ──────────────────────────────────────────────────────────
+
+def _predict_funding(feats, origin, years, variant):
+    history = forecast_data.funding_history(feats, train_end=origin)
+    pred, _ = forecast_funding(history, years, engine=variant, workers=1)
+    return pred.rename(columns={'Predicted_Funding': 'predicted'}).assign(target='revisedRequirements')
+
+
+def _predict_needs(feats, origin, years, variant):
+    params = NEEDS_VARIANTS[variant]
+    future = forecast_data.future_features(feats, years)
+    if params is None:
+        last = feats.dropna(subset=['iso3']).groupby('iso3', sort=False)[TARGETS].last()
+        pred = future[['iso3', 'year']].join(last, on='iso3')
+    else:
+        data = feats.dropna(subset=TARGETS + FEATURES)
+        # One thread per booster: the folds already fill the cores
+        models = {t: model_registry.fit(data[FEATURES], data[t], dict(params, n_jobs=1)) for t in TARGETS}
+        columns = {v: t for t, v in model_registry.PREDICTIONS.items()}
+        pred = future[['iso3', 'year']].assign(**model_registry.predict(future, models)).rename(columns=columns)
+    return pred.melt(id_vars=['iso3', 'year'], value_vars=TARGETS, var_name='target', value_name='predicted')
+
+
+_PREDICTORS = {'funding': _predict_funding, 'needs': _predict_needs}
+
+
+def _task(stage, variant, origin, horizon, features_path):
+    """(stage, variant, origin, long predictions or None, error or None) — never raises."""
+    try:
+        feats = pd.read_pickle(features_path)
+        years = list(range(origin + 1, origin + 1 + horizon))
+        pred = _PREDICTORS[stage](feats, origin, years, variant)
+        return stage, variant, origin, pred[['iso3', 'year', 'target', 'predicted']], None
+    except Exception as e:  # noqa: BLE001 — one failing fold must not sink the run
+        return stage, variant, origin, None, f'{type(e).__name__}: {e}'
+
+
+def _run_tasks(tasks, workers):
+    if workers <= 1 or len(tasks) <= 1:
+        return [_task(*t) for t in tasks]
+    # spawn: XGBoost's OpenMP pool does not survive a fork
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=ctx) as pool:
+        futures = {pool.submit(_task, *t): t for t in tasks}
+        for future, (stage, variant, origin, _, _) in futures.items():
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                results.append((stage, variant, origin, None, 'worker crashed'))
+    return results
+
+
+# ── Scoring ───────────────────────────────────────────────────────────────────
+
+def actuals(merged, last_year=forecast_data.TRAIN_END):
+    """Long (iso3, year, target, actual) recorded values per country and year."""
+    rows = merged[(merged['year'] > 0) & (merged['year'] <= last_year)]
+    out = []
+    for target, how in _ACTUALS.items():
+        values = pd.to_numeric(rows[target], errors='coerce')
+        recorded = rows[['iso3', 'year']].assign(actual=values.where(values > 0)).dropna()
+        out.append(recorded.groupby(['iso3', 'year'], as_index=False)['actual'].agg(how).assign(target=target))
+    return pd.concat(out, ignore_index=True)
+
+
+def score(pred, actual):
+    """Predictions joined to their recorded values, with per-point errors."""
+    out = pred.dropna(subset=['predicted']).merge(actual, on=['iso3', 'year', 'target'], how='inner')
+    out['iso3_original'] = out['iso3']
+    out['iso3'] = out['iso3'].map(forecast_data.clean_iso3)
+    out['lead'] = out['year'] - out['origin']
+    out['error'] = out['predicted'] - out['actual']
+    out['pct_error'] = out['error'] / out['actual'].abs()
+    cols = ['stage', 'variant', 'target', 'origin', 'lead', 'iso3', 'iso3_original', 'year',
+            'predicted', 'actual', 'error', 'pct_error']
+    return out[cols].sort_values(cols[:8], kind='stable').reset_index(drop=True)
+
+
+def error_table(scored, by=()):
+    """Points, MAE, RMSE, MdAPE_pct and Bias_pct per stage, variant, target and `by`."""
+    keys = ['stage', 'variant', 'target'] + list(by)
+    err = scored.assign(abs_error=scored['error'].abs(), sq_error=scored['error'] ** 2,
+                        abs_pct=scored['pct_error'].abs())
+    out = err.groupby(keys, as_index=False).agg(
+        points=('error', 'size'), MAE=('abs_error', 'mean'), RMSE=('sq_error', 'mean'),
+        MdAPE_pct=('abs_pct', 'median'), Bias_pct=('pct_error', 'median'))
+    out['RMSE'] = np.sqrt(out['RMSE'])
+    out[['MdAPE_pct', 'Bias_pct']] *= 100
+    return out
+
+
+# ── Output ────────────────────────────────────────────────────────────────────
+
+def _run_key(origins, horizon):
+    return {'origins': list(origins), 'horizon': horizon, 'inputs': _inputs()}
+
+
+def _previous(run_key, out_dir):
+    """(scored rows, failed folds) of the last run with the same origins, horizon and inputs, else None."""
+    try:
+        with open(os.path.join(out_dir, 'manifest.json'), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        if {k: manifest.get(k) for k in run_key} != run_key:
+            return None
+        rows = hxl_csv.read_csv(os.path.join(out_dir, _FILES['predictions']), strings_can_be_null=False)
+        return rows, manifest.get('failed', {})
+    except (OSError, ValueError):
+        return None
+
+
+def _write(tables, manifest, out_dir):
+    os.makedirs(out_dir, exist_ok=True)
+    for name, df in tables.items():
+        path = os.path.join(out_dir, _FILES[name])
+        df.to_csv(f'{path}.tmp', index=False)
+        os.replace(f'{path}.tmp', path)
+    # Manifest last: a run interrupted before it is not picked up as a previous run
+    path = os.path.join(out_dir, 'manifest.json')
+    with open(f'{path}.tmp', 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+# ── Entry point ───────────────────────────────────────────────────────────────
+
+def run(origins=ORIGINS, horizon=HORIZON, funding=FUNDING_VARIANTS, needs=tuple(NEEDS_VARIANTS),
+        workers=WORKERS, out_dir=BACKTEST_DIR, log=print):
+    """Backtest the given variants over every origin, write the error tables and return the summary table."""
+    unknown = [v for v in funding if v not in ENGINES] + [v for v in needs if v not in NEEDS_VARIANTS]
+    if unknown:
+        raise ValueError(f'unknown variants {unknown}; funding: {ENGINES}, needs: {list(NEEDS_VARIANTS)}')
+    t0 = time.perf_counter()
+    merged = forecast_data.load_merged()
+    key = _features_key()
+    paths = {origin: fold_features(merged, origin, key) for origin in origins}
+
+    # Prophet folds first: they are the slowest tasks
+    tasks = ([('funding', v, o, horizon, paths[o]) for v in funding for o in origins]
+             + [('needs', v, o, horizon, paths[o]) for v in needs for o in origins])
+    preds, failed = [], {}
+    for stage, variant, origin, pred, error in _run_tasks(tasks, workers):
+        if error is not None:
+            failed[f'{stage}/{variant}/{origin}'] = error
+            log(f'  {stage} {variant} fold {origin} failed: {error}')
+            continue
+        preds.append(pred.assign(stage=stage, variant=variant, origin=origin))
+    if not preds:
+        raise RuntimeError('every backtest fold failed')
+    scored = score(pd.concat(preds, ignore_index=True), actuals(merged))
+
+    run_key = _run_key(origins, horizon)
+    previous = _previous(run_key, out_dir)
+    if previous is not None:
+        rows, failed_before = previous
+        # A requested variant replaces its old rows and failures, even if every fold failed;
+        # failures of variants not run this time still describe the rows kept for them
+        ran = {f'funding/{v}' for v in funding} | {f'needs/{v}' for v in needs}
+        keep = [f'{s}/{v}' not in ran for s, v in zip(rows['stage'], rows['variant'])]
+        scored = pd.concat([rows[keep], scored], ignore_index=True)
+        scored = scored.sort_values(list(scored.columns[:8]), kind='stable').reset_index(drop=True)
+        failed = {**{k: e for k, e in failed_before.items() if k.rsplit('/', 1)[0] not in ran}, **failed}
+
+    tables = {
+        'predictions': scored,
+        'summary':     error_table(scored),
+        'country':     error_table(scored, ['iso3']),
+        'year':        error_table(scored, ['year']),
+    }
+    variants = scored[['stage', 'variant']].drop_duplicates()
+    _write(tables, {
+        **run_key,
+        'variants':   {s: sorted(variants.loc[variants['stage'] == s, 'variant']) for s in _STAGE_TARGETS},
+        'points':     len(scored),
+        'failed':     failed,
+        'seconds':    round(time.perf_counter() - t0, 3),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }, out_dir)
+    return tables['summary']
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the funding and needs forecasts.')
+    parser.add_argument('--origins', type=int, nargs='+', default=ORIGINS, help='last year each fold sees')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='years forecast past each origin')
+    parser.add_argument('--funding', nargs='*', default=FUNDING_VARIANTS, choices=ENGINES,
+                        help='funding engines to backtest')
+    parser.add_argument('--needs', nargs='*', default=list(NEEDS_VARIANTS), choices=list(NEEDS_VARIANTS),
+                        help='needs model variants to backtest')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='fold worker processes (1 = serial)')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    summary = run(args.origins, args.horizon, args.funding, args.needs, args.workers)
+    print(f'{len(args.origins)} folds × {len(args.funding) + len(args.needs)} variants '
+          f'in {time.perf_counter() - t0:.1f} s → {BACKTEST_DIR}')
+    print(summary.to_string(index=False, float_format=lambda x: f'{x:,.1f}'))
@@ -0,0 +1,325 @@
+"""Dependency-tracked build graph over the data pipeline.
+
+Each node declares the files it reads, the files it writes, the code that
+implements it and a builder. A node's fingerprint is the SHA-256 over its
+input and code hashes; build/graph_state.json records the fingerprint and the
+output hashes of its last build. A node is rebuilt only when its fingerprint
+moved or an output went missing or was edited by hand, and nodes run in
+dependency order. A rebuild that reproduces byte-identical outputs leaves
+everything downstream fresh.
+
+    hno              hpc_hno_2025.csv → country / admin-1 / sector tables
+    country_metrics  summary + COD population → country metrics CSV
+    forecasts        HRP + summary → models/*_2026_2030.csv + models/xgb/ boosters
+    backtest         HRP + summary → walk-forward error tables in models/backtest/
+    store            every CSV → Arrow store (build/store/)
+
+    python src/build_graph.py status             # what is stale and why
+    python src/build_graph.py build              # rebuild stale nodes
+    python src/build_graph.py build --dry-run    # list what would run
+    python src/build_graph.py mark store         # record outputs built by hand
+"""
+import hashlib
+import json
+import os
+import time
+
+from data_store import ROOT_DIR, file_sha256, list_sources
+
+STATE_PATH = os.path.join(ROOT_DIR, 'build', 'graph_state.json')
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+
+
+def _rel(path):
+    return os.path.relpath(path, ROOT_DIR).replace(os.sep, '/')
+
+
+def _data(name):
+    return os.path.join(ROOT_DIR, 'data', name)
+
+
+def _models(name):
+    return os.path.join(ROOT_DIR, 'models', name)
+
+
+def _src(name):
+    return os.path.join(SRC_DIR, name)
+
+
+# ── Builders ──────────────────────────────────────────────────────────────────
+
+def _build_hno():
+    import hno_ingest
+    hno_ingest.ingest()
+
+
+def _build_country_metrics():
+    import metrics_snapshot
+    metrics_snapshot.write_metrics_table()
+
+
+def _build_forecasts():
+    import forecast_pipeline
+    forecast_pipeline.run(validate=True)
+
+
+def _build_backtest():
+    import backtest
+    backtest.run()
+
+
+def _build_store():
+    import data_store
+    data_store.build_store()
+
+
+# ── Graph ─────────────────────────────────────────────────────────────────────
+# inputs may be a callable so the store node follows whatever CSVs exist.
+
+NODES = {
+    'hno': {
+        'inputs':  [_data('hpc_hno_2025.csv')],
+        'outputs': [_data('country_level_summary (1).csv'),
+                    _data('updated_admin1_summary_data.csv'),
+                    _data('humanitarian_analysis_sector_benchmarking.csv')],
+        'code':    [_src('hno_ingest.py')],
+        'build':   _build_hno,
+    },
+    'country_metrics': {
+        'inputs':  [_data('country_level_summary (1).csv'),
+                    _data('cod_population_admin0.csv')],
+        'outputs': [_data('humanitarian_analysis_country_metrics.csv')],
+        'code':    [_src('metrics_snapshot.py')],
+        'build':   _build_country_metrics,
+    },
+    'forecasts': {
+        'inputs':  [_data('humanitarian-response-plans.csv'),
+                    _data('country_level_summary (1).csv')],
+        'outputs': [_models('forecast_results_2026_2030.csv'),
+                    _models('high_neglect_risk_2026_2030.csv'),
+                    _models(os.path.join('xgb', 'manifest.json'))],
+        'code':    [_src('forecast_data.py'), _src('forecast_features.py'), _src('funding_forecast.py'),
+                    _src('funding_batch.py'), _src('model_registry.py'), _src('forecast_pipeline.py')],
+        'build':   _build_forecasts,
+    },
+    'backtest': {
+        'inputs':  [_data('humanitarian-response-plans.csv'),
+                    _data('country_level_summary (1).csv')],
+        'outputs': [_models(os.path.join('backtest', name))
+                    for name in ('errors_summary.csv', 'errors_by_country.csv', 'errors_by_year.csv',
+                                 'predictions.csv', 'manifest.json')],
+        'code':    [_src('forecast_data.py'), _src('forecast_features.py'), _src('funding_forecast.py'),
+                    _src('funding_batch.py'), _src('model_registry.py'), _src('backtest.py')],
+        'build':   _build_backtest,
+    },
+    'store': {
+        'inputs':  list_sources,
+        'outputs': [os.path.join(ROOT_DIR, 'build', 'store', 'manifest.json')],
+        'code':    [_src('data_store.py')],
+        'build':   _build_store,
+    },
+}
+
+
+def _inputs(node):
+    inputs = NODES[node]['inputs']
+    return list(inputs() if callable(inputs) else inputs)
+
+
+def producers():
+    """{output path: node that writes it}."""
+    return {path: name for name, spec in NODES.items() for path in spec['outputs']}
+
+
+def upstream(node):
+    made_by = producers()
+    return sorted({made_by[p] for p in _inputs(node) if made_by.get(p) not in (None, node)})
+
+
+def topo_order():
+    """Node names, every node after the nodes producing its inputs."""
+    order, seen = [], set()
+
+    def visit(name, path=()):
+        if name in seen:
+            return
+        if name in path:
+            raise ValueError(f'build graph cycle: {" → ".join(path + (name,))}')
+        for dep in upstream(name):
+            visit(dep, path + (name,))
+        seen.add(name)
+        order.append(name)
+
+    for name in NODES:
+        visit(name)
+    return order
+
+
+# ── State ─────────────────────────────────────────────────────────────────────
+
+def load_state():
+    try:
+        with open(STATE_PATH, encoding='utf-8') as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(state):
+    os.makedirs(os.path.dirname(STATE_PATH), exist_ok=True)
+    tmp = f'{STATE_PATH}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(state, fh, indent=2, sort_keys=True)
+    os.replace(tmp, STATE_PATH)
+
+
+def _hashes(paths):
+    """{relative path: sha256 or None when missing}."""
+    return {_rel(p): (file_sha256(p) if os.path.exists(p) else None) for p in paths}
+
+
+def fingerprint(node):
+    """(digest over inputs + code, {input: hash}); digest is None if an input is missing."""
+    spec = NODES[node]
+    inputs = _hashes(_inputs(node))
+    code = _hashes(spec['code'])
+    if any(h is None for h in inputs.values()):
+        return None, inputs
+    raw = json.dumps([node, sorted(inputs.items()), sorted(code.items())])
+    return hashlib.sha256(raw.encode()).hexdigest()[:16], inputs
+
+
+def node_status(node, state, pending=()):
+    """
+    (status, reason). status is one of fresh, stale, dirty, blocked.
+    `pending` holds nodes already known to need a rebuild this run.
+    """
+    spec = NODES[node]
+    digest, inputs = fingerprint(node)
+    missing = [p for p, h in inputs.items() if h is None]
+    waiting = [n for n in upstream(node) if n in pending]
+    if waiting:
+        return 'stale', f'upstream {", ".join(waiting)}'
+    if missing:
+        return 'blocked', f'missing input {", ".join(missing)}'
+
+    entry = state.get(node)
+    if entry is None:
+        return 'stale', 'never built'
+    if entry.get('fingerprint') != digest:
+        changed = [p for p, h in inputs.items() if entry.get('inputs', {}).get(p) != h]
+        return 'stale', f'changed {", ".join(changed)}' if changed else 'code changed'
+
+    outputs = _hashes(spec['outputs'])
+    gone = [p for p, h in outputs.items() if h is None]
+    if gone:
+        return 'dirty', f'missing output {", ".join(gone)}'
+    edited = [p for p, h in outputs.items() if entry.get('outputs', {}).get(p) != h]
+    if edited:
+        return 'dirty', f'output edited {", ".join(edited)}'
+    return 'fresh', ''
+
+
+def status(state=None):
+    """[(node, status, reason)] in build order, propagating staleness downstream."""
+    state = load_state() if state is None else state
+    rows, pending = [], set()
+    for node in topo_order():
+        st_, reason = node_status(node, state, pending)
+        if st_ in ('stale', 'dirty'):
+            pending.add(node)
+        rows.append((node, st_, reason))
+    return rows
+
+
+def _record(node, state, seconds=None):
+    digest, inputs = fingerprint(node)
+    state[node] = {
+        'fingerprint': digest,
+        'inputs':      inputs,
+        'outputs':     _hashes(NODES[node]['outputs']),
+        'built_at':    time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'seconds':     seconds,
+    }
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def build(targets=None, force=False, dry_run=False, log=print):
+    """
+    Rebuild stale or dirty nodes (restricted to `targets` and what they depend
+    on, if given) in dependency order. Returns the names of nodes that ran.
+    """
+    state = load_state()
+    order = topo_order()
+    if targets:
+        unknown = [t for t in targets if t not in NODES]
+        if unknown:
+            raise KeyError(f'unknown node(s) {unknown}; known: {order}')
+        wanted = set()
+        stack = list(targets)
+        while stack:
+            n = stack.pop()
+            if n not in wanted:
+                wanted.add(n)
+                stack.extend(upstream(n))
+        order = [n for n in order if n in wanted]
+
+    ran, pending = [], set()
+    for node in order:
+        st_, reason = node_status(node, state, pending if dry_run else ())
+        if force and st_ == 'fresh':
+            st_, reason = 'stale', 'forced'
+        if st_ == 'fresh':
+            continue
+        if st_ == 'blocked':
+            log(f'  skip   {node}: {reason}')
+            continue
+        if dry_run:
+            log(f'  would  {node}: {reason}')
+            pending.add(node)
+            continue
+
+        log(f'  build  {node}: {reason}')
+        t0 = time.perf_counter()
+        NODES[node]['build']()
+        _record(node, state, round(time.perf_counter() - t0, 3))
+        _save_state(state)
+        ran.append(node)
+    return ran
+
+
+def mark(nodes):
+    """Record `nodes` as built from the current files (after a manual run)."""
+    state = load_state()
+    for node in nodes:
+        if node not in NODES:
+            raise KeyError(f'unknown node {node!r}; known: {list(NODES)}')
+        _record(node, state)
+    _save_state(state)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Incremental build of the data pipeline.')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('status', help='show each node and why it is stale')
+    b = sub.add_parser('build', help='rebuild stale nodes')
+    b.add_argument('nodes', nargs='*', help='only these nodes (and their upstream)')
+    b.add_argument('--force', action='store_true', help='rebuild even if fresh')
+    b.add_argument('--dry-run', action='store_true', help='list what would be rebuilt')
+    m = sub.add_parser('mark', help='record nodes as built from the current files')
+    m.add_argument('nodes', nargs='+')
+    args = parser.parse_args()
+
+    if args.cmd == 'status':
+        for node, st_, reason in status():
+            print(f'  {st_:<8} {node:<16} {reason}')
+    elif args.cmd == 'build':
+        t0 = time.perf_counter()
+        ran = build(args.nodes or None, force=args.force, dry_run=args.dry_run)
+        print(f'{len(ran)} node(s) rebuilt in {time.perf_counter() - t0:.2f} s')
+    else:
+        mark(args.nodes)
+        print(f'marked {", ".join(args.nodes)} → {STATE_PATH}')
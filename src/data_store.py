@@ -0,0 +1,287 @@
+"""Columnar Arrow store for the CSVs shipped in data/ and models/.
+
+`build_store()` converts every source CSV into a typed Arrow IPC file under
+build/store/ and records it in a manifest keyed by the source file's SHA-256.
+`read_table()` is what the loaders call: it memory-maps the Arrow file when the
+manifest entry is still fresh and falls back to parsing the CSV (hxl_csv) when
+pyarrow is missing or the store has not been built yet. Both paths go through
+hxl_csv, so HXL tag rows are skipped and declared column types applied.
+
+    python src/data_store.py            # build / refresh the store
+    python src/data_store.py --force    # rebuild every file
+    python src/data_store.py --check    # build, then compare read_table() with pd.read_csv
+"""
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import hxl_csv
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:
+    pa = None
+
+ROOT_DIR   = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+DATA_DIR   = os.path.join(ROOT_DIR, 'data')
+MODELS_DIR = os.path.join(ROOT_DIR, 'models')
+STORE_DIR  = os.path.join(ROOT_DIR, 'build', 'store')
+MANIFEST_PATH = os.path.join(STORE_DIR, 'manifest.json')
+
+SOURCE_DIRS = (DATA_DIR, MODELS_DIR)
+
+# Bump when CSV → Arrow conversion changes; artifacts from older readers are rebuilt
+READER_VERSION = 2
+
+# (size, mtime_ns) → sha256, so repeated freshness checks don't re-hash files
+_HASH_CACHE = {}
+
+
+# ── Fingerprints ──────────────────────────────────────────────────────────────
+
+def _rel(path):
+    return os.path.relpath(os.path.abspath(path), ROOT_DIR).replace(os.sep, '/')
+
+
+def file_sha256(path):
+    """SHA-256 of a file, memoised on (size, mtime) so unchanged files hash once."""
+    st_ = os.stat(path)
+    key = (os.path.abspath(path), st_.st_size, st_.st_mtime_ns)
+    cached = _HASH_CACHE.get(key)
+    if cached:
+        return cached
+    h = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(1 << 20), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    _HASH_CACHE[key] = digest
+    return digest
+
+
+def list_sources():
+    """Every CSV under data/ and models/, as absolute paths in a stable order."""
+    paths = []
+    for d in SOURCE_DIRS:
+        if not os.path.isdir(d):
+            continue
+        for name in sorted(os.listdir(d)):
+            if name.lower().endswith('.csv'):
+                paths.append(os.path.join(d, name))
+    return paths
+
+
+def snapshot_version():
+    """Short digest over every source file's hash; changes whenever any dataset does."""
+    h = hashlib.sha256()
+    for path in list_sources():
+        h.update(_rel(path).encode())
+        h.update(file_sha256(path).encode())
+    return h.hexdigest()[:16]
+
+
+# ── Manifest ──────────────────────────────────────────────────────────────────
+
+_MANIFEST = {'mtime': None, 'data': None}
+
+
+def load_manifest():
+    """Return the manifest dict ({} when the store has not been built)."""
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        return {}
+    if _MANIFEST['mtime'] != mtime:
+        with open(MANIFEST_PATH, encoding='utf-8') as fh:
+            _MANIFEST['data'] = json.load(fh)
+        _MANIFEST['mtime'] = mtime
+    return _MANIFEST['data']
+
+
+def _write_json_atomic(path, payload):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(payload, fh, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def _artifact_name(rel_path, digest):
+    stem = os.path.splitext(rel_path)[0].replace('/', '__').replace(' ', '_')
+    return f'{stem}.{digest[:12]}.arrow'
+
+
+def _is_fresh(entry, path):
+    """Cheap staleness check: size and mtime first, hash only when those moved."""
+    try:
+        st_ = os.stat(path)
+    except OSError:
+        return False
+    if entry.get('reader') != READER_VERSION:
+        return False
+    if entry.get('size') == st_.st_size and entry.get('mtime_ns') == st_.st_mtime_ns:
+        return True
+    return entry.get('sha256') == file_sha256(path)
+
+
+# ── Build ─────────────────────────────────────────────────────────────────────
+
+def _csv_to_table(path):
+    # Empty string cells become nulls, matching pd.read_csv's NaN
+    return hxl_csv.read_arrow(path, strings_can_be_null=True)
+
+
+def build_store(force=False, verbose=False):
+    """Convert every source CSV into an Arrow IPC file; skip unchanged sources.
+
+    Returns the list of relative source paths that were (re)built.
+    """
+    if pa is None:
+        raise ImportError('pyarrow is required to build the data store (pip install pyarrow).')
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    manifest = dict(load_manifest())
+    files = dict(manifest.get('files', {}))
+    rebuilt = []
+
+    for path in list_sources():
+        rel = _rel(path)
+        digest = file_sha256(path)
+        entry = files.get(rel)
+        artifact = os.path.join(STORE_DIR, entry['artifact']) if entry else None
+        if (not force and entry and entry.get('sha256') == digest
+                and entry.get('reader') == READER_VERSION
+                and artifact and os.path.exists(artifact)):
+            continue
+
+        t0 = time.perf_counter()
+        table = _csv_to_table(path)
+        name = _artifact_name(rel, digest)
+        out = os.path.join(STORE_DIR, name)
+        tmp = f'{out}.tmp'
+        with pa.OSFile(tmp, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, out)
+
+        if entry and entry.get('artifact') != name:
+            try:
+                os.remove(os.path.join(STORE_DIR, entry['artifact']))
+            except OSError:
+                pass
+
+        st_ = os.stat(path)
+        files[rel] = {
+            'sha256':   digest,
+            'size':     st_.st_size,
+            'mtime_ns': st_.st_mtime_ns,
+            'artifact': name,
+            'reader':   READER_VERSION,
+            'rows':     table.num_rows,
+            'schema':   {f.name: str(f.type) for f in table.schema},
+            'built_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        }
+        rebuilt.append(rel)
+        if verbose:
+            print(f'  built {rel} → {name}  ({table.num_rows} rows, '
+                  f'{(time.perf_counter() - t0) * 1e3:.1f} ms)')
+
+    # Drop entries whose source CSV no longer exists
+    live = {_rel(p) for p in list_sources()}
+    for rel in [r for r in files if r not in live]:
+        try:
+            os.remove(os.path.join(STORE_DIR, files[rel]['artifact']))
+        except OSError:
+            pass
+        del files[rel]
+
+    manifest['files'] = files
+    _write_json_atomic(MANIFEST_PATH, manifest)
+    return rebuilt
+
+
+# ── Read ──────────────────────────────────────────────────────────────────────
+
+def read_arrow(path):
+    """Memory-mapped Arrow table for a source CSV, or None if the store can't serve it."""
+    if pa is None:
+        return None
+    entry = load_manifest().get('files', {}).get(_rel(path))
+    if not entry or not _is_fresh(entry, path):
+        return None
+    artifact = os.path.join(STORE_DIR, entry['artifact'])
+    try:
+        source = pa.memory_map(artifact, 'r')
+        return pa_ipc.open_file(source).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+
+
+def read_table(path):
+    """DataFrame for a source CSV — from the Arrow store when fresh, else from the CSV."""
+    table = read_arrow(path)
+    if table is not None:
+        return table.to_pandas()
+    return hxl_csv.read_csv(path)
+
+
+# ── Round-trip check ──────────────────────────────────────────────────────────
+
+def _same_values(got, expected):
+    """Non-null cells equal; declared types may differ from pandas' inferred ones."""
+    if pd.api.types.is_datetime64_any_dtype(got):
+        return bool((got == pd.to_datetime(expected)).all())
+    if pd.api.types.is_numeric_dtype(expected) or pd.api.types.is_bool_dtype(expected):
+        return np.allclose(pd.to_numeric(got).astype(float), expected.astype(float), rtol=1e-12, atol=0)
+    return bool((got.astype(str).to_numpy() == expected.astype(str).to_numpy()).all())
+
+
+def round_trip_diffs(paths=None):
+    """
+    {relative path: [differences]} between read_table() and pd.read_csv on the
+    same CSV (HXL tag row skipped): columns, row count, missing cells and
+    values. Empty when every file reads back the same.
+    """
+    diffs = {}
+    for path in list_sources() if paths is None else paths:
+        _, hxl = hxl_csv.sniff(path)
+        expected = pd.read_csv(path, skiprows=[1] if hxl else None, encoding='utf-8-sig')
+        got = read_table(path)
+        problems = []
+        if list(got.columns) != list(expected.columns):
+            problems.append(f'columns {list(got.columns)} != {list(expected.columns)}')
+        elif len(got) != len(expected):
+            problems.append(f'{len(got)} rows != {len(expected)}')
+        else:
+            for col in expected.columns:
+                missing = expected[col].isna().to_numpy()
+                if not (got[col].isna().to_numpy() == missing).all():
+                    problems.append(f'{col}: missing cells differ')
+                elif not _same_values(got[col][~missing], expected[col][~missing]):
+                    problems.append(f'{col}: values differ')
+        if problems:
+            diffs[_rel(path)] = problems
+    return diffs
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Build the Arrow data store from data/ and models/ CSVs.')
+    parser.add_argument('--force', action='store_true', help='rebuild every file, ignoring the manifest')
+    parser.add_argument('--check', action='store_true', help='then compare read_table() with pd.read_csv')
+    args = parser.parse_args()
+
+    built = build_store(force=args.force, verbose=True)
+    print(f'{len(built)} file(s) rebuilt → {STORE_DIR}')
+    if args.check:
+        diffs = round_trip_diffs()
+        for rel, problems in diffs.items():
+            print(f'  {rel}: ' + '; '.join(problems))
+        print(f'round trip: {len(list_sources()) - len(diffs)} of {len(list_sources())} file(s) match pd.read_csv')
+        sys.exit(1 if diffs else 0)
@@ -0,0 +1,85 @@
+"""Pooled, keep-alive HTTP client for all Databricks REST traffic.
+
+One `requests.Session` per server process, shared by every Streamlit session
+and worker thread, so Genie polls and any SQL-warehouse calls reuse warm TLS
+connections instead of handshaking on every request. The session carries the
+auth headers, a connection pool sized by DATABRICKS_POOL_SIZE, default
+timeouts, and a retry adapter for idempotent requests on transient 5xx and
+connection errors. 429/503 are deliberately left to callers so they can honour
+Retry-After against their own deadlines.
+"""
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DATABRICKS_HOST  = os.environ.get("DATABRICKS_HOST", "")
+DATABRICKS_TOKEN = os.environ.get("DATABRICKS_TOKEN", "")
+
+POOL_SIZE       = int(os.environ.get("DATABRICKS_POOL_SIZE", "16"))
+CONNECT_TIMEOUT = float(os.environ.get("DATABRICKS_CONNECT_TIMEOUT", "5"))
+READ_TIMEOUT    = float(os.environ.get("DATABRICKS_READ_TIMEOUT", "30"))
+MAX_RETRIES     = int(os.environ.get("DATABRICKS_HTTP_RETRIES", "3"))
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+
+
+def is_configured() -> bool:
+    return bool(DATABRICKS_HOST and DATABRICKS_TOKEN)
+
+
+def base_url() -> str:
+    """Workspace URL; accepts DATABRICKS_HOST with or without a scheme."""
+    host = DATABRICKS_HOST.strip().rstrip("/")
+    if host.startswith(("http://", "https://")):
+        return host
+    return f"https://{host}"
+
+
+def _build_session() -> requests.Session:
+    retry = Retry(
+        total=MAX_RETRIES,
+        connect=MAX_RETRIES,
+        read=MAX_RETRIES,
+        backoff_factor=0.3,
+        status_forcelist=(500, 502, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=False,  # 429/503 + Retry-After are handled by callers
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({
+        "Authorization": f"Bearer {DATABRICKS_TOKEN}",
+        "Content-Type": "application/json",
+    })
+    return session
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = _build_session()
+    return _SESSION
+
+
+def request(method: str, path: str, **kw) -> requests.Response:
+    """`method` against `base_url() + path` through the pooled session."""
+    kw.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    return get_session().request(method, f"{base_url()}{path}", **kw)
+
+
+def get(path: str, **kw) -> requests.Response:
+    return request("GET", path, **kw)
+
+
+def post(path: str, **kw) -> requests.Response:
+    return request("POST", path, **kw)
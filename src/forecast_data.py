@@ -0,0 +1,76 @@
+"""Model inputs for the 2026–2030 forecasts (port of models/ML_Forecasting.ipynb).
+
+`load_merged()` reads the HRP history and the country summary through hxl_csv
+and left-joins them on iso3, as the notebook does. forecast_features derives
+the engineered columns the XGBoost stage trains on. `funding_history()` gives
+the per-country annual requirement series the funding stage fits.
+
+The notebook also merged admin-1 COD population and global P-codes. Neither
+reaches a model: the population only backfilled Dependency Ratio where
+Total_Population was missing, and In Need is missing on exactly those rows.
+They are not loaded here.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+import hxl_csv
+from data_store import DATA_DIR
+from forecast_features import add_features
+
+HRP_PATH     = os.path.join(DATA_DIR, 'humanitarian-response-plans.csv')
+SUMMARY_PATH = os.path.join(DATA_DIR, 'country_level_summary (1).csv')
+
+FEATURES = ['year', 'Dependency Ratio', 'Population Velocity', 'Cost Inflation', 'Cost per Beneficiary']
+TARGETS  = ['In Need', 'revisedRequirements']
+
+TRAIN_END  = 2025                    # last year of history the models see
+HORIZON    = list(range(2026, 2031))
+MIN_POINTS = 3                       # shortest funding series worth fitting
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+
+def load_merged(hrp_path=HRP_PATH, summary_path=SUMMARY_PATH) -> pd.DataFrame:
+    """One row per HRP plan with the country summary columns joined on."""
+    hrp = hxl_csv.read_csv(hrp_path).rename(columns={'locations': 'iso3', 'years': 'year'})
+    # Multi-year plans ("2018 | 2019") don't parse and land on year 0, as in the notebook
+    hrp['year'] = pd.to_numeric(hrp['year'], errors='coerce').fillna(0).astype(int)
+    summary = hxl_csv.read_csv(summary_path).rename(columns={'Country ISO3': 'iso3'})
+    return hrp.merge(summary, on='iso3', how='left', suffixes=('', '_summary'))
+
+
+def load_features(hrp_path=HRP_PATH, summary_path=SUMMARY_PATH) -> pd.DataFrame:
+    """Merged frame with the engineered features (forecast_features.add_features)."""
+    return add_features(load_merged(hrp_path, summary_path))
+
+
+# ── Series ────────────────────────────────────────────────────────────────────
+
+def funding_history(df: pd.DataFrame, train_end=TRAIN_END, min_points=MIN_POINTS) -> pd.DataFrame:
+    """
+    Long (iso3, year, revisedRequirements) frame of annual totals up to
+    `train_end`, for every iso3 with at least `min_points` years, in iso3 order.
+    """
+    hist = (df[df['revisedRequirements'].notna() & (df['year'] <= train_end)]
+              .groupby(['iso3', 'year'], as_index=False)['revisedRequirements'].sum())
+    counts = hist.groupby('iso3')['year'].transform('size')
+    return hist[counts >= min_points].reset_index(drop=True)
+
+
+def future_features(df: pd.DataFrame, horizon=HORIZON) -> pd.DataFrame:
+    """Each country's last observed feature row, repeated for every horizon year."""
+    last = df.dropna(subset=['iso3']).groupby('iso3', sort=False).tail(1)
+    future = last.loc[last.index.repeat(len(horizon)), ['iso3'] + FEATURES[1:]].reset_index(drop=True)
+    future.insert(1, 'year', np.tile(np.asarray(horizon), len(last)))
+    return future
+
+
+def clean_iso3(value):
+    """Last non-empty part of a pipe-joined location list (" |  | NPL" → "NPL")."""
+    if isinstance(value, str):
+        parts = [p.strip() for p in value.split('|') if p.strip()]
+        if parts:
+            return parts[-1]
+    return value
@@ -0,0 +1,90 @@
+"""Engineered features for the needs models, built from native grouped operations.
+
+The notebook filled and differenced each country's history with per-group
+Python lambdas (`groupby('iso3')[col].transform(lambda x: x.ffill().bfill())`
+and a per-group rolling mean), so its cost grew with the number of groups.
+Here every step is a single grouped kernel over the whole frame. Rows are
+sorted by (iso3, year) and keyed by a categorical ISO3 code:
+
+    fills                 groupby().ffill() then groupby().bfill(), all columns at once
+    Population Velocity   YoY change of In Need (shift-based), 3-row mean over
+                          grouped shifts instead of groupby().rolling()
+    Lagged Requirements   groupby().shift(1)
+    Cost Inflation        YoY change of Cost per Beneficiary (shift-based)
+
+The output matches the lambda version value for value. Rows without an ISO3
+belong to no group and get NaN, as before, before the median / zero fills.
+
+    python benchmarks/bench_features.py     # lambda vs grouped, ×1 / ×10 / ×100 rows
+"""
+import numpy as np
+import pandas as pd
+
+FILLED = ['revisedRequirements', 'In Need', 'Targeted', 'Total_Population']
+FILL_STRATEGIES = {
+    'Dependency Ratio':     'median',
+    'Population Velocity':  0,
+    'Lagged Requirements':  0,
+    'Cost per Beneficiary': 'median',
+    'Cost Inflation':       0,
+}
+VELOCITY_WINDOW = 3
+
+
+def sort_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Copy of `df` sorted by (iso3, year) with a fresh RangeIndex."""
+    return df.sort_values(['iso3', 'year']).reset_index(drop=True)
+
+
+def _key(df):
+    iso3 = df['iso3']
+    return iso3 if isinstance(iso3.dtype, pd.CategoricalDtype) else iso3.astype('category')
+
+
+def _yoy(values, grouped_prev):
+    """Year-over-year change against the previous row of the same country."""
+    return values / grouped_prev - 1
+
+
+def _rolling_mean(values, key, window):
+    """
+    Trailing `window`-row mean within each group, skipping NaN (rolling(window,
+    min_periods=1).mean()), from grouped shifts: one kernel per lag instead of
+    per-group window bounds.
+    """
+    g = values.groupby(key, observed=True, sort=False)
+    lags = np.column_stack([g.shift(lag).to_numpy(dtype=float) for lag in range(window - 1, 0, -1)]
+                           + [values.to_numpy(dtype=float)])
+    count = (~np.isnan(lags)).sum(axis=1)
+    with np.errstate(invalid='ignore'):
+        mean = np.nansum(lags, axis=1) / count
+    # Rows without an ISO3 belong to no window
+    return pd.Series(np.where((count > 0) & key.notna().to_numpy(), mean, np.nan), index=values.index)
+
+
+def add_features(df: pd.DataFrame, presorted=False) -> pd.DataFrame:
+    """
+    Sorted copy of `df` with the engineered feature columns added. iso3 keeps
+    its dtype; pass a categorical iso3 to skip the conversion.
+    """
+    df = df.copy() if presorted else sort_frame(df)
+    key = _key(df)
+
+    filled = df[FILLED].apply(pd.to_numeric, errors='coerce').replace(0, np.nan)
+    filled = filled.groupby(key, observed=True).ffill().groupby(key, observed=True).bfill()
+    df[FILLED] = filled
+
+    g = df.groupby(key, observed=True, sort=False)
+    df['Dependency Ratio'] = df['In Need'] / df['Total_Population']
+
+    velocity = _yoy(df['In Need'], g['In Need'].shift(1))
+    df['Population Velocity'] = _rolling_mean(velocity, key, VELOCITY_WINDOW)
+    df['Lagged Requirements'] = g['revisedRequirements'].shift(1)
+
+    df['Cost per Beneficiary'] = (df['revisedRequirements'] / df['Targeted']).replace([np.inf, -np.inf], np.nan)
+    df['Cost Inflation'] = _yoy(df['Cost per Beneficiary'],
+                                df.groupby(key, observed=True, sort=False)['Cost per Beneficiary'].shift(1))
+
+    for col, strategy in FILL_STRATEGIES.items():
+        df[col] = df[col].fillna(df[col].median() if strategy == 'median' else strategy)
+    return df
@@ -1,31 +1,38 @@
 import streamlit as st
 import streamlit.components.v1 as components
 import pandas as pd
-import numpy as np
 import plotly.graph_objects as go
 
+import model_registry
+from forecast_store import get_store
 from utils import (
     FORECAST_COUNTRY_NAMES,
     _AXIS_BASE, _chart_layout,
     chart_caption, section_header,
-    load_forecast_data, load_high_risk_data,
+    load_backtest_by_country, load_backtest_by_year, load_backtest_summary,
+    load_forecast_data,
 )
 from styles import PIPELINE_CSS
 
+_WHAT_IF_YEARS = [2026, 2027, 2028, 2029, 2030]
+_BACKTEST_TARGETS = {'Requirements (USD)': 'revisedRequirements', 'People in Need': 'In Need'}
+_VARIANT_COLORS = ['#4ade80', '#38bdf8', '#a78bfa', '#f59e0b', '#ef4444', '#f97316', '#34d399', '#60a5fa']
+
 
 # ── Chart builders ─────────────────────────────────────────────────────────────
 
-def _build_chart_f(df_risk):
-    """Top countries by projected funding gap — 2026, colored by funding type."""
-    df_2026 = df_risk[df_risk['year'] == 2026].copy()
+def _first_year_risk(store):
+    """(first horizon year, its risk rows); no rows gives an empty frame."""
+    year = store['years'][0]
+    return year, store['risk_by_year'].get(year, store['risk'].iloc[:0])
 
-    df_2026['Funding_Category'] = np.where(
-        df_2026['Predicted_Funding'] < 0, 'Funding Collapse',
-        np.where(df_2026['Predicted_Funding'] == 0, 'No Coverage Data', 'Underfunded')
-    )
 
-    neg   = df_2026[df_2026['Predicted_Funding'] < 0].nlargest(8, 'Funding_Gap')
-    pos   = df_2026[df_2026['Predicted_Funding'] > 0].nlargest(7, 'Funding_Gap')
+def _build_chart_f(store):
+    """Top countries by projected funding gap in the first horizon year, colored by funding type."""
+    year, df_year = _first_year_risk(store)
+
+    neg   = df_year[df_year['Predicted_Funding'] < 0].nlargest(8, 'Funding_Gap')
+    pos   = df_year[df_year['Predicted_Funding'] > 0].nlargest(7, 'Funding_Gap')
     top15 = pd.concat([neg, pos]).sort_values('Funding_Gap', ascending=True)
 
     cat_colors = {
@@ -67,7 +74,7 @@ def _build_chart_f(df_risk):
         ))
 
     layout = _chart_layout(
-        title='Projected Funding Gap by Country — 2026',
+        title=f'Projected Funding Gap by Country — {year}',
         height=420,
         xaxis=dict(**_AXIS_BASE, title='Funding Gap (USD Billion)'),
         yaxis=dict(**{**_AXIS_BASE, 'tickfont': dict(family='Space Mono, monospace', color='#e2e8f0', size=12)}, title=''),
@@ -81,23 +88,17 @@ def _build_chart_f(df_risk):
     return fig
 
 
-def _build_chart_g(df_forecast):
-    """Funding trajectory 2026-2030 for selected high-risk countries."""
+def _build_chart_g(store):
+    """Funding trajectory over the horizon for selected high-risk countries."""
     REQUIREMENTS_M = 567.35
+    countries = store['countries']
+    years     = store['years']
 
-    collapse_isos = (
-        df_forecast[df_forecast['Predicted_Funding'] < 0]
-        .groupby('iso3')['Predicted_Funding'].min()
-        .nsmallest(5).index.tolist()
-    )
-    positive_isos = (
-        df_forecast[df_forecast['Predicted_Funding'] > 100e6]
-        .groupby('iso3')['Predicted_Funding'].mean()
-        .nlargest(4).index.tolist()
-    )
+    # Deepest collapses, and the best-funded countries that stay above $100M every year
+    collapse_isos = countries.loc[countries['min_funding'] < 0, 'min_funding'].nsmallest(5).index.tolist()
+    positive_isos = countries.loc[countries['min_funding'] > 100e6, 'mean_funding'].nlargest(4).index.tolist()
 
     selected = collapse_isos + positive_isos
-    df_sel   = df_forecast[df_forecast['iso3'].isin(selected)]
 
     palette_collapse = ['#ef4444', '#f97316', '#fb923c', '#fbbf24', '#a78bfa']
     palette_positive = ['#4ade80', '#34d399', '#38bdf8', '#60a5fa']
@@ -105,8 +106,8 @@ def _build_chart_g(df_forecast):
     fig = go.Figure()
 
     fig.add_trace(go.Scatter(
-        x=[2026, 2027, 2028, 2029, 2030],
-        y=[REQUIREMENTS_M] * 5,
+        x=years,
+        y=[REQUIREMENTS_M] * len(years),
         mode='lines',
         name='Required (XGBoost)',
         line=dict(color='rgba(74,222,128,0.55)', width=2, dash='dot'),
@@ -122,15 +123,15 @@ def _build_chart_g(df_forecast):
     )
 
     for i, iso3 in enumerate(selected):
-        sub = df_sel[df_sel['iso3'] == iso3].sort_values('year')
-        if sub.empty:
+        sub = store['series'].get(iso3)
+        if sub is None:
             continue
         name       = FORECAST_COUNTRY_NAMES.get(iso3, iso3)
         is_collapse = iso3 in collapse_isos
         color      = palette_collapse[i] if is_collapse else palette_positive[i - len(collapse_isos)]
 
         fig.add_trace(go.Scatter(
-            x=sub['year'],
+            x=sub.index,
             y=sub['Predicted_Funding'] / 1e6,
             mode='lines+markers',
             name=name,
@@ -144,7 +145,7 @@ def _build_chart_g(df_forecast):
         ))
 
     layout = _chart_layout(
-        title='Funding Trajectory Forecast — 2026 to 2030',
+        title=f'Funding Trajectory Forecast — {years[0]} to {years[-1]}',
         height=420,
         xaxis=dict(**_AXIS_BASE, title='Year', dtick=1, tickformat='d'),
         yaxis=dict(**_AXIS_BASE, title='Projected Funding (USD Million)'),
@@ -161,11 +162,200 @@ def _build_chart_g(df_forecast):
     return fig
 
 
+# ── What-if scenarios ──────────────────────────────────────────────────────────
+
+def _scenario_table(df_forecast, cpb_pct, dep_pct):
+    """Published forecast rows with needs re-scored under the scenario's feature changes."""
+    scale = {}
+    if cpb_pct:
+        scale['Cost per Beneficiary'] = 1 + cpb_pct / 100
+    if dep_pct:
+        scale['Dependency Ratio'] = 1 + dep_pct / 100
+    scenario = model_registry.what_if(scale).rename(columns={'iso3': 'iso3_original'})
+    df = df_forecast[['iso3_original', 'year', 'iso3', 'Country', 'Predicted_Funding']].merge(
+        scenario, on=['iso3_original', 'year'], how='inner')
+    df['Baseline_Risk'] = df['Baseline_Requirements'] > df['Predicted_Funding'] * 1.15
+    df['Risk_Flag'] = df['Predicted_Requirements'] > df['Predicted_Funding'] * 1.15
+    df['Change'] = df['Predicted_Requirements'] - df['Baseline_Requirements']
+    return df
+
+
+def _build_chart_h(df_year):
+    """Countries whose projected requirements move most under the scenario."""
+    top = df_year.reindex(df_year['Change'].abs().sort_values(ascending=False).index).head(12)
+    top = top.sort_values('Change', ascending=True)
+    colors = ['#ef4444' if c > 0 else '#4ade80' for c in top['Change']]
+    hover = [
+        f'<b>{country}</b><br>Baseline: ${base/1e6:,.0f}M<br>Scenario: ${new/1e6:,.0f}M<br>'
+        f'Change: {chg/1e6:+,.0f}M'
+        for country, base, new, chg in zip(
+            top['Country'], top['Baseline_Requirements'], top['Predicted_Requirements'], top['Change'])
+    ]
+    fig = go.Figure(go.Bar(
+        x=top['Change'] / 1e6,
+        y=top['Country'],
+        orientation='h',
+        marker=dict(color=colors, line=dict(width=0)),
+        hovertemplate='%{customdata}<extra></extra>',
+        customdata=hover,
+        showlegend=False,
+    ))
+    fig.update_layout(**_chart_layout(
+        title='Change in Projected Requirements vs Baseline',
+        height=420,
+        xaxis=dict(**_AXIS_BASE, title='Requirements Change (USD Million)'),
+        yaxis=dict(**{**_AXIS_BASE, 'tickfont': dict(family='Space Mono, monospace', color='#e2e8f0', size=12)}, title=''),
+    ))
+    return fig
+
+
+def _render_what_if(df_forecast):
+    section_header(
+        'CHART H — WHAT-IF SCENARIO',
+        'What If Delivery Costs or Needs Shift?',
+        'The XGBoost needs models behind this forecast are scored live for every country and year. '
+        'Adjust the cost of reaching each beneficiary or the share of the population in need, and '
+        'the projected requirements and neglect-risk flags update against the unchanged funding trends.',
+    )
+    if not model_registry.available():
+        chart_caption('What-if scoring needs the trained models in models/xgb/ — '
+                      'run <code>python src/model_registry.py train</code>.')
+        return
+
+    c1, c2, c3 = st.columns([2, 2, 1], gap='medium')
+    cpb_pct = c1.slider('Cost per Beneficiary change (%)', -50, 100, 0, step=5, key='whatif_cpb')
+    dep_pct = c2.slider('Dependency Ratio change (%)', -50, 50, 0, step=5, key='whatif_dep')
+    year = c3.selectbox('Year', _WHAT_IF_YEARS, key='whatif_year')
+
+    df = _scenario_table(df_forecast, cpb_pct, dep_pct)
+    df_year = df[df['year'] == year]
+    base_req, new_req = df_year['Baseline_Requirements'].sum(), df_year['Predicted_Requirements'].sum()
+    base_need, new_need = df_year['Baseline_In_Need'].sum(), df_year['Predicted_In_Need'].sum()
+
+    m1, m2, m3 = st.columns(3)
+    _stat_card(m1, f'REQUIREMENTS {year}', f'${new_req/1e9:.1f}B',
+               f'{(new_req / base_req - 1) * 100:+.1f}% vs baseline ${base_req/1e9:.1f}B')
+    _stat_card(m2, f'PEOPLE IN NEED {year}', f'{new_need/1e6:.1f}M',
+               f'{(new_need / base_need - 1) * 100:+.1f}% vs baseline {base_need/1e6:.1f}M')
+    _stat_card(m3, 'HIGH-NEGLECT COUNTRIES', str(int(df_year['Risk_Flag'].sum())),
+               f'baseline {int(df_year["Baseline_Risk"].sum())} in {year}')
+
+    st.plotly_chart(_build_chart_h(df_year), use_container_width=True, config={'displayModeBar': False})
+    chart_caption(
+        f'The 12 countries whose projected {year} requirements move most under this scenario (USD million). '
+        'Red = requirements rise, green = they fall. Funding trends are held at the published forecast.'
+    )
+
+
+# ── Backtest ───────────────────────────────────────────────────────────────────
+
+def _variant_label(df):
+    return df['stage'].str.capitalize() + ' · ' + df['variant']
+
+
+def _build_chart_i(df_year):
+    """Median absolute percentage error by target year, one line per model variant."""
+    fig = go.Figure()
+    for i, (label, sub) in enumerate(df_year.groupby('Variant', sort=True)):
+        color = _VARIANT_COLORS[i % len(_VARIANT_COLORS)]
+        fig.add_trace(go.Scatter(
+            x=sub['year'],
+            y=sub['MdAPE_pct'],
+            mode='lines+markers',
+            name=label,
+            line=dict(color=color, width=2),
+            marker=dict(size=5, color=color),
+            customdata=sub['points'],
+            hovertemplate=f'<b>{label}</b><br>Year: %{{x}}<br>MdAPE: %{{y:.1f}}%<br>'
+                          'Forecasts scored: %{customdata}<extra></extra>',
+        ))
+    fig.update_layout(**_chart_layout(
+        title='Backtest Error by Forecast Year',
+        height=400,
+        xaxis=dict(**_AXIS_BASE, title='Year', dtick=1, tickformat='d'),
+        yaxis=dict(**_AXIS_BASE, title='Median Absolute % Error'),
+        legend=dict(
+            orientation='v', yanchor='top', y=1, xanchor='left', x=1.02,
+            font=dict(family='Space Mono, monospace', color='#94a3b8', size=11),
+            bgcolor='rgba(10,14,26,0.5)',
+            bordercolor='rgba(74,222,128,0.1)',
+            borderwidth=1,
+        ),
+        margin=dict(l=12, r=170, t=52, b=16),
+    ))
+    return fig
+
+
+def _render_backtest():
+    section_header(
+        'CHART I — WALK-FORWARD BACKTEST',
+        'How Well Would These Models Have Forecast the Past?',
+        'Each funding engine and needs model variant is refitted on the history up to an origin year and '
+        'asked to forecast the next three years, for every origin from 2016 on, then compared with what '
+        'appeals actually recorded. Lower error is better; bias above zero means the model over-forecasts.',
+    )
+    summary = load_backtest_summary()
+    if summary.empty:
+        chart_caption('No backtest results yet — run <code>python src/backtest.py</code>.')
+        return
+
+    label = st.radio('Target', list(_BACKTEST_TARGETS), horizontal=True, key='backtest_target')
+    target = _BACKTEST_TARGETS[label]
+    money = target == 'revisedRequirements'
+    scale, unit = (1e6, '$M') if money else (1e3, 'K people')
+
+    table = summary[summary['target'] == target].assign(Variant=_variant_label)
+    table = table.sort_values('MdAPE_pct', kind='stable')
+    st.dataframe(pd.DataFrame({
+        'Model variant':      table['Variant'],
+        'Forecasts':          table['points'],
+        'MdAPE %':            table['MdAPE_pct'].round(1),
+        'Bias %':             table['Bias_pct'].round(1),
+        f'MAE ({unit})':      (table['MAE'] / scale).round(1),
+        f'RMSE ({unit})':     (table['RMSE'] / scale).round(1),
+    }), use_container_width=True, hide_index=True)
+
+    by_year = load_backtest_by_year()
+    by_year = by_year[by_year['target'] == target].assign(Variant=_variant_label)
+    st.plotly_chart(_build_chart_i(by_year), use_container_width=True, config={'displayModeBar': False})
+    chart_caption(
+        'Median absolute percentage error of every forecast that landed in each year, across all origins. '
+        'Funding engines forecast requirements totals directly; needs variants predict them from features.'
+    )
+
+    variant = st.selectbox('Countries for variant', table['Variant'].tolist(), key='backtest_variant')
+    by_country = load_backtest_by_country()
+    by_country = by_country[(by_country['target'] == target)
+                            & (_variant_label(by_country) == variant)]
+    worst = by_country.sort_values('MdAPE_pct', ascending=False, kind='stable').head(15)
+    st.dataframe(pd.DataFrame({
+        'Country':            worst['Country'],
+        'Forecasts':          worst['points'],
+        'MdAPE %':            worst['MdAPE_pct'].round(1),
+        'Bias %':             worst['Bias_pct'].round(1),
+        f'MAE ({unit})':      (worst['MAE'] / scale).round(1),
+    }), use_container_width=True, hide_index=True)
+    chart_caption(f'The 15 countries {variant} forecast least accurately, by median absolute % error.')
+
+
 # ── Page renderer ──────────────────────────────────────────────────────────────
 
+def _stat_card(col, label, value, sub):
+    col.markdown(
+        f'<div style="background:rgba(15,23,42,0.7);border:1px solid rgba(148,163,184,0.1);'
+        f'border-radius:6px;padding:1.1rem 1.3rem;border-left:2px solid rgba(74,222,128,0.5);">'
+        f"<p style=\"color:#4ade80;font-family:'Space Mono', monospace;font-size:0.67rem;"
+        f'letter-spacing:0.15em;text-transform:uppercase;margin:0 0 0.35rem 0;">{label}</p>'
+        f'<p style="color:#ffffff;font-size:1.8rem;font-weight:300;margin:0 0 0.2rem 0;line-height:1.1;">{value}</p>'
+        f"<p style=\"color:#475569;font-size:0.76rem;margin:0;font-family:'Space Mono', monospace;\">{sub}</p>"
+        f'</div>',
+        unsafe_allow_html=True,
+    )
+
+
 def render_forecast_page():
     df_forecast = load_forecast_data()
-    df_risk     = load_high_risk_data()
+    store       = get_store()
 
     st.markdown(
         '<div style="padding:1.2rem 0 0.75rem 0;">'
@@ -226,56 +416,52 @@ were the strongest drivers of financial requirements. Population Velocity had a
 </body></html>"""
         components.html(pipeline_html, height=310, scrolling=False)
 
-    total_countries  = df_forecast['iso3'].nunique()
-    high_risk_countries = df_risk['iso3'].nunique()
-    high_risk_instances = len(df_risk)
-    df_risk_2026     = df_risk[df_risk['year'] == 2026]
-    avg_gap_bn       = df_risk_2026[df_risk_2026['Predicted_Funding'] != 0]['Funding_Gap'].mean() / 1e9
+    total_countries  = len(store['countries'])
+    high_risk_countries = store['risk']['iso3'].nunique()
+    high_risk_instances = len(store['risk'])
+    first_year, df_risk_first = _first_year_risk(store)
+    last_year        = store['years'][-1]
+    avg_gap_bn       = df_risk_first[df_risk_first['Predicted_Funding'] != 0]['Funding_Gap'].mean() / 1e9
+    avg_gap_text     = '—' if pd.isna(avg_gap_bn) else f'${avg_gap_bn:.2f}B'
 
     s1, s2, s3, s4 = st.columns(4)
     for col, label, value, sub in [
         (s1, 'COUNTRIES FORECASTED', str(total_countries), 'unique country projections'),
         (s2, 'HIGH-NEGLECT COUNTRIES', str(high_risk_countries), 'flagged across all years'),
         (s3, 'RISK INSTANCES', str(high_risk_instances), 'country-year gaps > 15%'),
-        (s4, 'AVG FUNDING GAP 2026', f'${avg_gap_bn:.2f}B', 'among tracked countries'),
+        (s4, f'AVG FUNDING GAP {first_year}', avg_gap_text, 'among tracked countries'),
     ]:
-        col.markdown(
-            f'<div style="background:rgba(15,23,42,0.7);border:1px solid rgba(148,163,184,0.1);'
-            f'border-radius:6px;padding:1.1rem 1.3rem;border-left:2px solid rgba(74,222,128,0.5);">'
-            f"<p style=\"color:#4ade80;font-family:'Space Mono', monospace;font-size:0.67rem;"
-            f'letter-spacing:0.15em;text-transform:uppercase;margin:0 0 0.35rem 0;">{label}</p>'
-            f'<p style="color:#ffffff;font-size:1.8rem;font-weight:300;margin:0 0 0.2rem 0;line-height:1.1;">{value}</p>'
-            f"<p style=\"color:#475569;font-size:0.76rem;margin:0;font-family:'Space Mono', monospace;\">{sub}</p>"
-            f'</div>',
-            unsafe_allow_html=True,
-        )
+        _stat_card(col, label, value, sub)
 
     section_header(
         'CHART F + G — FORECAST ANALYSIS',
         'Where Will Funding Fail to Meet Need?',
-        'The left chart ranks countries by their projected 2026 funding gap — the difference between what '
+        f'The left chart ranks countries by their projected {first_year} funding gap — the difference between what '
         'demographics demand and what funding trends predict. Countries in '
         '<span style="color:#ef4444;">red</span> are experiencing a funding collapse: their '
         'historical trend has turned negative. The right chart shows how funding trajectories '
-        'evolve from 2026 to 2030 against the flat requirements line, revealing diverging crises.',
+        f'evolve from {first_year} to {last_year} against the flat requirements line, revealing diverging crises.',
     )
     col_f, col_g = st.columns(2, gap='medium')
     with col_f:
-        st.plotly_chart(_build_chart_f(df_risk), use_container_width=True, config={'displayModeBar': False})
+        st.plotly_chart(_build_chart_f(store), use_container_width=True, config={'displayModeBar': False})
         chart_caption(
-            'Top 15 high-neglect-risk countries in 2026, ordered by funding gap (USD billion). '
+            f'Top 15 high-neglect-risk countries in {first_year}, ordered by funding gap (USD billion). '
             'Red = Prophet modelled a declining/negative funding trend. '
             'Amber = funding exists but is structurally insufficient. Hover for exact figures.'
         )
     with col_g:
-        st.plotly_chart(_build_chart_g(df_forecast), use_container_width=True, config={'displayModeBar': False})
+        st.plotly_chart(_build_chart_g(store), use_container_width=True, config={'displayModeBar': False})
         chart_caption(
-            "Each line traces a country's projected funding (USD million) from 2026 to 2030. "
+            f"Each line traces a country's projected funding (USD million) from {first_year} to {last_year}. "
             'The dotted green line marks the $567M requirements threshold. '
             'Red/orange lines are falling into negative territory — funding is evaporating. '
             'Green/blue lines show positive but insufficient funding trends.'
         )
 
+    _render_what_if(df_forecast)
+    _render_backtest()
+
     st.markdown(
         '<div style="border-top:1px solid rgba(148,163,184,0.1);margin-top:1.5rem;padding:1.5rem 0 0.5rem 0;">'
         "<p style=\"color:#4ade80;font-family:'Space Mono', monospace;font-size:0.67rem;"
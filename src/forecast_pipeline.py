@@ -0,0 +1,139 @@
+"""End-to-end 2026–2030 forecast run (replaces running models/ML_Forecasting.ipynb).
+
+    funding   funding_forecast: per-country trend on revisedRequirements
+              (Prophet by default; FUNDING_ENGINE / --engine for a batch engine)
+    needs     XGBoost on the engineered features → Predicted_In_Need and
+              Predicted_Requirements for each country's last observed features
+    risk      Funding_Gap = Requirements − Funding; Risk_Flag when
+              Requirements > 1.15 × Funding
+
+Writes models/forecast_results_2026_2030.csv and the Risk_Flag subset,
+models/high_neglect_risk_2026_2030.csv, in the notebook's column layout. The
+forecast keeps the notebook's row order. The risk file has the same rows,
+largest gap first, but tied gaps stay in forecast order: the notebook's
+unstable sort left ties in an order no rerun can reproduce. Both files are
+swapped in together. The trained boosters go to the model registry
+(models/xgb/, see model_registry.py) for what-if scoring.
+
+    python src/forecast_pipeline.py              # FORECAST_WORKERS / FORECAST_TIMEOUT apply
+    python src/forecast_pipeline.py --workers 8
+    python src/forecast_pipeline.py --engine bayes     # seconds, no Stan
+"""
+import os
+import time
+
+import numpy as np
+
+import forecast_data
+import model_registry
+from data_store import ROOT_DIR
+from funding_forecast import ENGINE, ENGINES, TIMEOUT, WORKERS, forecast_funding
+
+MODELS_DIR    = os.path.join(ROOT_DIR, 'models')
+FORECAST_PATH = os.path.join(MODELS_DIR, 'forecast_results_2026_2030.csv')
+RISK_PATH     = os.path.join(MODELS_DIR, 'high_neglect_risk_2026_2030.csv')
+
+RISK_MARGIN = 1.15
+
+
+# ── Needs stage ───────────────────────────────────────────────────────────────
+
+def forecast_needs(future, models):
+    """(iso3, year, Predicted_In_Need, Predicted_Requirements) for the `future` feature rows."""
+    return future[['iso3', 'year']].assign(**model_registry.predict(future, models))
+
+
+# ── Assembly ──────────────────────────────────────────────────────────────────
+
+def assemble(needs, funding):
+    """Forecast table in the published column layout: one row per needs row."""
+    out = needs.merge(funding, on=['iso3', 'year'], how='left')
+    out['Predicted_Funding'] = out['Predicted_Funding'].fillna(0)
+    out['iso3_original'] = out['iso3']
+    out['iso3'] = out['iso3'].map(forecast_data.clean_iso3)
+    out['Funding_Gap'] = out['Predicted_Requirements'] - out['Predicted_Funding']
+    out['Risk_Flag'] = out['Predicted_Requirements'] > out['Predicted_Funding'] * RISK_MARGIN
+    return out[['iso3', 'year', 'Predicted_In_Need', 'Predicted_Requirements',
+                'Predicted_Funding', 'iso3_original', 'Funding_Gap', 'Risk_Flag']]
+
+
+def risk_table(forecast):
+    """Risk_Flag rows, largest gap first; ties keep forecast order."""
+    return forecast[forecast['Risk_Flag']].sort_values('Funding_Gap', ascending=False, kind='stable')
+
+
+def _float32_text(s):
+    """float32 predictions as their shortest decimal (1715579136 → 1715579100.0), as published."""
+    return s.astype(np.float32).astype(str).astype(float)
+
+
+def _write(outputs):
+    tmps = {path: f'{path}.tmp' for path in outputs}
+    try:
+        for path, df in outputs.items():
+            df.assign(**{c: _float32_text(df[c]) for c in model_registry.PREDICTIONS.values()}
+                      ).to_csv(tmps[path], index=False)
+    except Exception:
+        for tmp in tmps.values():
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    for path, tmp in tmps.items():
+        os.replace(tmp, path)
+
+
+# ── Entry point ───────────────────────────────────────────────────────────────
+
+def run(workers=WORKERS, timeout=TIMEOUT, forecast_path=FORECAST_PATH, risk_path=RISK_PATH,
+        validate=False, engine=ENGINE, save_models=True, log=print):
+    """Fit both stages, write the forecast and risk CSVs and return a run summary."""
+    t0 = time.perf_counter()
+    df = forecast_data.load_features()
+
+    # Funding first: the worker pool is started before XGBoost spins up its threads
+    funding, failed = forecast_funding(forecast_data.funding_history(df), engine=engine,
+                                       workers=workers, timeout=timeout)
+    t_funding = time.perf_counter() - t0
+    for iso3, error in failed.items():
+        log(f'  funding failed for {iso3!r}: {error}')
+
+    models = model_registry.train(df)
+    future = forecast_data.future_features(df)
+    forecast = assemble(forecast_needs(future, models), funding)
+    risk = risk_table(forecast)
+    _write({forecast_path: forecast, risk_path: risk})
+
+    summary = {
+        'engine':           engine,
+        'countries':        int(forecast['iso3_original'].nunique()),
+        'funded_countries': int(funding['iso3'].nunique()),
+        'failed':           failed,
+        'rows':             len(forecast),
+        'risk_rows':        len(risk),
+        'funding_seconds':  round(t_funding, 3),
+        'seconds':          round(time.perf_counter() - t0, 3),
+    }
+    if validate:
+        summary['validation_rmse'] = model_registry.validate(df)
+    if save_models:
+        model_registry.save(models, future, df, {'funding_engine': engine,
+                                                 'validation_rmse': summary.get('validation_rmse')})
+    return summary
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Fit the 2026–2030 funding and needs forecasts.')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Prophet worker processes (1 = serial)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds per country Prophet fit')
+    parser.add_argument('--engine', choices=ENGINES, default=ENGINE, help='funding engine')
+    parser.add_argument('--validate', action='store_true', help='also report the 2020–2025 validation RMSE')
+    args = parser.parse_args()
+
+    s = run(args.workers, args.timeout, validate=args.validate, engine=args.engine)
+    print(f"{s['rows']} forecast rows ({s['funded_countries']} of {s['countries']} countries with a "
+          f"funding trend) in {s['seconds']} s; {s['engine']} funding stage {s['funding_seconds']} s")
+    print(f"{s['risk_rows']} high-neglect-risk rows")
+    for target, rmse in s.get('validation_rmse', {}).items():
+        print(f'  validation RMSE {target}: {rmse:,.0f}')
@@ -0,0 +1,79 @@
+"""Indexed, read-only forecast store behind the Forecast page.
+
+The page's charts used to re-filter the whole forecast frame on every rerun:
+a year mask for the 2026 risk ranking, a groupby min / mean to choose the
+countries to trace, and one iso3 mask per trace. `build()` does that work once
+per forecast and keeps the answers as lookups:
+
+    frame         forecast rows indexed by (iso3, year), sorted
+    countries     one row per iso3: Country, min_funding, mean_funding, risk_years
+    gaps          Funding_Gap as an iso3 × year table
+    series        {iso3: that country's rows indexed by year}
+    risk          the published Risk_Flag rows, largest gap first, with Funding_Category
+    risk_by_year  {year: those rows for one year, in the same order}
+    years         horizon years present in the forecast
+
+Nothing here is tied to 2026–2030: the years come from the data, so a longer
+horizon needs no change. Each scenario is a store of its own, built from the
+registry views its STORES loaders return and shared process-wide like the
+registry's frames. `get_store()` is the published forecast.
+
+    store = get_store()
+    store['countries'].at['AGO', 'min_funding']
+    store['series']['AGO']['Predicted_Funding']
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils import load_forecast_data, load_high_risk_data
+
+INDEX = ['iso3', 'year']
+
+# Store name → (forecast loader, risk loader); the utils loaders register their datasets
+STORES = {'baseline': (load_forecast_data, load_high_risk_data)}
+
+
+def funding_category(funding):
+    """Funding Collapse (negative trend), No Coverage Data (no trend) or Underfunded."""
+    return np.where(funding < 0, 'Funding Collapse', np.where(funding == 0, 'No Coverage Data', 'Underfunded'))
+
+
+def build(forecast, risk):
+    """Store dict (see module docstring) over a forecast table and its risk rows."""
+    frame = forecast.set_index(INDEX, verify_integrity=True).sort_index()
+    by_iso3 = frame.groupby(level='iso3', sort=False)
+    countries = pd.DataFrame({
+        'Country':      by_iso3['Country'].first(),
+        'min_funding':  by_iso3['Predicted_Funding'].min(),
+        'mean_funding': by_iso3['Predicted_Funding'].mean(),
+    })
+    countries['risk_years'] = risk['iso3'].value_counts().reindex(countries.index, fill_value=0)
+    risk = risk.assign(Funding_Category=funding_category(risk['Predicted_Funding']))
+    return {
+        'frame':        frame,
+        'countries':    countries,
+        'gaps':         frame['Funding_Gap'].unstack('year'),
+        'series':       {iso3: rows.droplevel('iso3') for iso3, rows in by_iso3},
+        'risk':         risk,
+        'risk_by_year': {year: rows for year, rows in risk.groupby('year', sort=True)},
+        'years':        frame.index.get_level_values('year').unique().sort_values().tolist(),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def _shared(name):
+    if name not in STORES:
+        raise KeyError(f"Unknown forecast store '{name}'. Defined: {sorted(STORES)}")
+    load_forecast, load_risk = STORES[name]
+    return build(load_forecast(), load_risk())
+
+
+def get_store(name='baseline'):
+    """The shared store `name`, built once per process. Treat it as read-only."""
+    return _shared(name)
+
+
+def clear():
+    """Drop every shared store; the next get_store() call rebuilds it."""
+    _shared.clear()
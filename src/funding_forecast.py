@@ -0,0 +1,169 @@
+"""Stage 1 of the forecasts: per-country funding trends, behind pluggable engines.
+
+    prophet   one Prophet model per country on a process pool (default; the
+              published forecasts)
+    bayes     Bayesian linear trend, all countries at once  (funding_batch)
+    damped    damped-trend smoothing, all countries at once (funding_batch)
+
+FUNDING_ENGINE picks the default. Every engine returns the same
+(iso3, year, Predicted_Funding) rows in input country order. The batch engines
+refit everything in milliseconds, so they suit interactive regeneration;
+`python benchmarks/bench_funding_engines.py` compares their speed and backtest
+error against Prophet.
+
+For Prophet, each country's annual requirement series (forecast_data.funding_history) is
+fitted by its own trend-only Prophet model and projected over the horizon.
+The fits are independent, so `forecast_funding()` fans them out to a pool of
+worker processes. Each worker imports Prophet once and then fits countries
+until the queue is empty.
+
+    workers    FORECAST_WORKERS (default: CPU count); 1 fits in-process
+    timeouts   FORECAST_TIMEOUT seconds per country, enforced by cmdstan, which
+               kills the optimiser; the country is reported as failed
+    failures   an exception or a crashed worker fails only that country
+    ordering   rows come back in input country order, whatever order the
+               workers finish in
+
+    python src/funding_forecast.py --workers 8
+    python src/funding_forecast.py --engine damped
+"""
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from forecast_data import HORIZON
+from funding_batch import BATCH_ENGINES, forecast_batch
+
+ENGINE  = os.environ.get('FUNDING_ENGINE', 'prophet')
+WORKERS = int(os.environ.get('FORECAST_WORKERS', '0')) or os.cpu_count() or 1
+TIMEOUT = float(os.environ.get('FORECAST_TIMEOUT', '60'))
+
+COLUMNS = ['iso3', 'year', 'Predicted_Funding']
+
+
+# ── Per-country fit ───────────────────────────────────────────────────────────
+
+def _init_worker():
+    """Import Prophet once per worker (not per fit) and silence its per-fit logging."""
+    import cmdstanpy.utils
+    import prophet  # noqa: F401
+
+    # cmdstanpy configures its logger on first use, which would undo a plain setLevel
+    cmdstanpy.utils.get_logger().setLevel(logging.ERROR)
+    logging.getLogger('prophet').setLevel(logging.ERROR)
+
+
+def fit_prophet(iso3, years, values, horizon=HORIZON, timeout=TIMEOUT):
+    """[Predicted_Funding per horizon year] from one country's annual series."""
+    from prophet import Prophet
+
+    history = pd.DataFrame({'ds': pd.to_datetime(list(years), format='%Y'), 'y': list(values)})
+    model = Prophet(daily_seasonality=False, weekly_seasonality=False, yearly_seasonality=False)
+    model.fit(history, timeout=timeout)
+    future = pd.DataFrame({'ds': pd.to_datetime(list(horizon), format='%Y')})
+    return model.predict(future)['yhat'].tolist()
+
+
+def _task(iso3, years, values, horizon, timeout):
+    """(iso3, predictions or None, error or None) — never raises."""
+    try:
+        return iso3, fit_prophet(iso3, years, values, horizon, timeout), None
+    except Exception as e:  # noqa: BLE001 — one bad series must not sink the run
+        return iso3, None, f'{type(e).__name__}: {e}'
+
+
+# ── Runner ────────────────────────────────────────────────────────────────────
+
+def _series(history):
+    return [(iso3, g['year'].tolist(), g['revisedRequirements'].tolist())
+            for iso3, g in history.groupby('iso3', sort=False)]
+
+
+def _run_pool(series, horizon, workers, timeout):
+    """{iso3: (predictions, error)}; countries lost to a crashed pool come back as None."""
+    # spawn: the caller may hold threads (Streamlit, XGBoost's OpenMP pool)
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+    with ProcessPoolExecutor(max_workers=min(workers, len(series)), mp_context=ctx,
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(_task, iso3, years, values, horizon, timeout): iso3
+                   for iso3, years, values in series}
+        for future, iso3 in futures.items():
+            try:
+                results[iso3] = future.result()[1:]
+            except BrokenProcessPool:
+                results[iso3] = None
+    return results
+
+
+def forecast_prophet(history, horizon=HORIZON, workers=WORKERS, timeout=TIMEOUT):
+    """
+    Fit every country in `history` (iso3, year, revisedRequirements).
+    Returns (DataFrame of COLUMNS in input country order, {iso3: error}).
+    """
+    series = _series(history)
+    horizon = list(horizon)
+
+    if workers <= 1 or len(series) <= 1:
+        _init_worker()
+        results = {iso3: _task(iso3, years, values, horizon, timeout)[1:]
+                   for iso3, years, values in series}
+    else:
+        results = _run_pool(series, horizon, workers, timeout)
+        # A dead worker breaks the whole pool: retry those countries one per
+        # fresh worker so only the one that crashes is lost
+        for s in [s for s in series if results[s[0]] is None]:
+            results[s[0]] = _run_pool([s], horizon, 1, timeout)[s[0]] or (None, 'worker crashed')
+
+    rows, failures = [], {}
+    for iso3, _, _ in series:
+        preds, error = results[iso3]
+        if error is not None:
+            failures[iso3] = error
+            continue
+        rows.extend(zip([iso3] * len(horizon), horizon, preds))
+    return pd.DataFrame(rows, columns=COLUMNS), failures
+
+
+# ── Engines ───────────────────────────────────────────────────────────────────
+
+ENGINES = ['prophet'] + list(BATCH_ENGINES)
+
+
+def forecast_funding(history, horizon=HORIZON, engine=None, workers=WORKERS, timeout=TIMEOUT):
+    """
+    Funding forecasts for every country in `history` with `engine` (default
+    FUNDING_ENGINE). Returns (DataFrame of COLUMNS, {iso3: error}). workers and
+    timeout only apply to Prophet.
+    """
+    engine = engine or ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f'unknown funding engine {engine!r}; choose from {ENGINES}')
+    if engine == 'prophet':
+        return forecast_prophet(history, horizon, workers, timeout)
+    return forecast_batch(history, horizon, engine), {}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    import forecast_data
+
+    parser = argparse.ArgumentParser(description='Fit the per-country funding forecasts.')
+    parser.add_argument('--engine', choices=ENGINES, default=ENGINE, help='funding engine')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='worker processes (1 = serial)')
+    parser.add_argument('--timeout', type=float, default=TIMEOUT, help='seconds per country fit')
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    history = forecast_data.funding_history(forecast_data.load_features())
+    funding, failed = forecast_funding(history, engine=args.engine, workers=args.workers, timeout=args.timeout)
+    print(f"{funding['iso3'].nunique()} countries forecast with {args.engine} in "
+          f'{time.perf_counter() - t0:.2f} s')
+    for iso3, error in failed.items():
+        print(f'  failed {iso3!r}: {error}')
@@ -0,0 +1,422 @@
+"""Databricks Genie API helpers and background job runner.
+
+Genie answers take seconds to minutes, so calls never run on the Streamlit
+script thread. `submit_message()` records the user's message plus a pending
+bot bubble in the session state and hands the start/poll cycle to a
+process-wide thread pool; `collect_finished()` swaps finished answers into the
+history on a later rerun. Nothing here touches Streamlit, so the same code path
+can be driven from scripts and load tests with a plain dict as session state.
+"""
+import html as _h
+import io
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+
+import pandas as pd
+
+import databricks_client
+import genie_cache
+
+# ── Databricks Genie Configuration ────────────────────────────────────────────
+# Host, token and the pooled HTTP session live in databricks_client.py
+GENIE_SPACE_ID = os.environ.get("GENIE_SPACE_ID", "")
+
+# Worker threads shared by every session on this server process
+GENIE_MAX_WORKERS = int(os.environ.get("GENIE_MAX_WORKERS", "8"))
+_EXECUTOR = ThreadPoolExecutor(max_workers=GENIE_MAX_WORKERS, thread_name_prefix="genie")
+
+# Table attachments: rows shown inline in the chat bubble, and how many full
+# result frames each session keeps for the results panel
+TABLE_PREVIEW_ROWS = int(os.environ.get("GENIE_TABLE_PREVIEW_ROWS", "10"))
+GENIE_MAX_TABLES   = int(os.environ.get("GENIE_MAX_TABLES", "20"))
+
+
+# ── Polling policy ────────────────────────────────────────────────────────────
+# Fast first poll, then exponential backoff with ± jitter, capped per poll and
+# bounded by an overall deadline. Every knob can be overridden from the env.
+
+POLL_POLICY = {
+    "first_delay": float(os.environ.get("GENIE_POLL_FIRST_DELAY", "0.3")),
+    "base_delay":  float(os.environ.get("GENIE_POLL_BASE_DELAY", "0.6")),
+    "multiplier":  float(os.environ.get("GENIE_POLL_MULTIPLIER", "1.6")),
+    "max_delay":   float(os.environ.get("GENIE_POLL_MAX_DELAY", "6.0")),
+    "jitter":      float(os.environ.get("GENIE_POLL_JITTER", "0.2")),
+    "deadline":    float(os.environ.get("GENIE_POLL_DEADLINE", "180")),
+}
+
+_THROTTLE_STATUSES = (429, 503)
+
+
+def _poll_delays(policy):
+    """Yield successive sleep intervals: first_delay, then jittered backoff."""
+    yield policy["first_delay"]
+    delay = policy["base_delay"]
+    while True:
+        j = policy["jitter"]
+        yield delay * random.uniform(1 - j, 1 + j)
+        delay = min(delay * policy["multiplier"], policy["max_delay"])
+
+
+def _retry_after(resp, fallback: float) -> float:
+    """Seconds requested by a Retry-After header (delta or HTTP date)."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return fallback
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return fallback
+
+
+def _request(method, path, deadline: float, **kw):
+    """Pooled API call that waits out 429/503 throttling (honouring Retry-After) until the deadline."""
+    while True:
+        r = databricks_client.request(method, path, **kw)
+        if r.status_code not in _THROTTLE_STATUSES:
+            r.raise_for_status()
+            return r
+        wait = _retry_after(r, POLL_POLICY["base_delay"])
+        if time.monotonic() + wait >= deadline:
+            r.raise_for_status()
+        time.sleep(wait)
+
+
+# ── Poll metrics ──────────────────────────────────────────────────────────────
+# One record per answer: time to first content (first poll that shows
+# attachments, or completion), total time, and number of polls.
+
+_METRICS = deque(maxlen=int(os.environ.get("GENIE_METRICS_WINDOW", "500")))
+_METRICS_LOCK = threading.Lock()
+
+
+def _record_metrics(rec: dict):
+    with _METRICS_LOCK:
+        _METRICS.append(rec)
+
+
+def _pct(values, q):
+    if not values:
+        return None
+    vals = sorted(values)
+    return vals[min(len(vals) - 1, int(round(q * (len(vals) - 1))))]
+
+
+def poll_metrics() -> dict:
+    """Summary of recent answers: count, ttft / total p50-p95 (s), polls mean / p95."""
+    with _METRICS_LOCK:
+        recs = list(_METRICS)
+    ttft  = [r["ttft_s"] for r in recs if r["ttft_s"] is not None]
+    total = [r["total_s"] for r in recs]
+    polls = [r["polls"] for r in recs]
+    return {
+        "answers":    len(recs),
+        "failed":     sum(1 for r in recs if r["status"] != "COMPLETED"),
+        "ttft_p50":   _pct(ttft, 0.50),
+        "ttft_p95":   _pct(ttft, 0.95),
+        "total_p50":  _pct(total, 0.50),
+        "total_p95":  _pct(total, 0.95),
+        "polls_mean": (sum(polls) / len(polls)) if polls else None,
+        "polls_p95":  _pct(polls, 0.95),
+    }
+
+
+# ── Genie Python-side API helpers ─────────────────────────────────────────────
+
+def _genie_call(message: str, conversation_id, cache_key=None, opening=None):
+    """
+    Call the Databricks Genie API from Python (server-side, no CORS).
+    Returns (completed_message: dict, conversation_id: str); rendering happens
+    in collect_finished() so table attachments can be held in session state.
+    When `cache_key` is given the COMPLETED message is stored in genie_cache.
+    When `opening` is given (a question this session had answered from the
+    cache), it first opens a new conversation with it so `message` keeps its
+    context.
+    """
+    if not databricks_client.is_configured() or not GENIE_SPACE_ID:
+        raise ValueError("Databricks credentials not configured. Check your .env file.")
+    if conversation_id is None and opening is not None:
+        _, conversation_id = _genie_call(opening, None)
+
+    base = f"/api/2.0/genie/spaces/{GENIE_SPACE_ID}"
+    started  = time.monotonic()
+    deadline = started + POLL_POLICY["deadline"]
+
+    if conversation_id is None:
+        # POST .../start-conversation → { conversation: {id}, message: {id, status} }
+        r = _request("POST", f"{base}/start-conversation", deadline,
+                     json={"content": message})
+        d = r.json()
+        conversation_id = d["conversation"]["id"]
+        msg_id = d["message"]["id"]
+    else:
+        # POST .../conversations/{id}/messages → message object {id, status}
+        r = _request("POST", f"{base}/conversations/{conversation_id}/messages", deadline,
+                     json={"content": message})
+        d = r.json()
+        msg_id = d["id"]
+
+    # Poll GET .../messages/{msg_id} until COMPLETED, backing off between polls
+    poll_url = f"{base}/conversations/{conversation_id}/messages/{msg_id}"
+    polls, ttft, status = 0, None, "TIMEOUT"
+    try:
+        for delay in _poll_delays(POLL_POLICY):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            time.sleep(min(delay, remaining))
+            m = _request("GET", poll_url, deadline).json()
+            polls += 1
+            status = m["status"]
+            if ttft is None and (m.get("attachments") or status == "COMPLETED"):
+                ttft = time.monotonic() - started
+            if status == "COMPLETED":
+                if cache_key:
+                    genie_cache.put(cache_key, m)
+                return m, conversation_id
+            if status in ("FAILED", "CANCELLED"):
+                raise RuntimeError(m.get("error") or "Genie processing failed.")
+    finally:
+        _record_metrics({
+            "ttft_s": ttft, "total_s": time.monotonic() - started,
+            "polls": polls, "status": status,
+        })
+
+    raise TimeoutError(f"Genie timed out after {POLL_POLICY['deadline']:.0f} seconds. Please retry.")
+
+
+def _parse_genie_resp(msg: dict, tables=None) -> str:
+    """
+    Convert a COMPLETED Genie message's attachments into display HTML.
+    When `tables` (a dict) is given, each table attachment is converted once into
+    a DataFrame and stored there under a new id; the bubble only shows a preview
+    page and points at the paginated results panel for the rest.
+    """
+    attachments = msg.get("attachments") or []
+    if not attachments:
+        return ("I analyzed your query but found no results. "
+                "Try asking about a specific country, sector, or funding metric.")
+
+    parts = []
+    for att in attachments:
+        # ── Text answer ──────────────────────────────────────────────────────
+        text_content = (att.get("text") or {}).get("content")
+        if text_content:
+            parts.append(_h.escape(text_content).replace("\n", "<br>"))
+
+        # ── Generated SQL / query description ────────────────────────────────
+        query = att.get("query") or {}
+        if query.get("description"):
+            parts.append(f'<em>&#128202;&nbsp;{_h.escape(query["description"])}</em>')
+        if query.get("query"):
+            parts.append(f'<div class="sqlblk">{_h.escape(query["query"])}</div>')
+
+        # ── Table data ────────────────────────────────────────────────────────
+        table = att.get("table")
+        if table:
+            df = _table_to_frame(table)
+            if df is None:
+                continue
+            table_id = None
+            if tables is not None:
+                table_id = _new_id()
+                tables[table_id] = {"df": df, "title": query.get("description") or "Genie result"}
+                while len(tables) > GENIE_MAX_TABLES:
+                    tables.pop(next(iter(tables)))
+            parts.append(_table_to_html(df, table_id))
+
+    return "<br>".join(parts) if parts else "Analysis complete."
+
+
+def _table_to_frame(tbl):
+    """Genie table attachment → DataFrame with numeric columns coerced, or None."""
+    try:
+        cols = tbl.get("columns") or []
+        rows = tbl.get("rows") or []
+        if not cols or not rows:
+            return None
+
+        col_names = [
+            c.get("name", str(c)) if isinstance(c, dict) else str(c)
+            for c in cols
+        ]
+        records = []
+        for row in rows:
+            if isinstance(row, dict):
+                vals = row.get("values") or list(row.values())
+            else:
+                vals = list(row) if hasattr(row, "__iter__") else [str(row)]
+            records.append(vals[:len(col_names)])
+
+        df = pd.DataFrame.from_records(records, columns=col_names)
+        for c in df.columns:
+            num = pd.to_numeric(df[c], errors="coerce")
+            if num.notna().sum() == df[c].notna().sum():
+                df[c] = num
+        return df
+    except Exception:
+        return None
+
+
+def _table_to_html(df, table_id=None) -> str:
+    """Styled HTML preview (first TABLE_PREVIEW_ROWS rows) of a Genie result frame."""
+    col_names = [str(c) for c in df.columns]
+    th = "".join(f"<th>{_h.escape(n)}</th>" for n in col_names)
+
+    preview = df.head(TABLE_PREVIEW_ROWS)
+    preview = preview.astype(object).where(preview.notna(), "")
+    tbody = "".join(
+        "<tr>" + "".join(f"<td>{_h.escape(str(v))}</td>" for v in row) + "</tr>"
+        for row in preview.itertuples(index=False, name=None)
+    )
+
+    extra = len(df) - len(preview)
+    if extra > 0 or table_id:
+        where = f"full result ({len(df):,} rows) in Genie Results" if table_id else f"{extra} more rows"
+        tbody += (
+            f'<tr><td colspan="{len(col_names)}" '
+            f'style="color:#64748b;text-align:center;font-size:0.68rem;">'
+            f"&hellip;&nbsp;{where}</td></tr>"
+        )
+
+    return (
+        '<div class="genie-tbl-wrap">'
+        '<table class="genie-tbl">'
+        f"<thead><tr>{th}</tr></thead>"
+        f"<tbody>{tbody}</tbody>"
+        "</table></div>"
+    )
+
+
+def export_table(tables, table_id, fmt: str):
+    """CSV or Parquet bytes of a held result table, built once and memoised."""
+    entry = tables[table_id]
+    key = f"_{fmt}"
+    if key not in entry:
+        if fmt == "csv":
+            entry[key] = entry["df"].to_csv(index=False).encode("utf-8")
+        elif fmt == "parquet":
+            buf = io.BytesIO()
+            try:
+                entry["df"].to_parquet(buf, index=False)
+            except ImportError:
+                return None
+            entry[key] = buf.getvalue()
+        else:
+            raise ValueError(f"Unsupported export format: {fmt}")
+    return entry[key]
+
+
+# ── Background jobs ───────────────────────────────────────────────────────────
+# Session-state keys:
+#   genie_history  list of {"id", "role", "html", "err", "pending"}
+#   genie_conv_id  conversation id for follow-up messages (None → new one)
+#   genie_jobs     {bot message id: {"future", "conv_id"}} for in-flight calls
+#   genie_tables   {table id: {"df", "title"}} full Genie result tables
+#   genie_opening  opening question answered from genie_cache, re-sent to open
+#                  a conversation when the user first follows up
+#   genie_cache_bypass  optional; truthy skips the answer cache for this session
+
+def _ensure_state(state):
+    if "genie_history" not in state:
+        state["genie_history"] = []
+    if "genie_conv_id" not in state:
+        state["genie_conv_id"] = None
+    if "genie_jobs" not in state:
+        state["genie_jobs"] = {}
+    if "genie_tables" not in state:
+        state["genie_tables"] = {}
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def submit_message(state, text: str) -> str:
+    """
+    Queue a user message without blocking.
+    Appends the user bubble and a bot bubble to the history and returns the bot
+    bubble's id. Conversation-opening questions already in genie_cache are
+    answered on the spot without opening a conversation; the first follow-up
+    re-sends that question to open one of this session's own, so it keeps the
+    context. Anything else gets a pending bubble while the Genie call runs on
+    the shared executor. Several messages may be in flight at once; a message
+    sent before the first answer has produced a conversation id starts its own
+    conversation.
+    """
+    _ensure_state(state)
+    state["genie_history"].append({
+        "id": _new_id(),
+        "role": "user",
+        "html": _h.escape(text).replace("\n", "<br>"),
+        "err": False,
+    })
+    bot_id = _new_id()
+    conv_id = state["genie_conv_id"]
+    opening = state.pop("genie_opening", None) if conv_id is None else None
+
+    # Follow-ups depend on conversation context, so only opening questions are cached
+    cache_key = None
+    if (conv_id is None and opening is None
+            and genie_cache.ENABLED and not state.get("genie_cache_bypass")):
+        cache_key = genie_cache.make_key(text, GENIE_SPACE_ID)
+        cached = genie_cache.get(cache_key)
+        if cached is not None:
+            state["genie_history"].append({
+                "id": bot_id, "role": "bot",
+                "html": _parse_genie_resp(cached, state["genie_tables"]),
+                "err": False, "cached": True,
+            })
+            # Conversations are per session: never adopt the one that filled the cache
+            state["genie_opening"] = text
+            return bot_id
+
+    state["genie_history"].append({
+        "id": bot_id, "role": "bot", "html": "", "err": False, "pending": True,
+    })
+    state["genie_jobs"][bot_id] = {
+        "future": _EXECUTOR.submit(_genie_call, text, conv_id, cache_key, opening),
+        "conv_id": conv_id,
+    }
+    return bot_id
+
+
+def has_pending(state) -> bool:
+    return bool(state.get("genie_jobs"))
+
+
+def collect_finished(state) -> bool:
+    """Move finished answers into the history. Returns True if anything changed."""
+    _ensure_state(state)
+    jobs = state["genie_jobs"]
+    done = [mid for mid, job in jobs.items() if job["future"].done()]
+    if not done:
+        return False
+
+    by_id = {m.get("id"): m for m in state["genie_history"]}
+    for mid in done:
+        job = jobs.pop(mid)
+        msg = by_id.get(mid)
+        if msg is None:
+            continue
+        msg["pending"] = False
+        try:
+            resp, conv_id = job["future"].result()
+        except Exception as exc:
+            msg["html"] = f"&#9888;&nbsp;{_h.escape(str(exc))}"
+            msg["err"] = True
+            continue
+        msg["html"] = _parse_genie_resp(resp, state["genie_tables"])
+        if state["genie_conv_id"] is None:
+            state["genie_conv_id"] = conv_id
+    return True
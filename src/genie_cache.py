@@ -0,0 +1,129 @@
+"""Answer cache for repeated Genie questions.
+
+Keys combine the normalised question, the Genie space id and the data snapshot
+version (data_store.snapshot_version()), so answers are reused across sessions
+until the underlying data changes. Values are the raw COMPLETED message dicts,
+which genie._parse_genie_resp renders exactly like a live answer.
+Conversations are never shared: a session served from the cache opens its own
+when it first follows up (see genie.submit_message).
+
+Entries expire after GENIE_CACHE_TTL seconds and the least recently used entry
+is evicted beyond GENIE_CACHE_MAX. Setting GENIE_CACHE_PATH persists the cache
+to a JSON file; GENIE_CACHE_ENABLED=0 bypasses it entirely.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+from data_store import snapshot_version
+
+ENABLED     = os.environ.get("GENIE_CACHE_ENABLED", "1").lower() not in ("0", "false", "no", "off")
+TTL_SECONDS = float(os.environ.get("GENIE_CACHE_TTL", "3600"))
+MAX_ENTRIES = int(os.environ.get("GENIE_CACHE_MAX", "256"))
+CACHE_PATH  = os.environ.get("GENIE_CACHE_PATH", "")
+
+_ENTRIES = OrderedDict()   # key → (stored_at, message dict)
+_LOCK = threading.Lock()
+_STATS = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+_LOADED = {"done": False}
+
+_PUNCT = re.compile(r"[^\w\s]+")
+_SPACE = re.compile(r"\s+")
+
+
+def normalise_question(text: str) -> str:
+    """Case-, width-, punctuation- and whitespace-insensitive form of a question."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _PUNCT.sub(" ", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def make_key(question: str, space_id: str) -> str:
+    raw = "\x1f".join((space_id, snapshot_version(), normalise_question(question)))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ── Disk persistence ──────────────────────────────────────────────────────────
+
+def _load_from_disk():
+    _LOADED["done"] = True
+    if not CACHE_PATH or not os.path.exists(CACHE_PATH):
+        return
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as fh:
+            items = json.load(fh)
+    except (OSError, ValueError):
+        return
+    now = time.time()
+    for key, stored_at, msg in items:
+        if now - stored_at < TTL_SECONDS:
+            _ENTRIES[key] = (stored_at, msg)
+    while len(_ENTRIES) > MAX_ENTRIES:
+        _ENTRIES.popitem(last=False)
+
+
+def _save_to_disk():
+    if not CACHE_PATH:
+        return
+    items = [[k, t, m] for k, (t, m) in _ENTRIES.items()]
+    tmp = f"{CACHE_PATH}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(CACHE_PATH)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(items, fh)
+        os.replace(tmp, CACHE_PATH)
+    except OSError:
+        pass
+
+
+# ── Public API ────────────────────────────────────────────────────────────────
+
+def get(key: str):
+    """Cached message dict for `key`, or None (counts a hit or a miss)."""
+    with _LOCK:
+        if not _LOADED["done"]:
+            _load_from_disk()
+        entry = _ENTRIES.get(key)
+        if entry is not None and time.time() - entry[0] >= TTL_SECONDS:
+            del _ENTRIES[key]
+            _STATS["expired"] += 1
+            entry = None
+        if entry is None:
+            _STATS["misses"] += 1
+            return None
+        _ENTRIES.move_to_end(key)
+        _STATS["hits"] += 1
+        return entry[1]
+
+
+def put(key: str, msg: dict):
+    with _LOCK:
+        if not _LOADED["done"]:
+            _load_from_disk()
+        _ENTRIES[key] = (time.time(), msg)
+        _ENTRIES.move_to_end(key)
+        while len(_ENTRIES) > MAX_ENTRIES:
+            _ENTRIES.popitem(last=False)
+            _STATS["evictions"] += 1
+        _save_to_disk()
+
+
+def clear():
+    with _LOCK:
+        _ENTRIES.clear()
+        _save_to_disk()
+
+
+def stats() -> dict:
+    """Hit/miss/eviction counters plus the current size and hit rate."""
+    with _LOCK:
+        out = dict(_STATS)
+        out["size"] = len(_ENTRIES)
+    lookups = out["hits"] + out["misses"]
+    out["hit_rate"] = (out["hits"] / lookups) if lookups else None
+    return out
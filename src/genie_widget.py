@@ -0,0 +1,496 @@
+"""Floating Genie chat widget: static assets plus an incremental update protocol.
+
+The widget lives in Streamlit's parent document, outside the app's React tree.
+Its CSS, markup and behaviour script are injected once per page lifetime. Every
+rerun after that sends only a small JSON delta built by `widget_script()`:
+the history messages whose id is new, or whose revision changed (for example a
+pending bubble that now holds its answer). The browser replaces nodes by
+`data-mid`, so rerun cost and flicker no longer grow with the conversation.
+
+Deltas are numbered. The loader applies a delta only on top of the one before
+it; after a fresh mount (page reload, widget DOM lost) or a skipped delta it
+submits a second hidden form, found by RESYNC_PLACEHOLDER and separate from
+the chat bridge, and main.py calls `reset_widget()` so the next render resends
+the assets and the whole history.
+"""
+import hashlib
+import json
+import zlib
+
+# ── CSS ───────────────────────────────────────────────────────────────────────
+GENIE_CSS = """
+  #genie-widget {
+    position: fixed;
+    bottom: 28px;
+    right: 28px;
+    z-index: 2147483647;
+    font-family: 'Space Mono', monospace;
+  }
+  #genie-toggle {
+    display: flex;
+    align-items: center;
+    gap: 10px;
+    background: linear-gradient(135deg, #0d1f0d 0%, #0a1a1f 100%);
+    border: 1.5px solid rgba(74,222,128,0.65);
+    border-radius: 34px;
+    padding: 14px 24px 14px 18px;
+    cursor: pointer;
+    color: #4ade80;
+    font-size: 0.9rem;
+    font-weight: 700;
+    letter-spacing: 0.13em;
+    text-transform: uppercase;
+    box-shadow: 0 0 28px rgba(74,222,128,0.25), 0 6px 28px rgba(0,0,0,0.7);
+    transition: all 0.25s ease;
+    user-select: none;
+    outline: none;
+  }
+  #genie-toggle:hover {
+    background: linear-gradient(135deg, #0f2a0f 0%, #0a2030 100%);
+    border-color: rgba(74,222,128,0.9);
+    box-shadow: 0 0 40px rgba(74,222,128,0.38), 0 8px 36px rgba(0,0,0,0.8);
+    transform: translateY(-2px);
+  }
+  .genie-btn-dot {
+    width: 10px; height: 10px; background: #4ade80; border-radius: 50%;
+    box-shadow: 0 0 9px #4ade80; animation: gpulse 2s infinite; flex-shrink: 0;
+  }
+  @keyframes gpulse {
+    0%, 100% { opacity: 1; transform: scale(1); }
+    50%       { opacity: 0.45; transform: scale(0.72); }
+  }
+  #genie-panel {
+    display: none; flex-direction: column;
+    width: 490px; height: 590px;
+    background: rgba(10,14,26,0.98);
+    border: 1px solid rgba(74,222,128,0.32); border-radius: 18px;
+    overflow: hidden;
+    box-shadow: 0 0 52px rgba(74,222,128,0.15), 0 28px 72px rgba(0,0,0,0.88);
+    margin-bottom: 16px; animation: gslide 0.28s ease; position: relative;
+  }
+  #genie-panel.open { display: flex; }
+  @keyframes gslide {
+    from { opacity: 0; transform: translateY(22px); }
+    to   { opacity: 1; transform: translateY(0); }
+  }
+  #genie-header {
+    display: flex; align-items: center; justify-content: space-between;
+    padding: 17px 19px 15px;
+    background: linear-gradient(135deg, rgba(13,20,36,0.99) 0%, rgba(10,26,20,0.99) 100%);
+    border-bottom: 1px solid rgba(74,222,128,0.18); flex-shrink: 0;
+  }
+  .ghdr-left { display: flex; align-items: center; gap: 12px; }
+  .gavatar {
+    width: 38px; height: 38px;
+    background: linear-gradient(135deg, #0d3321, #0a2030);
+    border: 1px solid rgba(74,222,128,0.55); border-radius: 10px;
+    display: flex; align-items: center; justify-content: center;
+    font-size: 19px; box-shadow: 0 0 14px rgba(74,222,128,0.24); flex-shrink: 0;
+  }
+  .gtname { color: #e2e8f0; font-size: 0.9rem; font-weight: 700; letter-spacing: 0.1em; display: block; }
+  .gtsub  { color: #4ade80; font-size: 0.68rem; letter-spacing: 0.07em; opacity: 0.82; display: block; margin-top: 1px; }
+  .ghdr-status { width: 8px; height: 8px; background: #4ade80; border-radius: 50%; box-shadow: 0 0 8px #4ade80; animation: gpulse 2s infinite; }
+  #genie-closebtn {
+    background: none; border: none; color: #475569; cursor: pointer;
+    font-size: 1.18rem; padding: 3px 7px; border-radius: 5px; line-height: 1;
+    transition: color 0.2s; outline: none; margin-left: 8px;
+  }
+  #genie-closebtn:hover { color: #e2e8f0; }
+  #genie-prompts {
+    display: flex; flex-wrap: wrap; gap: 7px; padding: 12px 17px;
+    border-bottom: 1px solid rgba(148,163,184,0.07); flex-shrink: 0;
+  }
+  .gchip {
+    background: rgba(74,222,128,0.07); border: 1px solid rgba(74,222,128,0.22);
+    border-radius: 22px; padding: 5px 12px; font-size: 0.67rem; color: #94a3b8;
+    cursor: pointer; letter-spacing: 0.04em; transition: all 0.2s; white-space: nowrap;
+    font-family: 'Space Mono', monospace;
+  }
+  .gchip:hover { background: rgba(74,222,128,0.15); border-color: rgba(74,222,128,0.52); color: #4ade80; }
+  #genie-messages {
+    flex: 1; overflow-y: auto; padding: 17px;
+    display: flex; flex-direction: column; gap: 14px;
+    scrollbar-width: thin; scrollbar-color: rgba(74,222,128,0.18) transparent;
+  }
+  #genie-messages::-webkit-scrollbar { width: 4px; }
+  #genie-messages::-webkit-scrollbar-track { background: transparent; }
+  #genie-messages::-webkit-scrollbar-thumb { background: rgba(74,222,128,0.2); border-radius: 2px; }
+  .gmsg { display: flex; gap: 9px; max-width: 93%; }
+  .gmsg.user { align-self: flex-end; flex-direction: row-reverse; }
+  .gmsg.bot  { align-self: flex-start; }
+  .gmsg-ico {
+    width: 27px; height: 27px; border-radius: 7px; flex-shrink: 0;
+    display: flex; align-items: center; justify-content: center;
+    font-size: 13px; margin-top: 2px;
+  }
+  .gmsg.bot  .gmsg-ico { background: linear-gradient(135deg,#0d3321,#0a2030); border: 1px solid rgba(74,222,128,0.38); color: #4ade80; }
+  .gmsg.user .gmsg-ico { background: rgba(74,222,128,0.13); border: 1px solid rgba(74,222,128,0.32); color: #4ade80; }
+  .gbubble { padding: 10px 14px; border-radius: 11px; font-size: 0.82rem; line-height: 1.58; max-width: 100%; word-break: break-word; }
+  .gmsg.bot  .gbubble { background: rgba(15,25,45,0.93); border: 1px solid rgba(74,222,128,0.12); color: #cbd5e1; }
+  .gmsg.user .gbubble { background: rgba(74,222,128,0.12); border: 1px solid rgba(74,222,128,0.26); color: #e2e8f0; }
+  .gbubble em { color: #4ade80; font-style: normal; font-size: 0.74rem; }
+  .gbubble .sqlblk {
+    background: rgba(0,0,0,0.45); border: 1px solid rgba(74,222,128,0.16); border-radius: 7px;
+    padding: 7px 10px; font-size: 0.71rem; color: #86efac; margin-top: 7px;
+    font-family: 'Space Mono', monospace; overflow-x: auto; white-space: pre-wrap;
+  }
+  .gbubble.gerr { background: rgba(239,68,68,0.1); border: 1px solid rgba(239,68,68,0.28); color: #fca5a5; }
+  .genie-tbl-wrap { overflow-x: auto; margin-top: 8px; border-radius: 7px; }
+  .genie-tbl { width: 100%; border-collapse: collapse; font-size: 0.72rem; }
+  .genie-tbl th { background: rgba(74,222,128,0.1); color: #4ade80; padding: 5px 9px; text-align: left; border-bottom: 1px solid rgba(74,222,128,0.2); white-space: nowrap; }
+  .genie-tbl td { color: #94a3b8; padding: 4px 9px; border-bottom: 1px solid rgba(148,163,184,0.07); }
+  .genie-tbl tr:hover td { background: rgba(74,222,128,0.04); }
+  #genie-typing { display: none; align-self: flex-start; align-items: center; gap: 9px; padding: 0 2px; }
+  #genie-typing.on { display: flex; }
+  .gdots { display: flex; gap: 5px; background: rgba(15,25,45,0.93); border: 1px solid rgba(74,222,128,0.12); border-radius: 11px; padding: 10px 15px; }
+  .gdot { width: 6px; height: 6px; background: #4ade80; border-radius: 50%; animation: gbounce 1.2s infinite; }
+  .gdot:nth-child(2) { animation-delay: 0.22s; }
+  .gdot:nth-child(3) { animation-delay: 0.44s; }
+  @keyframes gbounce {
+    0%,80%,100% { transform: translateY(0); opacity: 0.32; }
+    40%          { transform: translateY(-7px); opacity: 1; }
+  }
+  #genie-inputrow {
+    display: flex; align-items: center; gap: 9px; padding: 14px 17px;
+    border-top: 1px solid rgba(74,222,128,0.14); background: rgba(8,12,22,0.97); flex-shrink: 0;
+  }
+  #genie-input {
+    flex: 1; background: rgba(15,25,45,0.93); border: 1px solid rgba(74,222,128,0.23);
+    border-radius: 9px; padding: 10px 14px; color: #e2e8f0; font-size: 0.82rem;
+    font-family: 'Space Mono', monospace; outline: none; transition: border-color 0.2s;
+  }
+  #genie-input:focus { border-color: rgba(74,222,128,0.58); }
+  #genie-input::placeholder { color: #475569; }
+  #genie-input:disabled { opacity: 0.5; }
+  #genie-sendbtn {
+    width: 40px; height: 40px; background: linear-gradient(135deg, #166534, #0a2030);
+    border: 1px solid rgba(74,222,128,0.44); border-radius: 9px; cursor: pointer;
+    display: flex; align-items: center; justify-content: center;
+    flex-shrink: 0; transition: all 0.2s; color: #4ade80; outline: none;
+  }
+  #genie-sendbtn:hover { background: linear-gradient(135deg, #15803d, #0e3040); border-color: rgba(74,222,128,0.75); transform: scale(1.05); }
+  #genie-sendbtn:disabled { opacity: 0.36; cursor: not-allowed; transform: none; }
+"""
+
+# ── HTML ──────────────────────────────────────────────────────────────────────
+GENIE_HTML = """
+<div id="genie-widget">
+  <div id="genie-panel">
+    <div id="genie-header">
+      <div class="ghdr-left">
+        <div class="gavatar">&#9672;</div>
+        <div>
+          <span class="gtname">H2C2 GENIE</span>
+          <span class="gtsub">Powered by Databricks AI/BI</span>
+        </div>
+      </div>
+      <div style="display:flex;align-items:center;gap:7px;">
+        <div class="ghdr-status"></div>
+        <button id="genie-closebtn" title="Close">&#10005;</button>
+      </div>
+    </div>
+    <div id="genie-prompts">
+      <span class="gchip">Which regions are most underfunded?</span>
+      <span class="gchip">Top crisis countries by severity</span>
+      <span class="gchip">Funding gap forecast 2026</span>
+      <span class="gchip">High neglect risk countries</span>
+    </div>
+    <div id="genie-messages">
+      <div class="gmsg bot">
+        <div class="gmsg-ico">&#9672;</div>
+        <div class="gbubble">
+          Hello. I&apos;m Genie, your AI assistant for the Humanitarian Health Command Center.<br><br>
+          Ask me anything about crisis regions, funding gaps, severity scores, or forecasts &mdash; I&apos;ll query the live data for you.
+        </div>
+      </div>
+    </div>
+    <div id="genie-typing">
+      <div class="gmsg-ico" style="width:27px;height:27px;border-radius:7px;background:linear-gradient(135deg,#0d3321,#0a2030);border:1px solid rgba(74,222,128,0.38);display:flex;align-items:center;justify-content:center;font-size:13px;color:#4ade80;flex-shrink:0;margin-top:2px;">&#9672;</div>
+      <div class="gdots"><div class="gdot"></div><div class="gdot"></div><div class="gdot"></div></div>
+    </div>
+    <div id="genie-inputrow">
+      <input id="genie-input" type="text" placeholder="Ask about humanitarian data..." maxlength="500" />
+      <button id="genie-sendbtn" title="Send">
+        <svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.3" stroke-linecap="round" stroke-linejoin="round">
+          <line x1="22" y1="2" x2="11" y2="13"></line>
+          <polygon points="22 2 15 22 11 13 2 9 22 2"></polygon>
+        </svg>
+      </button>
+    </div>
+  </div>
+  <button id="genie-toggle">
+    <div class="genie-btn-dot"></div>
+    <svg width="18" height="18" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2.2" stroke-linecap="round" stroke-linejoin="round">
+      <path d="M21 15a2 2 0 0 1-2 2H7l-4 4V5a2 2 0 0 1 2-2h14a2 2 0 0 1 2 2z"></path>
+    </svg>
+    ASK GENIE
+  </button>
+</div>
+"""
+
+# ── JS: display only — no fetch calls, triggers hidden Streamlit form ─────────
+# Runs in the parent window's realm (injected as a <script> element), so its
+# listeners and timers survive the components iframe being replaced.
+GENIE_JS = """
+(function() {
+  var pDoc    = document;
+  var widget  = pDoc.getElementById('genie-widget');
+  var panel   = pDoc.getElementById('genie-panel');
+  var toggle  = pDoc.getElementById('genie-toggle');
+  var closeBtn= pDoc.getElementById('genie-closebtn');
+  var msgsEl  = pDoc.getElementById('genie-messages');
+  var typingEl= pDoc.getElementById('genie-typing');
+  var inputEl = pDoc.getElementById('genie-input');
+  var sendBtn = pDoc.getElementById('genie-sendbtn');
+  var chips   = pDoc.querySelectorAll('.gchip');
+
+  // Toggle
+  toggle.addEventListener('click', function() {
+    var isOpen = panel.classList.toggle('open');
+    if (isOpen) {
+      setTimeout(function(){ inputEl.focus(); }, 60);
+      setTimeout(function(){ msgsEl.scrollTop = msgsEl.scrollHeight; }, 30);
+    }
+  });
+  closeBtn.addEventListener('click', function() { panel.classList.remove('open'); });
+
+  // Chips
+  chips.forEach(function(chip) {
+    chip.addEventListener('click', function() {
+      inputEl.value = chip.textContent.trim();
+      panel.classList.add('open');
+      inputEl.focus();
+    });
+  });
+
+  // Send — passes message to Python via hidden Streamlit form
+  inputEl.addEventListener('keydown', function(e) {
+    if (e.key === 'Enter' && !e.shiftKey) { e.preventDefault(); triggerSend(); }
+  });
+  sendBtn.addEventListener('click', triggerSend);
+
+  function settle() {
+    msgsEl.querySelectorAll('[data-optimistic]').forEach(function(n) { n.remove(); });
+    typingEl.classList.remove('on');
+    inputEl.disabled = false;
+    sendBtn.disabled = false;
+  }
+
+  function triggerSend() {
+    var txt = inputEl.value.trim();
+    if (!txt) return;
+    inputEl.value = '';
+
+    // Optimistic: show user message + typing indicator until Python echoes it back
+    var userRow = pDoc.createElement('div');
+    userRow.className = 'gmsg user';
+    userRow.setAttribute('data-optimistic', '1');
+    userRow.innerHTML =
+      '<div class="gmsg-ico">&#9658;</div>' +
+      '<div class="gbubble">' + escHtml(txt) + '</div>';
+    msgsEl.appendChild(userRow);
+    typingEl.classList.add('on');
+    msgsEl.scrollTop = msgsEl.scrollHeight;
+
+    // Disable input while waiting
+    inputEl.disabled = true;
+    sendBtn.disabled = true;
+
+    // Find hidden Streamlit text input by placeholder
+    var hiddenInput = pDoc.querySelector('input[placeholder="__genie__"]');
+    if (!hiddenInput) {
+      settle();
+      var errRow = pDoc.createElement('div');
+      errRow.className = 'gmsg bot';
+      errRow.innerHTML = '<div class="gmsg-ico">&#9672;</div><div class="gbubble gerr">&#9888; Widget bridge not found. Please refresh the page.</div>';
+      msgsEl.appendChild(errRow);
+      return;
+    }
+
+    // Set value via React native setter (required for Streamlit React inputs)
+    var nativeSetter = Object.getOwnPropertyDescriptor(
+      window.HTMLInputElement.prototype, 'value'
+    ).set;
+    nativeSetter.call(hiddenInput, txt);
+    hiddenInput.dispatchEvent(new Event('input', { bubbles: true }));
+
+    // Walk up DOM to find the Streamlit form container and click its button
+    var el = hiddenInput;
+    while (el && !(el.getAttribute && el.getAttribute('data-testid') === 'stForm')) {
+      el = el.parentElement;
+    }
+    if (el) {
+      var btn = el.querySelector('button');
+      if (btn) btn.click();
+    }
+  }
+
+  function escHtml(s) {
+    return String(s)
+      .replace(/&/g,'&amp;').replace(/</g,'&lt;')
+      .replace(/>/g,'&gt;').replace(/"/g,'&quot;');
+  }
+
+  // Apply one delta from Python: {reset, visible, items: [{id, html}]}
+  function apply(delta) {
+    widget.style.display = delta.visible === false ? 'none' : '';
+    if (delta.reset) {
+      msgsEl.querySelectorAll('[data-mid]').forEach(function(n) { n.remove(); });
+    }
+    var items = delta.items || [];
+    if (!items.length) return;
+    settle();
+    var tmp = pDoc.createElement('div');
+    items.forEach(function(it) {
+      tmp.innerHTML = it.html;
+      var node = tmp.firstElementChild;
+      var existing = msgsEl.querySelector('[data-mid="' + it.id + '"]');
+      if (existing) existing.replaceWith(node);
+      else msgsEl.appendChild(node);
+    });
+    setTimeout(function(){ msgsEl.scrollTop = msgsEl.scrollHeight; }, 30);
+  }
+
+  window.__genieWidget = { apply: apply };
+})();
+"""
+
+ASSET_VERSION = hashlib.sha256((GENIE_CSS + GENIE_HTML + GENIE_JS).encode("utf-8")).hexdigest()[:12]
+
+# Placeholder of the hidden resync form's input; never part of a chat message
+RESYNC_PLACEHOLDER = "__genie_resync__"
+
+# Loader run inside the components iframe on every rerun. Injects the assets
+# when they are missing or from an older build, then hands over the delta if
+# it follows the last one applied; otherwise it asks Python for a resync.
+_LOADER = """<script>
+(function() {
+  var pWin = window.parent, pDoc = pWin.document;
+  var RESYNC = %s;
+  var payload = %s;
+  var a = payload.assets;
+
+  // Submit the hidden resync form (not the chat bridge: no message text involved)
+  function requestResync() {
+    if (pWin.__genieResyncFor === payload.seq) return;   // once per payload
+    var input = pDoc.querySelector('input[placeholder="' + RESYNC + '"]');
+    var form = input && input.closest('[data-testid="stForm"]');
+    var btn = form && form.querySelector('button');
+    if (!btn) return;
+    pWin.__genieResyncFor = payload.seq;
+    btn.click();
+  }
+
+  var w = pWin.__genieWidget;
+  if (a && (!w || w.version !== a.version || !pDoc.getElementById('genie-widget'))) {
+    var wasOpen = false;
+    var oldPanel = pDoc.getElementById('genie-panel');
+    if (oldPanel) wasOpen = oldPanel.classList.contains('open');
+    ['genie-widget', 'genie-widget-css', 'genie-widget-js'].forEach(function(id) {
+      var n = pDoc.getElementById(id);
+      if (n) n.remove();
+    });
+
+    var s = pDoc.createElement('style');
+    s.id = 'genie-widget-css';
+    s.textContent = a.css;
+    pDoc.head.appendChild(s);
+
+    var c = pDoc.createElement('div');
+    c.innerHTML = a.html;
+    pDoc.body.appendChild(c.firstElementChild);
+    if (wasOpen) pDoc.getElementById('genie-panel').classList.add('open');
+
+    var j = pDoc.createElement('script');
+    j.id = 'genie-widget-js';
+    j.textContent = a.js;
+    pDoc.body.appendChild(j);
+    if (pWin.__genieWidget) pWin.__genieWidget.version = a.version;
+  }
+  w = pDoc.getElementById('genie-widget') ? pWin.__genieWidget : null;
+  if (payload.visible === false) {
+    if (w) w.apply(payload);
+  } else if (!w) {
+    requestResync();                                  // fresh mount without assets
+  } else if (payload.reset || w.seq === payload.base) {
+    w.apply(payload);
+    w.seq = payload.seq;
+  } else if (w.seq === payload.seq) {
+    w.apply({ visible: payload.visible });            // same payload rendered again
+  } else {
+    w.apply({ visible: payload.visible });
+    requestResync();                                  // fresh mount or a skipped delta
+  }
+})();
+</script>"""
+
+
+# ── Messages ──────────────────────────────────────────────────────────────────
+
+def message_rev(msg: dict) -> str:
+    """Changes whenever a message's rendered bubble would change."""
+    crc = zlib.crc32(msg.get("html", "").encode("utf-8"))
+    return f"{int(bool(msg.get('pending')))}{int(bool(msg.get('err')))}:{crc:08x}"
+
+
+def render_message(msg: dict) -> str:
+    role      = msg.get("role", "bot")
+    err_class = " gerr" if msg.get("err") else ""
+    ico       = "&#9658;" if role == "user" else "&#9672;"
+    if msg.get("pending"):
+        bubble = '<div class="gdots"><div class="gdot"></div><div class="gdot"></div><div class="gdot"></div></div>'
+    else:
+        bubble = f'<div class="gbubble{err_class}">{msg.get("html", "")}</div>'
+    return (
+        f'<div class="gmsg {role}" data-mid="{msg["id"]}">'
+        f'<div class="gmsg-ico">{ico}</div>'
+        f'{bubble}'
+        f"</div>"
+    )
+
+
+def build_delta(history, revs: dict) -> list:
+    """Messages the browser hasn't seen at their current revision; updates `revs`."""
+    items = []
+    for msg in history:
+        rev = message_rev(msg)
+        if revs.get(msg["id"]) != rev:
+            revs[msg["id"]] = rev
+            items.append({"id": msg["id"], "html": render_message(msg)})
+    return items
+
+
+# ── Script ────────────────────────────────────────────────────────────────────
+# Session-state keys:
+#   genie_widget_revs  {message id: revision} already sent to this browser;
+#                      absent until the first render, which ships the assets
+#   genie_widget_seq   number of the last delta sent
+
+def reset_widget(state):
+    """Forget what the browser was sent; the next render resends everything."""
+    state.pop("genie_widget_revs", None)
+
+
+def widget_script(state, visible: bool = True) -> str:
+    """
+    Loader script for components.html. The first render in a session (or
+    after reset_widget) carries the assets and a reset; later renders carry
+    only changed messages, numbered so the browser can spot a gap. With
+    visible=False the widget is hidden (not removed), keeping its DOM and
+    listeners for the next chat page.
+    """
+    payload = {"visible": visible}
+    if visible:
+        revs = state.get("genie_widget_revs")
+        if revs is None:
+            revs = state["genie_widget_revs"] = {}
+            payload["reset"] = True
+            payload["assets"] = {
+                "version": ASSET_VERSION, "css": GENIE_CSS, "html": GENIE_HTML, "js": GENIE_JS,
+            }
+        payload["items"] = build_delta(state.get("genie_history", []), revs)
+        base = state.get("genie_widget_seq", 0)
+        payload["base"] = base
+        payload["seq"] = base + 1 if payload["items"] or payload.get("reset") else base
+        state["genie_widget_seq"] = payload["seq"]
+    return _LOADER % (json.dumps(RESYNC_PLACEHOLDER), json.dumps(payload).replace("</", "<\\/"))
@@ -0,0 +1,220 @@
+"""Self-hosted globe.gl library and earth textures.
+
+`vendor_assets()` downloads the files the globes used to pull from unpkg on
+every iframe load, stores them under src/static/globe/ with content-hashed
+names, and writes smaller texture variants for the lower quality settings.
+Streamlit serves that folder at app/static/ once `server.enableStaticServing`
+is on (see .streamlit/config.toml). Hashed names never change content, so
+browsers and any proxy in front of the app can cache them indefinitely.
+
+At render time `script_tag()` and `texture_url()` return the local URL when
+the asset has been vendored, and the original CDN URL otherwise.
+GLOBE_TEXTURE_QUALITY picks the texture variant (high / medium / low).
+GLOBE_OFFLINE=1 never references the CDN, so field offices without internet
+access fail fast on a local 404 instead of waiting on an unreachable host.
+
+    python src/globe_assets.py            # vendor / refresh
+    python src/globe_assets.py --force    # re-download everything
+"""
+import hashlib
+import io
+import json
+import os
+import time
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+SRC_DIR       = os.path.dirname(os.path.abspath(__file__))
+GLOBE_DIR     = os.path.join(SRC_DIR, 'static', 'globe')
+MANIFEST_PATH = os.path.join(GLOBE_DIR, 'manifest.json')
+URL_PREFIX    = 'app/static/globe/'
+
+QUALITY = os.environ.get('GLOBE_TEXTURE_QUALITY', 'medium').lower()
+OFFLINE = os.environ.get('GLOBE_OFFLINE', '0').lower() in ('1', 'true', 'yes', 'on')
+
+QUALITIES = ('high', 'medium', 'low')
+
+# name → (CDN url, local file extension)
+SOURCES = {
+    'globe.gl':          ('https://unpkg.com/globe.gl@2.30.0/dist/globe.gl.min.js', '.min.js'),
+    'earth-blue-marble': ('https://unpkg.com/three-globe/example/img/earth-blue-marble.jpg', '.jpg'),
+    'earth-topology':    ('https://unpkg.com/three-globe/example/img/earth-topology.png', '.png'),
+}
+
+# Texture variants per quality: (format, max width, encoder quality).
+# 'high' is always the original file.
+VARIANTS = {
+    'earth-blue-marble': {
+        'medium': ('WEBP', 2048, 80),
+        'low':    ('JPEG', 1024, 70),
+    },
+    'earth-topology': {
+        'medium': ('JPEG', 1024, 85),
+        'low':    ('JPEG', 512, 80),
+    },
+}
+
+_EXT = {'WEBP': '.webp', 'JPEG': '.jpg', 'PNG': '.png'}
+
+
+# ── Manifest ──────────────────────────────────────────────────────────────────
+
+_MANIFEST = {'mtime': None, 'data': {}}
+
+
+def load_manifest():
+    """{} until vendor_assets() has run; re-read whenever the file changes."""
+    try:
+        mtime = os.stat(MANIFEST_PATH).st_mtime_ns
+    except OSError:
+        return {}
+    if _MANIFEST['mtime'] != mtime:
+        with open(MANIFEST_PATH, encoding='utf-8') as fh:
+            _MANIFEST['data'] = json.load(fh)
+        _MANIFEST['mtime'] = mtime
+    return _MANIFEST['data']
+
+
+def assets_version():
+    """Digest of the vendored set plus settings; part of the globe HTML cache key."""
+    files = load_manifest().get('files', {})
+    raw = json.dumps([files, QUALITY, OFFLINE], sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12]
+
+
+# ── URLs ──────────────────────────────────────────────────────────────────────
+
+def _local_url(name, quality):
+    variants = load_manifest().get('files', {}).get(name, {})
+    # Requested quality, else the next better one that was vendored
+    order = QUALITIES[:QUALITIES.index(quality) + 1][::-1] if quality in QUALITIES else QUALITIES
+    for q in order:
+        entry = variants.get(q)
+        if entry:
+            return f"{URL_PREFIX}{entry['file']}"
+    return None
+
+
+def asset_url(name, quality='high'):
+    """Local static URL for a vendored asset, else its CDN URL (unless offline)."""
+    local = _local_url(name, quality)
+    if local:
+        return local
+    cdn, ext = SOURCES[name]
+    if OFFLINE:
+        # Not vendored: point at the unhashed local path so the failure is immediate
+        return f'{URL_PREFIX}{name}{ext}'
+    return cdn
+
+
+def texture_url(name):
+    return asset_url(name, QUALITY)
+
+
+def script_tag():
+    """<script> for globe.gl, falling back to the CDN if the local copy fails to load."""
+    src = asset_url('globe.gl')
+    cdn = SOURCES['globe.gl'][0]
+    if src == cdn or OFFLINE:
+        return f'<script src="{src}"></script>'
+    return (
+        f'<script src="{src}"></script>\n'
+        f'<script>window.Globe || document.write(\'<script src="{cdn}"><\\/script>\');</script>'
+    )
+
+
+# ── Vendoring ─────────────────────────────────────────────────────────────────
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _write_atomic(path, data):
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _store(name, suffix, data):
+    """Write `data` under a content-hashed name; returns its manifest entry."""
+    digest = _digest(data)
+    fname = f'{name}.{digest[:12]}{suffix}'
+    path = os.path.join(GLOBE_DIR, fname)
+    if not os.path.exists(path):
+        _write_atomic(path, data)
+    return {'file': fname, 'sha256': digest, 'bytes': len(data)}
+
+
+def _variant(data, fmt, width, quality):
+    img = Image.open(io.BytesIO(data))
+    if img.width > width:
+        img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+    if fmt == 'JPEG' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    buf = io.BytesIO()
+    img.save(buf, fmt, quality=quality, optimize=True)
+    return buf.getvalue()
+
+
+def vendor_assets(force=False, verbose=False):
+    """Download every source, store hashed copies and texture variants, write the manifest."""
+    import requests
+
+    os.makedirs(GLOBE_DIR, exist_ok=True)
+    old = load_manifest().get('files', {})
+    files = {}
+
+    for name, (url, ext) in SOURCES.items():
+        high = old.get(name, {}).get('high')
+        cached = high and os.path.join(GLOBE_DIR, high['file'])
+        if not force and cached and os.path.exists(cached):
+            with open(cached, 'rb') as fh:
+                data = fh.read()
+        else:
+            resp = requests.get(url, timeout=60)
+            resp.raise_for_status()
+            data = resp.content
+        files[name] = {'high': _store(name, ext, data)}
+
+        if Image is None:
+            if verbose and name in VARIANTS:
+                print(f'  {name}: Pillow not installed, skipping texture variants')
+            continue
+        for quality, (fmt, width, q) in VARIANTS.get(name, {}).items():
+            files[name][quality] = _store(name, f'.{quality}{_EXT[fmt]}', _variant(data, fmt, width, q))
+
+        if verbose:
+            sizes = ', '.join(f"{q} {e['bytes'] / 1024:.0f} KB" for q, e in files[name].items())
+            print(f'  {name}: {sizes}')
+
+    # Remove hashed files no longer referenced
+    live = {e['file'] for variants in files.values() for e in variants.values()}
+    for fname in os.listdir(GLOBE_DIR):
+        if fname != 'manifest.json' and fname not in live:
+            os.remove(os.path.join(GLOBE_DIR, fname))
+
+    manifest = {
+        'files':     files,
+        'sources':   {name: url for name, (url, _) in SOURCES.items()},
+        'built_at':  time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    tmp = f'{MANIFEST_PATH}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, MANIFEST_PATH)
+    return manifest
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Vendor globe.gl and earth textures into src/static/globe/.')
+    parser.add_argument('--force', action='store_true', help='re-download every asset')
+    args = parser.parse_args()
+
+    vendor_assets(force=args.force, verbose=True)
+    print(f'manifest → {MANIFEST_PATH}')
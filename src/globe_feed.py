@@ -0,0 +1,100 @@
+"""Viewport-driven point feed for the dashboard globe.
+
+`crisis_globe()` renders the globe through a declared Streamlit component
+(src/globe_component/index.html). The component hosts the feed-mode document
+from health_regions.create_globe_html, so no data is baked into the HTML.
+The globe reports its viewport and the tiles it already holds; each rerun
+answers with the next bounded batch of missing tiles for that view:
+
+    countries   the country layer, always
+    1/<r>/<c>   thinned admin-1 units of one grid cell (mid zoom)
+    2/<r>/<c>   every admin-1 unit of one grid cell (close zoom)
+
+Tiles come from admin1_layer's grid index, nearest to the view centre first.
+A batch stops at GLOBE_FEED_BATCH points; the globe asks again for the rest.
+"""
+import os
+from functools import lru_cache
+
+import streamlit as st
+import streamlit.components.v1 as components
+
+import admin1_layer
+from data_store import snapshot_version
+from health_regions import create_globe_html, crisis_points, generate_sample_entities, globe_html_version
+
+COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'globe_component')
+MAX_BATCH_POINTS = int(os.environ.get('GLOBE_FEED_BATCH', '400'))
+
+COUNTRY_TILE = 'countries'
+
+_component = components.declare_component('crisis_globe', path=COMPONENT_DIR)
+
+
+# ── Tiles ─────────────────────────────────────────────────────────────────────
+
+@lru_cache(maxsize=2048)
+def _tile_points(tile_id, version):
+    if tile_id == COUNTRY_TILE:
+        return crisis_points(generate_sample_entities())
+    return crisis_points(admin1_layer.tile_entities(tile_id))
+
+
+def tile_points(tile_id) -> list:
+    """Point records of one tile (memoised per data version)."""
+    return _tile_points(tile_id, snapshot_version())
+
+
+def next_batch(view, loaded, limit=MAX_BATCH_POINTS):
+    """
+    ([{"id", "points"}], more) — the next tiles `view` needs that aren't in
+    `loaded`, up to `limit` points. A single tile larger than the limit is
+    still sent on its own so the feed always makes progress.
+    """
+    wanted = [COUNTRY_TILE] + admin1_layer.tiles_for_view(view)
+    batch, n = [], 0
+    for tile_id in wanted:
+        if tile_id in loaded:
+            continue
+        points = tile_points(tile_id)
+        if batch and n + len(points) > limit:
+            return batch, True
+        batch.append({'id': tile_id, 'points': points})
+        n += len(points)
+    return batch, False
+
+
+# ── Component ─────────────────────────────────────────────────────────────────
+# Session-state keys (per component key):
+#   <key>        component value: {"etag", "seq", "lat", "lng", "altitude", "loaded"}
+#   <key>_sent   {"seq", "tiles"} tiles sent since the globe's last report
+
+def crisis_globe(theme_colors, fly_to=None, key='crisis_globe', height=800, performance=False):
+    """
+    Dashboard globe fed by viewport. `fly_to` = (lat, lng, altitude) moves
+    the camera whenever it changes; `performance` selects the reduced-cost
+    document. Returns the last reported viewport.
+    """
+    value = st.session_state.get(key) or {}
+    etag = globe_html_version(theme_colors, feed=True, performance=performance)
+
+    args = {'etag': etag, 'height': height}
+    if fly_to is not None:
+        args['fly_to'] = {'lat': fly_to[0], 'lng': fly_to[1], 'altitude': fly_to[2]}
+
+    sent = st.session_state.get(f'{key}_sent')
+    if value.get('etag') != etag:
+        # Fresh document in the browser: it holds no tiles yet
+        args['doc'] = create_globe_html(theme_colors, feed=True, performance=performance)
+        sent = {'seq': None, 'tiles': set()}
+    elif sent is None or sent['seq'] != value.get('seq'):
+        # New report from the globe: trust its list (it may have evicted tiles)
+        sent = {'seq': value.get('seq'), 'tiles': set(value.get('loaded') or [])}
+
+    if value.get('etag') == etag and 'lat' in value:
+        view = (value['lat'], value['lng'], value['altitude'])
+        args['tiles'], args['more'] = next_batch(view, sent['tiles'])
+        sent['tiles'].update(t['id'] for t in args['tiles'])
+    st.session_state[f'{key}_sent'] = sent
+
+    return _component(key=key, default=None, **args)
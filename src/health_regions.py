@@ -1,9 +1,14 @@
+import hashlib
+import json
 import os
 
-import streamlit as st
 import streamlit.components.v1 as components
+import numpy as np
 import pandas as pd
 
+import globe_assets
+from data_store import read_table, snapshot_version
+from registry import dataset, get_dataset
 from styles import get_globe_button_css
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
@@ -38,84 +43,100 @@ _SEVERITY_NUM = {'Critical': 5, 'High': 4, 'Medium': 3, 'Low': 2}
 _SEVERITY_COLORS = {5: '#ef4444', 4: '#f59e0b', 3: '#3b82f6', 2: '#4ade80'}
 
 
-def _infer_quartile(severity_score: float) -> str:
-    """Assign severity quartile from the raw severity score for rows where
-    the metrics CSV has no Severity Quartile (missing population data)."""
-    if severity_score >= 2.0:
-        return 'Critical'
-    if severity_score >= 0.8:
-        return 'High'
-    if severity_score >= 0.3:
-        return 'Medium'
-    return 'Low'
+# Same data as a join table for the vectorised entity pipeline
+_COORDS = (pd.DataFrame.from_dict(_ISO3_COORDS, orient='index', columns=['lat', 'lon', 'name'])
+           .rename_axis('Country ISO3').reset_index())
 
 
-def _fmt_millions(n: float) -> str:
-    if n >= 1e6:
-        return f"{n / 1e6:.1f}M"
-    return f"{n / 1e3:.0f}K"
+def _infer_quartile(severity_score):
+    """Assign severity quartile from the raw severity score for rows where
+    the metrics CSV has no Severity Quartile (missing population data)."""
+    score = np.asarray(severity_score, dtype=float)
+    return np.select(
+        [score >= 2.0, score >= 0.8, score >= 0.3],
+        ['Critical', 'High', 'Medium'],
+        default='Low',
+    )
 
 
-@st.cache_data
-def generate_sample_entities() -> pd.DataFrame:
-    summary  = pd.read_csv(os.path.join(DATA_DIR, 'country_level_summary (1).csv'))
-    metrics  = pd.read_csv(os.path.join(DATA_DIR, 'humanitarian_analysis_country_metrics.csv'))
+def _fmt_millions(n) -> np.ndarray:
+    n = np.asarray(n, dtype=float)
+    out = np.empty(n.shape, dtype=object)
+    big = n >= 1e6
+    out[big]  = np.char.mod('%.1fM', n[big] / 1e6)
+    out[~big] = np.char.mod('%.0fK', n[~big] / 1e3)
+    return out
+
+
+def build_entities(summary: pd.DataFrame, metrics: pd.DataFrame, coords: pd.DataFrame = _COORDS) -> pd.DataFrame:
+    """
+    Globe entities from a country (or admin-unit) summary, its metrics and a
+    coordinate table keyed by 'Country ISO3'. Units without coordinates are
+    dropped. Sorted Critical → Low, then by name.
+    """
+    df = (summary.merge(metrics[['Country ISO3', 'Severity Quartile', 'Mismatch Score']],
+                        on='Country ISO3', how='left')
+                 .merge(coords, on='Country ISO3', how='inner'))
+
+    sev_score = df['Severity_Score'].to_numpy(dtype=float)
+
+    # Severity quartile — use metrics value, fall back to inferred
+    quartile = df['Severity Quartile'].astype(object)
+    quartile = np.where(quartile.notna().to_numpy(), quartile.to_numpy(), _infer_quartile(sev_score))
+    severity = pd.Series(quartile).map(_SEVERITY_NUM).fillna(3).astype(int).to_numpy()
+
+    # Targeting coverage %
+    in_need  = df['In Need'].to_numpy(dtype=float)
+    targeted = df['Targeted'].fillna(0.0).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fund = np.where(in_need > 0, np.round(targeted / in_need * 100, 1), 0.0)
+
+    # Mismatch score (HVI proxy); derive for rows where it's missing
+    mismatch = df['Mismatch Score'].to_numpy(dtype=float)
+    hvi = np.round(np.select([~np.isnan(mismatch)], [mismatch], default=np.minimum(sev_score / 4.0, 1.0)), 2)
+
+    in_need_fmt = _fmt_millions(in_need)
+    out = pd.DataFrame({
+        'name':      df['name'].to_numpy(),
+        'iso3':      df['Country ISO3'].to_numpy(),
+        'severity':  severity,
+        'sev_label': quartile,
+        'lat':       df['lat'].to_numpy(),
+        'lon':       df['lon'].to_numpy(),
+        'hvi':       hvi,
+        'fund':      fund,
+        'in_need':   in_need_fmt,
+        # 'projects' kept for backward compat with the sidebar badge
+        'projects':  in_need_fmt,
+    })
+    # Sort: Critical → High → Medium → Low, then alphabetically
+    order = np.lexsort((out['name'].to_numpy(), -out['severity'].to_numpy()))
+    return out.iloc[order].reset_index(drop=True)
 
-    # Keep only the columns we need from metrics
-    metrics = metrics[['Country ISO3', 'Severity Quartile', 'Mismatch Score']].copy()
 
-    df = summary.merge(metrics, on='Country ISO3', how='left')
+@dataset('entities')
+def _sample_entities() -> pd.DataFrame:
+    summary = read_table(os.path.join(DATA_DIR, 'country_level_summary (1).csv'))
+    metrics = read_table(os.path.join(DATA_DIR, 'humanitarian_analysis_country_metrics.csv'))
+    return build_entities(summary, metrics)
 
-    rows = []
-    for _, row in df.iterrows():
-        iso3 = row['Country ISO3']
-        if iso3 not in _ISO3_COORDS:
-            continue
 
-        lat, lon, name = _ISO3_COORDS[iso3]
+def generate_sample_entities() -> pd.DataFrame:
+    """Crisis entities for the dashboard globe (shared registry view)."""
+    return get_dataset('entities')
 
-        # Severity quartile — use metrics value, fall back to inferred
-        quartile = row.get('Severity Quartile')
-        if not isinstance(quartile, str) or pd.isna(quartile):
-            quartile = _infer_quartile(float(row['Severity_Score']))
-        sev = _SEVERITY_NUM.get(quartile, 3)
 
-        # Targeting coverage %
-        in_need  = float(row['In Need'])
-        targeted = float(row['Targeted']) if pd.notna(row['Targeted']) else 0.0
-        fund     = round(targeted / in_need * 100, 1) if in_need > 0 else 0.0
-
-        # Mismatch score (HVI proxy); derive for rows where it's missing
-        mismatch = row.get('Mismatch Score')
-        if pd.isna(mismatch):
-            hvi = round(min(float(row['Severity_Score']) / 4.0, 1.0), 2)
-        else:
-            hvi = round(float(mismatch), 2)
-
-        rows.append({
-            'name':          name,
-            'iso3':          iso3,
-            'severity':      sev,
-            'sev_label':     quartile,
-            'lat':           lat,
-            'lon':           lon,
-            'hvi':           hvi,
-            'fund':          fund,
-            'in_need':       _fmt_millions(in_need),
-            # 'projects' kept for backward compat with the sidebar badge
-            'projects':      _fmt_millions(in_need),
-        })
-
-    df_out = pd.DataFrame(rows)
-    # Sort: Critical → High → Medium → Low, then alphabetically
-    df_out['_sort'] = df_out['severity'].map({5: 0, 4: 1, 3: 2, 2: 3})
-    df_out = df_out.sort_values(['_sort', 'name']).drop(columns='_sort').reset_index(drop=True)
-    return df_out
+def _with_assets(html: str) -> str:
+    """Fill in the globe.gl script and texture URLs (vendored copies or CDN)."""
+    return (html
+            .replace('__GLOBE_JS__', globe_assets.script_tag())
+            .replace('__EARTH_TEXTURE__', globe_assets.texture_url('earth-blue-marble'))
+            .replace('__BUMP_TEXTURE__', globe_assets.texture_url('earth-topology')))
 
 
 def create_home_globe_html():
     """Clean Earth globe for the home/landing page — no crisis markers."""
-    return """<!DOCTYPE html>
+    return _with_assets("""<!DOCTYPE html>
 <html>
 <head>
 <meta charset="utf-8">
@@ -127,11 +148,11 @@ def create_home_globe_html():
 </head>
 <body>
 <div id="globeViz"></div>
-<script src="https://unpkg.com/globe.gl@2.30.0/dist/globe.gl.min.js"></script>
+__GLOBE_JS__
 <script>
   const globe = Globe({ animateIn: true })
-    .globeImageUrl('//unpkg.com/three-globe/example/img/earth-blue-marble.jpg')
-    .bumpImageUrl('//unpkg.com/three-globe/example/img/earth-topology.png')
+    .globeImageUrl('__EARTH_TEXTURE__')
+    .bumpImageUrl('__BUMP_TEXTURE__')
     .backgroundColor('rgba(10,14,26,0)')
     .showAtmosphere(false)
     (document.getElementById('globeViz'));
@@ -148,21 +169,218 @@ def create_home_globe_html():
   el.addEventListener('mouseleave', () => { globe.controls().autoRotate = true; });
 </script>
 </body>
-</html>"""
+</html>""")
+
+
+# ── Crisis globe ──────────────────────────────────────────────────────────────
+# The generated document depends only on the source data and the theme, so it
+# is built once per (snapshot version, theme) and reused. Returning the very
+# same string keeps components.html from replacing the iframe, which makes
+# hover/navigation reruns of the dashboard essentially free.
+
+_GLOBE_CACHE = {}   # (data version, assets version, theme digest, view, feed, performance) → (etag, html)
+_GLOBE_CACHE_MAX = 64
+
+
+def _theme_digest(theme_colors) -> str:
+    raw = json.dumps(theme_colors, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def _crisis_data_json(entities: pd.DataFrame) -> str:
+    """crisisData as a JSON array, encoded column-wise in one pass."""
+    data = pd.DataFrame({
+        'lat':       entities['lat'],
+        'lng':       entities['lon'],
+        'name':      entities['name'],
+        'iso3':      entities['iso3'],
+        'hvi':       entities['hvi'],
+        'fund':      entities['fund'],
+        'sev':       entities['severity'],
+        'sev_label': entities['sev_label'],
+        'color':     entities['severity'].map(_SEVERITY_COLORS),
+        'in_need':   entities['in_need'],
+    })
+    if 'admin' in entities:
+        data['admin']  = True
+        data['parent'] = entities['parent']
+        data['id']     = entities['iso3'] + ':' + entities['admin1']
+    else:
+        data['id']     = entities['iso3']
+    return data.to_json(orient='records')
+
+
+def crisis_points(entities: pd.DataFrame) -> list:
+    """Globe point records for `entities` (same shape as crisisData)."""
+    return json.loads(_crisis_data_json(entities))
+
+
+# Feed mode: the document starts empty, reports its viewport to the parent
+# frame (globe_feed.py's component) and builds points, rings and labels only
+# for visible features out of the tiles it is sent back.
+_FEED_JS = """
+  const FEED = __FEED_CFG__;
+  const feedPoints = new Map();   // point id → point
+  const feedRefs   = new Map();   // point id → number of loaded tiles holding it
+  const feedTiles  = new Map();   // tile id → point ids, oldest first
+  let feedKey = null, feedSeq = 0;
+
+  function lodLevel(alt) {
+    return alt > FEED.country_only_altitude ? 0 : (alt > FEED.thin_altitude ? 1 : 2);
+  }
+
+  function refreshVisible() {
+    const pov = globe.pointOfView();
+    const radius = Math.min(Math.acos(1 / (1 + pov.altitude)) / RAD, pov.altitude * 27) + FEED.margin_deg;
+    const near = lodLevel(pov.altitude) === 2;
+    const visible = [];
+    feedPoints.forEach(p => { if (angDist(p, pov) <= radius) visible.push(p); });
+    visible.sort((a, b) => b.sev - a.sev);
+    globe.pointsData(visible);
+    globe.ringsData(ringsFor(visible.filter(p => !p.admin || near).slice(0, FEED.max_rings)));
+    globe.labelsData(labelsFor(visible.filter(p => !p.admin || near).slice(0, FEED.max_labels)));
+  }
+
+  function reportViewport(force) {
+    const pov = globe.pointOfView();
+    const level = lodLevel(pov.altitude);
+    const q = FEED.quantum_deg;
+    const key = level === 0 ? '0'
+      : [level, Math.round(pov.lat / q), Math.round(pov.lng / q)].join('/');
+    if (!force && key === feedKey) return;
+    feedKey = key;
+    window.parent.postMessage({
+      type: 'crisisGlobeViewport', seq: ++feedSeq,
+      lat: pov.lat, lng: pov.lng, altitude: pov.altitude,
+      loaded: Array.from(feedTiles.keys()),
+    }, '*');
+  }
+
+  function loadTiles(tiles) {
+    tiles.forEach(tile => {
+      if (feedTiles.has(tile.id)) return;
+      feedTiles.set(tile.id, tile.points.map(p => p.id));
+      tile.points.forEach(p => {
+        feedPoints.set(p.id, p);
+        feedRefs.set(p.id, (feedRefs.get(p.id) || 0) + 1);
+      });
+    });
+    // Bound memory: drop the oldest tiles (never the country layer)
+    for (const [id, ids] of feedTiles) {
+      if (feedTiles.size <= FEED.max_tiles) break;
+      if (id === 'countries') continue;
+      feedTiles.delete(id);
+      ids.forEach(pid => {
+        const n = feedRefs.get(pid) - 1;
+        if (n > 0) feedRefs.set(pid, n);
+        else { feedRefs.delete(pid); feedPoints.delete(pid); }
+      });
+    }
+  }
+
+  let feedTimer = null;
+  globe.controls().addEventListener('change', () => {
+    if (feedTimer) return;
+    feedTimer = setTimeout(() => { feedTimer = null; refreshVisible(); reportViewport(false); }, FEED.throttle_ms);
+  });
+  window.addEventListener('message', function(e) {
+    if (!e.data || e.data.type !== 'crisisGlobeTiles') return;
+    loadTiles(e.data.tiles || []);
+    refreshVisible();
+    if (e.data.more) reportViewport(true);
+  });
+  reportViewport(true);
+"""
+
+
+def _feed_config() -> dict:
+    import admin1_layer
+
+    return {
+        'country_only_altitude': admin1_layer.COUNTRY_ONLY_ALTITUDE,
+        'thin_altitude':         admin1_layer.THIN_ALTITUDE,
+        'quantum_deg':           admin1_layer.CELL_DEG,
+        'margin_deg':            10,
+        'max_tiles':             256,
+        'max_rings':             60,
+        'max_labels':            80,
+        'throttle_ms':           400,
+    }
+
+
+# Performance mode, for globes left open all day: merged point geometry
+# (one draw call, no per-point hover; the culled labels carry the tooltips),
+# rings on the most severe points only and slower, labels only near the
+# camera centre, no autorotation, a capped pixel ratio, and no rendering
+# while the tab is hidden or the globe is scrolled out of view.
+PERFORMANCE_MODE = os.environ.get('GLOBE_PERFORMANCE_MODE', '0').lower() in ('1', 'true', 'yes', 'on')
+
+_PERF_CONFIG = {
+    'point_resolution': 6,
+    'ring_min_sev':     5,      # Critical only
+    'max_rings':        12,
+    'ring_repeat_ms':   4000,
+    'ring_speed':       1.2,
+    'label_deg_per_alt': 15,    # label radius around the camera centre, per unit altitude
+    'max_labels':       30,
+    'max_pixel_ratio':  1.5,
+    'throttle_ms':      400,
+}
 
 
-def create_globe_html(theme_colors):
-    """Crisis globe with real humanitarian data, pulsing markers, region controls."""
-    entities   = generate_sample_entities()
-    button_css = get_globe_button_css(theme_colors)
+def _globe_entry(theme_colors, view=None, feed=False, performance=False):
+    import admin1_layer
 
-    js_data = ",\n      ".join(
-        f'{{ lat:{row["lat"]}, lng:{row["lon"]}, name:"{row["name"]}", '
-        f'iso3:"{row["iso3"]}", hvi:{row["hvi"]}, fund:{row["fund"]}, '
-        f'sev:{row["severity"]}, sev_label:"{row["sev_label"]}", '
-        f'color:"{_SEVERITY_COLORS[row["severity"]]}", in_need:"{row["in_need"]}" }}'
-        for _, row in entities.iterrows()
-    )
+    view = None if feed else admin1_layer.quantise_view(view)
+    performance = bool(performance)
+    key = (snapshot_version(), globe_assets.assets_version(), _theme_digest(theme_colors), view, feed, performance)
+    entry = _GLOBE_CACHE.get(key)
+    if entry is None:
+        if feed:
+            crisis_json, admin1_json = '[]', '[]'
+            feed_js = _FEED_JS.replace('__FEED_CFG__', json.dumps(_feed_config()))
+        else:
+            crisis_json = _crisis_data_json(generate_sample_entities())
+            admin1_json = _crisis_data_json(admin1_layer.lod_subset(view))
+            feed_js = ''
+        html = _with_assets(_render_globe_html(
+            crisis_json, admin1_json, get_globe_button_css(theme_colors), view, feed_js,
+            _PERF_CONFIG if performance else None,
+        ))
+        etag = hashlib.sha256(html.encode('utf-8')).hexdigest()[:16]
+        html = html.replace('<meta charset="utf-8">',
+                            f'<meta charset="utf-8">\n<meta name="h2c2-etag" content="{etag}">', 1)
+        # Older data / asset versions can never be requested again
+        for stale in [k for k in _GLOBE_CACHE if k[:2] != key[:2]]:
+            del _GLOBE_CACHE[stale]
+        while len(_GLOBE_CACHE) >= _GLOBE_CACHE_MAX:
+            del _GLOBE_CACHE[next(iter(_GLOBE_CACHE))]
+        entry = _GLOBE_CACHE[key] = (etag, html)
+    return entry
+
+
+def globe_html_version(theme_colors, view=None, feed=False, performance=False) -> str:
+    """ETag-style digest of the globe document; changes only when its content does."""
+    return _globe_entry(theme_colors, view, feed, performance)[0]
+
+
+def create_globe_html(theme_colors, view=None, feed=False, performance=False):
+    """
+    Crisis globe with real humanitarian data, pulsing markers, region controls.
+    `view` = (lat, lng, altitude) opens the globe there and embeds only the
+    admin-1 points admin1_layer.lod_subset() picks for it. With feed=True the
+    document embeds no data and streams points by viewport (globe_feed.py).
+    performance=True renders the reduced-cost variant (see _PERF_CONFIG).
+    """
+    return _globe_entry(theme_colors, view, feed, performance)[1]
+
+
+def _render_globe_html(crisis_json: str, admin1_json: str, button_css: str, view=None, feed_js='',
+                       perf=None) -> str:
+    if view is None:
+        pov, current = {'lat': 18, 'lng': 30, 'altitude': 2.4}, 'world'
+    else:
+        pov, current = {'lat': view[0], 'lng': view[1], 'altitude': view[2]}, ''
 
     return f"""<!DOCTYPE html>
 <html>
@@ -191,20 +409,50 @@ def create_globe_html(theme_colors):
   <div class="leg"><div class="ldot" style="background:#3b82f6;"></div><span>Medium</span></div>
   <div class="leg"><div class="ldot" style="background:#4ade80;"></div><span>Low</span></div>
 </div>
-<script src="https://unpkg.com/globe.gl@2.30.0/dist/globe.gl.min.js"></script>
+__GLOBE_JS__
 <script>
-  const crisisData = [
-    {js_data}
-  ];
+  const crisisData = {crisis_json};
+  const admin1Data = {admin1_json};
+  const PERF = {json.dumps(perf)};
+  const RAD = Math.PI / 180;
+
+  function angDist(a, b) {{
+    const c = Math.sin(a.lat*RAD)*Math.sin(b.lat*RAD)
+            + Math.cos(a.lat*RAD)*Math.cos(b.lat*RAD)*Math.cos((a.lng-b.lng)*RAD);
+    return Math.acos(Math.min(1, Math.max(-1, c))) / RAD;
+  }}
+  // Identity unless in performance mode: rings on the most severe points only,
+  // labels only within a radius of the camera centre that shrinks as it zooms in
+  function ringsFor(pts) {{
+    return PERF ? pts.filter(p => p.sev >= PERF.ring_min_sev).slice(0, PERF.max_rings) : pts;
+  }}
+  function labelsFor(pts) {{
+    if (!PERF) return pts;
+    const pov = globe.pointOfView();
+    const radius = PERF.label_deg_per_alt * pov.altitude;
+    return pts.filter(p => angDist(p, pov) <= radius).slice(0, PERF.max_labels);
+  }}
+  const tooltip = d => `
+      <div class="globe-tooltip">
+        <div class="tooltip-name">${{d.admin ? d.name + ', ' + d.parent : d.name}}</div>
+        <div>People in Need: <b>${{d.in_need}}</b></div>
+        <div>Targeting Coverage: <b>${{d.fund}}%</b></div>
+        <div>Mismatch Score: <b>${{d.hvi}}</b></div>
+        <div>Severity: <b style="color:${{d.color}}">${{d.sev_label}}</b></div>
+      </div>
+    `;
+  const flyTo = d => globe.pointOfView({{ lat:d.lat, lng:d.lng, altitude:1.2 }}, 900);
+
   const globe = Globe({{ animateIn: true }})
-    .globeImageUrl('//unpkg.com/three-globe/example/img/earth-blue-marble.jpg')
-    .bumpImageUrl('//unpkg.com/three-globe/example/img/earth-topology.png')
+    .globeImageUrl('__EARTH_TEXTURE__')
+    .bumpImageUrl('__BUMP_TEXTURE__')
     .backgroundColor('rgba(10,14,26,0)')
     .showAtmosphere(false)
-    .pointsData(crisisData)
+    .pointsData(crisisData.concat(admin1Data))
     .pointLat('lat').pointLng('lng').pointColor('color')
-    .pointAltitude(0.08).pointRadius(0.5).pointResolution(16)
-    .ringsData(crisisData)
+    .pointAltitude(d => d.admin ? 0.02 : 0.08).pointRadius(d => d.admin ? 0.2 : 0.5)
+    .pointResolution(PERF ? PERF.point_resolution : 16).pointsMerge(!!PERF)
+    .ringsData(ringsFor(crisisData))
     .ringLat('lat').ringLng('lng')
     .ringColor(d => t => {{
       const hex = d.color.replace('#','');
@@ -213,35 +461,56 @@ def create_globe_html(theme_colors):
       const b = parseInt(hex.slice(4,6),16);
       return `rgba(${{r}},${{g}},${{b}},${{Math.max(0,1-t)}})`;
     }})
-    .ringMaxRadius(6).ringPropagationSpeed(2.5).ringRepeatPeriod(1300)
-    .labelsData(crisisData)
+    .ringMaxRadius(6)
+    .ringPropagationSpeed(PERF ? PERF.ring_speed : 2.5).ringRepeatPeriod(PERF ? PERF.ring_repeat_ms : 1300)
+    .labelsData(PERF ? [] : crisisData)
     .labelLat('lat').labelLng('lng').labelText('name')
     .labelSize(0.6).labelDotRadius(0.4)
     .labelColor(() => 'rgba(232,240,254,0.95)')
     .labelResolution(3).labelAltitude(0.01)
-    .pointLabel(d => `
-      <div class="globe-tooltip">
-        <div class="tooltip-name">${{d.name}}</div>
-        <div>People in Need: <b>${{d.in_need}}</b></div>
-        <div>Targeting Coverage: <b>${{d.fund}}%</b></div>
-        <div>Mismatch Score: <b>${{d.hvi}}</b></div>
-        <div>Severity: <b style="color:${{d.color}}">${{d.sev_label}}</b></div>
-      </div>
-    `)
-    .onPointClick(d => globe.pointOfView({{ lat:d.lat, lng:d.lng, altitude:1.2 }}, 900))
+    .pointLabel(tooltip)
+    .onPointClick(flyTo)
     (document.getElementById('globeViz'));
 
-  globe.controls().autoRotate      = true;
+  let currentView = '{current}';
+  const ROTATE = !PERF;
+  globe.controls().autoRotate      = ROTATE && (currentView === 'world');
   globe.controls().autoRotateSpeed = 0.35;
   globe.controls().enableZoom      = true;
   globe.controls().minDistance     = 150;
   globe.controls().maxDistance     = 700;
-  globe.pointOfView({{ lat:18, lng:30, altitude:2.4 }}, 800);
+  globe.pointOfView({json.dumps(pov)}, 800);
 
-  let currentView = 'world';
   const el = document.getElementById('globeViz');
-  el.addEventListener('mouseenter', () => {{ if (currentView==='world') globe.controls().autoRotate=false; }});
-  el.addEventListener('mouseleave', () => {{ if (currentView==='world') globe.controls().autoRotate=true; }});
+  el.addEventListener('mouseenter', () => {{ if (ROTATE && currentView==='world') globe.controls().autoRotate=false; }});
+  el.addEventListener('mouseleave', () => {{ if (ROTATE && currentView==='world') globe.controls().autoRotate=true; }});
+
+  if (PERF) {{
+    // Merged points can't be hovered; labels take over the tooltip and click
+    globe.labelLabel(tooltip).onLabelClick(flyTo);
+    globe.renderer().setPixelRatio(Math.min(window.devicePixelRatio || 1, PERF.max_pixel_ratio));
+    if (!{'true' if feed_js else 'false'}) {{
+      const cull = () => globe.labelsData(labelsFor(crisisData));
+      let cullTimer = null;
+      globe.controls().addEventListener('change', () => {{
+        if (cullTimer) return;
+        cullTimer = setTimeout(() => {{ cullTimer = null; cull(); }}, PERF.throttle_ms);
+      }});
+      cull();
+    }}
+
+    // Stop the render loop while the tab is hidden or the globe is off screen
+    let hidden = document.hidden, offscreen = false;
+    const syncRendering = () => (hidden || offscreen) ? globe.pauseAnimation() : globe.resumeAnimation();
+    document.addEventListener('visibilitychange', () => {{ hidden = document.hidden; syncRendering(); }});
+    if ('IntersectionObserver' in window) {{
+      new IntersectionObserver(entries => {{
+        offscreen = !entries[entries.length - 1].isIntersecting;
+        syncRendering();
+      }}).observe(el);
+    }}
+    syncRendering();
+  }}
 
   const VIEWS = {{
     world:        {{ lat:18,  lng:30,  altitude:2.4 }},
@@ -257,7 +526,7 @@ def create_globe_html(theme_colors):
     document.querySelectorAll('.vbtn').forEach(b => b.classList.remove('active'));
     btn.classList.add('active');
     globe.pointOfView(VIEWS[name], 1000);
-    globe.controls().autoRotate = (name === 'world');
+    globe.controls().autoRotate = ROTATE && (name === 'world');
   }}
 
   window.addEventListener('message', function(e) {{
@@ -265,9 +534,9 @@ def create_globe_html(theme_colors):
       globe.controls().autoRotate = false;
       currentView = '';
       document.querySelectorAll('.vbtn').forEach(b => b.classList.remove('active'));
-      globe.pointOfView({{ lat: e.data.lat, lng: e.data.lng, altitude: 1.2 }}, 900);
+      globe.pointOfView({{ lat: e.data.lat, lng: e.data.lng, altitude: e.data.altitude || 1.2 }}, 900);
     }}
   }});
-</script>
+{feed_js}</script>
 </body>
 </html>"""
@@ -0,0 +1,249 @@
+"""Single-pass ingestion of the OCHA HNO (Humanitarian Needs Overview) CSV.
+
+`ingest()` streams data/hpc_hno_2025.csv in blocks through hxl_csv.iter_csv,
+with the declared dtypes and only the columns it needs. The HXL tag row under
+the header is skipped by the parser. One pass over the file feeds three small accumulators:
+
+    country summary   In Need / Targeted from the top-level row per country
+                      (Cluster = ALL, blank Category), merged into
+                      country_level_summary (1).csv
+    admin-1 summary   Cluster = ALL rows per admin-1 unit, at the coarsest
+                      level the HNO reports for that unit
+                      → updated_admin1_summary_data.csv
+    sector table      In Need / Targeted / Coverage per cluster
+                      → humanitarian_analysis_sector_benchmarking.csv
+
+All outputs are written to temp files first and swapped in together, then
+data/hno_ingest_manifest.json records the source hash, row counts and output
+hashes. Multi-year drops (a 'Year' column) keep per-year accumulators and
+emit the requested year, or the latest one.
+
+    python src/hno_ingest.py                     # ingest data/hpc_hno_2025.csv
+    python src/hno_ingest.py --source hno.csv --year 2024
+"""
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import hxl_csv
+from data_store import DATA_DIR, file_sha256
+
+HNO_PATH      = os.path.join(DATA_DIR, 'hpc_hno_2025.csv')
+SUMMARY_PATH  = os.path.join(DATA_DIR, 'country_level_summary (1).csv')
+ADMIN1_PATH   = os.path.join(DATA_DIR, 'updated_admin1_summary_data.csv')
+SECTOR_PATH   = os.path.join(DATA_DIR, 'humanitarian_analysis_sector_benchmarking.csv')
+MANIFEST_PATH = os.path.join(DATA_DIR, 'hno_ingest_manifest.json')
+
+BLOCK_BYTES = int(float(os.environ.get('HNO_BLOCK_MB', '16')) * (1 << 20))
+
+# Bump when the aggregation rules change
+INGEST_VERSION = 2
+
+_STR_COLS = ['Country ISO3', 'Admin 1 Name', 'Admin 2 Name', 'Admin 3 Name', 'Cluster', 'Category', 'Year']
+_NUM_COLS = ['Population', 'In Need', 'Targeted']
+_REQUIRED = ['Country ISO3', 'Cluster', 'Category', 'In Need', 'Targeted']
+
+_ADMIN1_COLS = ['Country ISO3', 'Admin 1 Name', 'Population', 'In Need', 'Targeted',
+                'Cost_per_Beneficiary', 'Outlier_Flag', 'Severity_Score']
+
+
+# ── Parsing ───────────────────────────────────────────────────────────────────
+
+def read_chunks(path=HNO_PATH, block_bytes=BLOCK_BYTES):
+    """
+    Iterator of DataFrames with stripped column names. String columns keep ''
+    for blanks; Population / In Need / Targeted are float64 with NaN.
+    """
+    cols, _ = hxl_csv.sniff(path)
+    names = {c: c.strip() for c in cols}
+    missing = [c for c in _REQUIRED if c not in names.values()]
+    if missing:
+        raise ValueError(f'{os.path.basename(path)} is missing HNO columns: {missing}')
+
+    # Declared types keyed by the file's own (possibly padded) header names
+    declared = hxl_csv.SCHEMAS['hpc_hno_2025.csv']
+    raw = [c for c in cols if names[c] in _STR_COLS + _NUM_COLS]
+    schema = {c: declared[names[c]] for c in raw}
+
+    for chunk in hxl_csv.iter_csv(path, schema, raw, strings_can_be_null=False, block_bytes=block_bytes):
+        chunk = chunk.rename(columns=names)
+        for c in _STR_COLS:
+            chunk[c] = chunk[c].fillna('') if c in chunk else ''
+        if 'Population' not in chunk:
+            chunk['Population'] = np.nan
+        yield chunk
+
+
+# ── Accumulation ──────────────────────────────────────────────────────────────
+
+def _admin_level(chunk):
+    return 1 + (chunk['Admin 2 Name'].str.strip() != '') + (chunk['Admin 3 Name'].str.strip() != '')
+
+
+def _accumulate(chunks):
+    """One pass over the chunks; returns the per-year partial aggregates."""
+    first, admin1, sector = [], [], []
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        top = (chunk['Cluster'] == 'ALL') & (chunk['Category'].str.strip() == '')
+
+        # First top-level row per country (and year) — later chunks can't displace it
+        first.append(chunk.loc[top, ['Year', 'Country ISO3', 'In Need', 'Targeted']]
+                          .drop_duplicates(['Year', 'Country ISO3'], keep='first'))
+
+        units = chunk[top & (chunk['Admin 1 Name'].str.strip() != '')]
+        if len(units):
+            admin1.append(units.assign(level=_admin_level(units))
+                               .groupby(['Year', 'Country ISO3', 'Admin 1 Name', 'level'], sort=False)
+                               [_NUM_COLS].sum(min_count=1))
+
+        # Same aggregation as the analysis notebook: every row of each cluster
+        clusters = chunk[chunk['Cluster'] != 'ALL']
+        sector.append(clusters.groupby(['Year', 'Cluster'], sort=False)[['In Need', 'Targeted']].sum())
+
+    first = pd.concat(first).drop_duplicates(['Year', 'Country ISO3'], keep='first') if first else None
+    admin1 = pd.concat(admin1).groupby(level=[0, 1, 2, 3]).sum(min_count=1) if admin1 else None
+    sector = pd.concat(sector).groupby(level=[0, 1]).sum() if sector else None
+    return first, admin1, sector, rows
+
+
+def _pick_year(first, year):
+    if first is None or not len(first):
+        raise ValueError('HNO file has no top-level rows (Cluster = ALL, blank Category)')
+    years = sorted(first['Year'].unique())
+    if year is None:
+        return years[-1]
+    if str(year) not in years:
+        raise ValueError(f'year {year} not in the HNO file (found: {[y for y in years if y]})')
+    return str(year)
+
+
+# ── Outputs ───────────────────────────────────────────────────────────────────
+
+def _whole(s):
+    """Nullable integers when every value is whole, as pd.read_csv would give."""
+    vals = s.dropna()
+    return s.round().astype('Int64') if (vals == vals.round()).all() else s
+
+
+def build_country_summary(summary, first):
+    lookup = first.set_index('Country ISO3')
+    out = summary.copy()
+    out['In Need'] = _whole(out['Country ISO3'].map(lookup['In Need']))
+    out['Targeted'] = _whole(out['Country ISO3'].map(lookup['Targeted']))
+    return out
+
+
+def build_admin1_summary(admin1, summary):
+    if admin1 is None or not len(admin1):
+        return pd.DataFrame(columns=_ADMIN1_COLS)
+    df = admin1.reset_index()
+    # Coarsest level reported per unit; finer rows are only summed when no total exists
+    df = df[df['level'] == df.groupby(['Country ISO3', 'Admin 1 Name'])['level'].transform('min')]
+    df = df[df['Country ISO3'].isin(summary['Country ISO3'])]
+
+    country = summary.set_index('Country ISO3')
+    pop = df['Population'].fillna(0.0).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        severity = np.where(pop > 0, df['In Need'].to_numpy() / pop, 0.0)
+    return pd.DataFrame({
+        'Country ISO3':         df['Country ISO3'].to_numpy(),
+        'Admin 1 Name':         df['Admin 1 Name'].str.strip().to_numpy(),
+        'Population':           pop,
+        'In Need':              _whole(df['In Need'].reset_index(drop=True)),
+        'Targeted':             df['Targeted'].to_numpy(),
+        'Cost_per_Beneficiary': df['Country ISO3'].map(country['Cost_per_Beneficiary']).to_numpy(),
+        'Outlier_Flag':         df['Country ISO3'].map(country['Outlier_Flag']).fillna(0).astype(int).to_numpy(),
+        'Severity_Score':       severity,
+    })
+
+
+def build_sector_table(sector):
+    df = sector.reset_index()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        df['Coverage'] = df['Targeted'] / df['In Need']
+    return df.sort_values('In Need', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def _write_atomic(outputs):
+    """Write every {path: DataFrame} to a temp file, then swap them all in."""
+    tmps = {}
+    try:
+        for path, df in outputs.items():
+            tmp = tmps[path] = f'{path}.tmp'
+            df.to_csv(tmp, index=False)
+    except Exception:
+        for tmp in tmps.values():
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+    for path, tmp in tmps.items():
+        os.replace(tmp, path)
+
+
+# ── Entry point ───────────────────────────────────────────────────────────────
+
+def ingest(source=HNO_PATH, year=None, block_bytes=BLOCK_BYTES, summary_path=SUMMARY_PATH,
+           admin1_path=ADMIN1_PATH, sector_path=SECTOR_PATH, manifest_path=MANIFEST_PATH):
+    """Stream `source` once and write the country, admin-1 and sector tables. Returns the manifest."""
+    t0 = time.perf_counter()
+    first, admin1, sector, rows = _accumulate(read_chunks(source, block_bytes))
+    year = _pick_year(first, year)
+
+    summary = hxl_csv.read_csv(summary_path)
+    first = first[first['Year'] == year]
+    if admin1 is not None:
+        admin1 = admin1.xs(year, level='Year')
+    sector = sector.xs(year, level='Year')
+
+    country = build_country_summary(summary, first)
+    outputs = {
+        summary_path: country,
+        admin1_path:  build_admin1_summary(admin1, country),
+        sector_path:  build_sector_table(sector),
+    }
+    _write_atomic(outputs)
+
+    manifest = {
+        'version':  INGEST_VERSION,
+        'source':   {
+            'path':   os.path.relpath(source, os.path.dirname(manifest_path)).replace(os.sep, '/'),
+            'sha256': file_sha256(source),
+            'bytes':  os.path.getsize(source),
+            'rows':   rows,
+        },
+        'year':      year or None,
+        'block_bytes': block_bytes,
+        'outputs':   {
+            os.path.basename(path): {'sha256': file_sha256(path), 'rows': len(df)}
+            for path, df in outputs.items()
+        },
+        'seconds':   round(time.perf_counter() - t0, 3),
+        'built_at':  time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+    }
+    tmp = f'{manifest_path}.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    os.replace(tmp, manifest_path)
+    return manifest
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Ingest the HNO CSV into the country, admin-1 and sector tables.')
+    parser.add_argument('--source', default=HNO_PATH, help='HNO CSV (default: data/hpc_hno_2025.csv)')
+    parser.add_argument('--year', default=None, help="year to emit when the file has a 'Year' column")
+    parser.add_argument('--block-mb', type=float, default=BLOCK_BYTES / (1 << 20), help='MB of CSV per parsed block')
+    args = parser.parse_args()
+
+    m = ingest(args.source, args.year, int(args.block_mb * (1 << 20)))
+    print(f"{m['source']['rows']} HNO rows in {m['seconds']} s"
+          + (f" (year {m['year']})" if m['year'] else ''))
+    for name, out in m['outputs'].items():
+        print(f"  {name}: {out['rows']} rows")
+    print(f'manifest → {MANIFEST_PATH}')
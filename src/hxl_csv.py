@@ -0,0 +1,203 @@
+"""Shared CSV reader for HDX / OCHA files that may carry an HXL tag row.
+
+HDX exports put a row of HXL hashtags (`#country+code`, `#inneed`, ...) right
+under the header. Read naively, that row turns every column into strings.
+`read_csv()` and `read_arrow()` sniff the first two lines. When the second
+line is HXL they skip it at parse time. The declared schema for the file
+(SCHEMAS, keyed by file name) then goes straight to the pyarrow CSV engine, so
+numbers, dates and categoricals are typed while parsing. Columns not in the
+schema are inferred as usual. `iter_csv()` streams large files in record
+batches.
+
+Without pyarrow, the same calls go through pandas with the equivalent dtypes.
+
+    python benchmarks/bench_csv_parse.py    # parse throughput
+"""
+import csv
+import os
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+BLOCK_BYTES = 16 << 20   # iter_csv batch size
+
+# Column types: 'str', 'int', 'float', 'bool', 'date', 'category'.
+# An 'int' column whose values turn out not to be whole is read as float.
+SCHEMAS = {
+    'hpc_hno_2025.csv': {
+        'Country ISO3': 'str', 'Admin 1 Name': 'str', 'Admin 2 Name': 'str', 'Admin 3 Name': 'str',
+        'Cluster': 'str', 'Category': 'str', 'Year': 'str',
+        'Population': 'float', 'In Need': 'float', 'Targeted': 'float',
+        'Affected': 'float', 'Reached': 'float',
+    },
+    'humanitarian-response-plans.csv': {
+        'code': 'str', 'internalId': 'int', 'startDate': 'date', 'endDate': 'date',
+        'planVersion': 'str', 'categories': 'str', 'locations': 'str', 'years': 'str',
+        'origRequirements': 'float', 'revisedRequirements': 'float',
+    },
+    'cod_population_admin0.csv': {
+        'ISO3': 'str', 'Country': 'str', 'Population_group': 'category', 'Gender': 'category',
+        'Age_range': 'category', 'Age_min': 'float', 'Age_max': 'float',
+        'Population': 'int', 'Reference_year': 'int', 'Source': 'category', 'Contributor': 'category',
+    },
+    'country_level_summary.csv': {
+        'Country ISO3': 'str', 'In Need': 'int', 'Targeted': 'int', 'revisedRequirements': 'int',
+        'Total_Population': 'float', 'Severity_Score': 'float', 'Cost_per_Beneficiary': 'float',
+        'Outlier_Flag': 'int',
+    },
+    'updated_admin1_summary_data.csv': {
+        'Country ISO3': 'str', 'Admin 1 Name': 'str', 'Population': 'float', 'In Need': 'int',
+        'Targeted': 'float', 'Cost_per_Beneficiary': 'float', 'Outlier_Flag': 'int',
+        'Severity_Score': 'float',
+    },
+    'humanitarian_analysis_sector_benchmarking.csv': {
+        'Cluster': 'str', 'In Need': 'float', 'Targeted': 'float', 'Coverage': 'float',
+    },
+    'forecast_results_2026_2030.csv': {
+        'iso3': 'str', 'year': 'int', 'Predicted_In_Need': 'float', 'Predicted_Requirements': 'float',
+        'Predicted_Funding': 'float', 'iso3_original': 'str', 'Funding_Gap': 'float', 'Risk_Flag': 'bool',
+    },
+    # Forecast model outputs (model_registry.py, backtest.py)
+    'future_features.csv': {
+        'iso3': 'str', 'year': 'int', 'Dependency Ratio': 'float', 'Population Velocity': 'float',
+        'Cost Inflation': 'float', 'Cost per Beneficiary': 'float',
+    },
+    'predictions.csv': {
+        'stage': 'str', 'variant': 'str', 'target': 'str', 'origin': 'int', 'lead': 'int',
+        'iso3': 'str', 'iso3_original': 'str', 'year': 'int',
+        'predicted': 'float', 'actual': 'float', 'error': 'float', 'pct_error': 'float',
+    },
+}
+# Same layout under other names
+SCHEMAS['admin1_summary_data.csv'] = SCHEMAS['updated_admin1_summary_data.csv']
+SCHEMAS['high_neglect_risk_2026_2030.csv'] = SCHEMAS['forecast_results_2026_2030.csv']
+
+_COPY_SUFFIX = re.compile(r' \(\d+\)(?=\.csv$)')   # "name (1).csv" browser download copies
+
+
+def schema_for(path):
+    """Declared schema for a file, by name ({} when none is declared)."""
+    return SCHEMAS.get(_COPY_SUFFIX.sub('', os.path.basename(path)), {})
+
+
+# ── Sniffing ──────────────────────────────────────────────────────────────────
+
+def is_hxl_row(cells):
+    """True for a row of HXL hashtags (every non-empty cell starts with '#')."""
+    cells = [c.strip() for c in cells]
+    return any(cells) and all(not c or c.startswith('#') for c in cells)
+
+
+def sniff(path):
+    """(column names, True if the second line is an HXL tag row)."""
+    with open(path, newline='', encoding='utf-8-sig') as fh:
+        reader = csv.reader(fh)
+        cols = next(reader, [])
+        second = next(reader, [])
+    return cols, is_hxl_row(second)
+
+
+# ── Types ─────────────────────────────────────────────────────────────────────
+
+def _arrow_type(kind):
+    return {
+        'str':      pa.string(),
+        'int':      pa.int64(),
+        'float':    pa.float64(),
+        'bool':     pa.bool_(),
+        'date':     pa.timestamp('s'),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+    }[kind]
+
+
+def _options(path, schema, columns, strings_can_be_null, block_size=None):
+    cols, hxl = sniff(path)
+    schema = schema_for(path) if schema is None else schema
+    present = set(cols)
+    read = pa_csv.ReadOptions(skip_rows_after_names=1 if hxl else 0,
+                              **({'block_size': block_size} if block_size else {}))
+    convert = pa_csv.ConvertOptions(
+        column_types={c: _arrow_type(k) for c, k in schema.items() if c in present},
+        strings_can_be_null=strings_can_be_null,
+        include_columns=list(columns) if columns else None,
+        include_missing_columns=bool(columns),
+    )
+    return read, convert
+
+
+def _relax_ints(schema):
+    return {c: ('float' if k == 'int' else k) for c, k in schema.items()}
+
+
+def _pandas_kwargs(path, schema, columns, strings_can_be_null):
+    cols, hxl = sniff(path)
+    schema = schema_for(path) if schema is None else schema
+    wanted = [c for c in (columns or cols) if c in cols]
+    dtype, dates = {}, []
+    for c, k in schema.items():
+        if c not in wanted:
+            continue
+        if k == 'date':
+            dates.append(c)
+        elif k in ('str', 'float', 'category'):
+            dtype[c] = {'str': str, 'float': 'float64', 'category': 'category'}[k]
+    # round_trip: the default fast float parser can be off by an ulp; pyarrow's is exact
+    kwargs = dict(usecols=wanted, dtype=dtype, parse_dates=dates or False,
+                  skiprows=[1] if hxl else None, encoding='utf-8-sig', float_precision='round_trip')
+    if not strings_can_be_null:
+        # Keep '' in string columns; numeric blanks still become NaN
+        kwargs['keep_default_na'] = False
+        kwargs['na_values'] = {c: [''] for c in wanted if dtype.get(c) != str}
+    return kwargs
+
+
+# ── Readers ───────────────────────────────────────────────────────────────────
+
+def read_arrow(path, schema=None, columns=None, strings_can_be_null=True):
+    """
+    pyarrow Table for a CSV, HXL row skipped and `schema` applied (the
+    declared schema by default). Blank strings become nulls unless
+    strings_can_be_null=False.
+    """
+    if pa is None:
+        raise ImportError('pyarrow is required for read_arrow (pip install pyarrow).')
+    read, convert = _options(path, schema, columns, strings_can_be_null)
+    try:
+        return pa_csv.read_csv(path, read_options=read, convert_options=convert)
+    except pa.ArrowInvalid:
+        schema = schema_for(path) if schema is None else schema
+        if 'int' not in schema.values():
+            raise
+        read, convert = _options(path, _relax_ints(schema), columns, strings_can_be_null)
+        return pa_csv.read_csv(path, read_options=read, convert_options=convert)
+
+
+def read_csv(path, schema=None, columns=None, strings_can_be_null=True):
+    """DataFrame for a CSV — pyarrow engine when available, pandas otherwise."""
+    if pa is not None:
+        return read_arrow(path, schema, columns, strings_can_be_null).to_pandas()
+    kwargs = _pandas_kwargs(path, schema, columns, strings_can_be_null)
+    df = pd.read_csv(path, **kwargs)
+    return df.reindex(columns=list(columns)) if columns else df
+
+
+def iter_csv(path, schema=None, columns=None, strings_can_be_null=True, block_bytes=BLOCK_BYTES):
+    """DataFrames of roughly `block_bytes` of CSV each, for files too large to read at once."""
+    if pa is None:
+        kwargs = _pandas_kwargs(path, schema, columns, strings_can_be_null)
+        # ~100 bytes per row is typical for HDX exports
+        for chunk in pd.read_csv(path, chunksize=max(1000, block_bytes // 100), **kwargs):
+            yield chunk.reindex(columns=list(columns)) if columns else chunk
+        return
+    schema = schema_for(path) if schema is None else schema
+    # Streaming can't retry half-way through the file, so ints are read as float
+    read, convert = _options(path, _relax_ints(schema), columns, strings_can_be_null, block_bytes)
+    with pa_csv.open_csv(path, read_options=read, convert_options=convert) as reader:
+        for batch in reader:
+            yield batch.to_pandas()
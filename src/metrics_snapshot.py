@@ -0,0 +1,160 @@
+"""Gold snapshot of the country metrics table.
+
+`load_country_metrics` used to recompute Need Prevalence, Budget per PIN, the
+min-max normalisations, Mismatch Score, quartiles and Targeting Efficiency on
+every load. This module computes the whole table once, vectorised, and stores
+it as an Arrow file stamped with a schema version and the SHA-256 of the source
+CSV. The loader serves the snapshot as-is and only recomputes when the source
+hash or schema version no longer match.
+
+    python src/metrics_snapshot.py      # (re)build the snapshot
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import hxl_csv
+from data_store import DATA_DIR, STORE_DIR, file_sha256, pa, read_table
+
+if pa is not None:
+    import pyarrow.ipc as pa_ipc
+
+SCHEMA_VERSION = 1
+
+SOURCE_PATH   = os.path.join(DATA_DIR, 'humanitarian_analysis_country_metrics.csv')
+SUMMARY_PATH  = os.path.join(DATA_DIR, 'country_level_summary (1).csv')
+POP_PATH      = os.path.join(DATA_DIR, 'cod_population_admin0.csv')
+SNAPSHOT_PATH = os.path.join(STORE_DIR, 'country_metrics.gold.arrow')
+
+_META_SCHEMA = b'h2c2.schema_version'
+_META_SOURCE = b'h2c2.source_sha256'
+_META_NAMES  = b'h2c2.names_digest'
+
+
+# ── Computation ───────────────────────────────────────────────────────────────
+
+def _minmax(s):
+    mn, mx = s.min(), s.max()
+    return (s - mn) / (mx - mn)
+
+
+def compute_country_metrics(raw, names):
+    """Full derived-metrics table from the raw metrics CSV, no row-wise Python."""
+    df = raw.dropna(subset=['Population', 'In Need', 'revisedRequirements'])
+    df = df[(df['Population'] > 0) & (df['In Need'] > 0)].copy()
+
+    df['Country Name'] = df['Country ISO3'].map(names).fillna(df['Country ISO3'])
+    df['Need Prevalence'] = df['In Need'] / df['Population']
+    df['Budget per PIN'] = df['revisedRequirements'] / df['In Need']
+    df['Normalized Need Prevalence'] = _minmax(df['Need Prevalence'])
+    df['Normalized Budget per PIN'] = _minmax(df['Budget per PIN'])
+    df['Mismatch Score'] = df['Normalized Need Prevalence'] - df['Normalized Budget per PIN']
+
+    prev = df['Need Prevalence'].to_numpy()
+    q25, q50, q75 = np.nanquantile(prev, [0.25, 0.5, 0.75]) if len(prev) else (np.nan,) * 3
+    df['Severity Quartile'] = np.select(
+        [prev <= q25, prev <= q50, prev <= q75],
+        ['Low', 'Medium', 'High'],
+        default='Critical',
+    )
+    df['Targeting Efficiency'] = df['Targeted'] / df['In Need']
+    return df
+
+
+# ── Source table ──────────────────────────────────────────────────────────────
+# humanitarian_analysis_country_metrics.csv itself is derived from the country
+# summary and the COD admin-0 population totals (the build graph's
+# 'country_metrics' node).
+
+_QUARTILES = ['Low', 'Medium', 'High', 'Critical']
+
+
+def derive_metrics_table(summary, population):
+    """The metrics CSV from the country summary and COD-PS admin-0 rows."""
+    total = population[(population['Population_group'] == 'T_TL') & population['ADM1_PCODE'].isna()]
+    total = total.drop_duplicates('ISO3').set_index('ISO3')['Population']
+
+    df = summary[['Country ISO3', 'In Need', 'Targeted', 'revisedRequirements']].copy()
+    df.insert(1, 'Population', df['Country ISO3'].map(total).astype(float))
+    df['Need Prevalence'] = df['In Need'] / df['Population']
+    df['Budget per PIN'] = df['revisedRequirements'] / df['In Need']
+    df['Normalized Need Prevalence'] = _minmax(df['Need Prevalence'])
+    df['Normalized Budget per PIN'] = _minmax(df['Budget per PIN'])
+    df['Mismatch Score'] = df['Normalized Need Prevalence'] - df['Normalized Budget per PIN']
+    df['Targeting Efficiency'] = df['Targeted'] / df['In Need']
+    df['Beneficiary-to-Budget Ratio'] = df['Targeted'] / df['revisedRequirements']
+    # Countries without a COD population total get no quartile
+    df['Severity Quartile'] = pd.qcut(df['Need Prevalence'], 4, labels=_QUARTILES).astype(object)
+    return df
+
+
+def write_metrics_table(summary_path=SUMMARY_PATH, population_path=POP_PATH, out=SOURCE_PATH):
+    df = derive_metrics_table(hxl_csv.read_csv(summary_path), hxl_csv.read_csv(population_path))
+    tmp = f'{out}.tmp'
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, out)
+    return df
+
+
+def _names_digest(names):
+    return hashlib.sha256(json.dumps(names, sort_keys=True).encode()).hexdigest()[:16]
+
+
+# ── Snapshot I/O ──────────────────────────────────────────────────────────────
+
+def build_snapshot(names, source=SOURCE_PATH):
+    """Recompute the metrics table and persist it; returns the DataFrame."""
+    df = compute_country_metrics(read_table(source), names)
+    if pa is None:
+        return df
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta.update({
+        _META_SCHEMA: str(SCHEMA_VERSION).encode(),
+        _META_SOURCE: file_sha256(source).encode(),
+        _META_NAMES:  _names_digest(names).encode(),
+    })
+    table = table.replace_schema_metadata(meta)
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    tmp = f'{SNAPSHOT_PATH}.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa_ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, SNAPSHOT_PATH)
+    return df
+
+
+def load_snapshot(names, source=SOURCE_PATH):
+    """The stored snapshot if it matches the source hash and schema, else None."""
+    if pa is None or not os.path.exists(SNAPSHOT_PATH):
+        return None
+    try:
+        table = pa_ipc.open_file(pa.memory_map(SNAPSHOT_PATH, 'r')).read_all()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    meta = table.schema.metadata or {}
+    if (meta.get(_META_SCHEMA) != str(SCHEMA_VERSION).encode()
+            or meta.get(_META_SOURCE) != file_sha256(source).encode()
+            or meta.get(_META_NAMES) != _names_digest(names).encode()):
+        return None
+    return table.to_pandas()
+
+
+def load_or_build(names, source=SOURCE_PATH):
+    """Serve the snapshot, rebuilding it first when it is missing or stale."""
+    df = load_snapshot(names, source)
+    if df is None:
+        df = build_snapshot(names, source)
+    return df
+
+
+if __name__ == '__main__':
+    from utils import ISO3_TO_NAME
+
+    out = build_snapshot(ISO3_TO_NAME)
+    print(f'Snapshot v{SCHEMA_VERSION}: {len(out)} countries → {SNAPSHOT_PATH}')
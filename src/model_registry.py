@@ -0,0 +1,209 @@
+"""Persisted XGBoost needs models and a batched what-if inference path.
+
+The forecast run trains one booster per target (In Need, revisedRequirements).
+`save()` writes each one to models/xgb/ in XGBoost's binary UBJSON format,
+alongside:
+
+    future_features.csv   the baseline 2026–2030 feature rows per country
+    manifest.json         feature names and order, targets, training
+                          parameters, rows and years, validation RMSE, input
+                          hashes and a SHA-256 per file
+
+`predict()` scores any feature frame with one inplace_predict per target on a
+float32 matrix. `what_if()` rescales features for every country and year and
+scores them in one call. Loaded boosters and recent scenarios are cached per
+manifest hash, so the Forecast page's sliders cost a few milliseconds.
+
+    python src/model_registry.py train    # refit from the current data (CSVs untouched)
+    python src/model_registry.py info
+"""
+import functools
+import json
+import os
+import time
+
+import numpy as np
+
+import forecast_data
+import hxl_csv
+from data_store import ROOT_DIR, file_sha256
+from forecast_data import FEATURES, TARGETS
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+REGISTRY_DIR  = os.path.join(ROOT_DIR, 'models', 'xgb')
+MANIFEST_PATH = os.path.join(REGISTRY_DIR, 'manifest.json')
+FUTURE_PATH   = os.path.join(REGISTRY_DIR, 'future_features.csv')
+
+VALIDATION_SPLIT = 2019    # validate() trains ≤ this and scores the years after it up to TRAIN_END
+
+XGB_PARAMS = dict(objective='reg:squarederror', n_estimators=100, random_state=42)
+
+# Registry file per target, and the forecast column it produces
+_TARGET_FILES = {'In Need': 'in_need.ubj', 'revisedRequirements': 'requirements.ubj'}
+PREDICTIONS   = {'In Need': 'Predicted_In_Need', 'revisedRequirements': 'Predicted_Requirements'}
+
+
+def _require_xgb():
+    if xgb is None:
+        raise ImportError('xgboost is required for the needs models (pip install xgboost).')
+
+
+# ── Training ──────────────────────────────────────────────────────────────────
+
+def fit(X, y, params=None):
+    _require_xgb()
+    return xgb.XGBRegressor(**(XGB_PARAMS if params is None else params)).fit(X, y).get_booster()
+
+
+def train(df):
+    """{target: Booster} fitted on every complete row of the feature frame `df`."""
+    data = df.dropna(subset=TARGETS + FEATURES)
+    return {target: fit(data[FEATURES], data[target]) for target in TARGETS}
+
+
+def validate(df):
+    """{target: validation RMSE} for models trained ≤ VALIDATION_SPLIT."""
+    data = df.dropna(subset=TARGETS + FEATURES)
+    train_ = data[data['year'] <= VALIDATION_SPLIT]
+    val = data[(data['year'] > VALIDATION_SPLIT) & (data['year'] <= forecast_data.TRAIN_END)]
+    out = {}
+    for target in TARGETS:
+        pred = fit(train_[FEATURES], train_[target]).inplace_predict(val[FEATURES])
+        out[target] = float(np.sqrt(np.mean((val[target].to_numpy() - pred) ** 2)))
+    return out
+
+
+def save(models, future, df, extra=None, path=REGISTRY_DIR):
+    """Write the boosters, baseline feature rows and manifest; returns the manifest."""
+    os.makedirs(path, exist_ok=True)
+    data = df.dropna(subset=TARGETS + FEATURES)
+    files = {}
+    for target, booster in models.items():
+        name = _TARGET_FILES[target]
+        tmp = os.path.join(path, f'.tmp.{name}')   # keep the .ubj suffix: it selects the format
+        booster.save_model(tmp)
+        os.replace(tmp, os.path.join(path, name))
+        files[target] = name
+    future_path = os.path.join(path, os.path.basename(FUTURE_PATH))
+    future.to_csv(f'{future_path}.tmp', index=False)
+    os.replace(f'{future_path}.tmp', future_path)
+
+    manifest = {
+        'format':      'xgboost-ubj',
+        'xgboost':     xgb.__version__,
+        'features':    FEATURES,
+        'params':      XGB_PARAMS,
+        'targets':     {t: {'file': f, 'column': PREDICTIONS[t],
+                            'sha256': file_sha256(os.path.join(path, f))} for t, f in files.items()},
+        'future':      {'file': os.path.basename(FUTURE_PATH), 'rows': len(future),
+                        'sha256': file_sha256(future_path)},
+        'train_rows':  len(data),
+        'train_years': [int(data['year'].min()), int(data['year'].max())],
+        'inputs':      {os.path.basename(p): file_sha256(p)
+                        for p in (forecast_data.HRP_PATH, forecast_data.SUMMARY_PATH)},
+        'trained_at':  time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        **(extra or {}),
+    }
+    tmp = os.path.join(path, 'manifest.json.tmp')
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp, os.path.join(path, 'manifest.json'))
+    return manifest
+
+
+# ── Loading ───────────────────────────────────────────────────────────────────
+
+_LOADED = {'version': None, 'manifest': None, 'models': None, 'future': None}
+
+
+def available():
+    return xgb is not None and os.path.exists(MANIFEST_PATH)
+
+
+def version():
+    """Manifest hash; changes whenever the models are retrained."""
+    return file_sha256(MANIFEST_PATH)
+
+
+def load():
+    """(manifest, {target: Booster}, baseline future features), cached per manifest hash."""
+    _require_xgb()
+    current = version()
+    if _LOADED['version'] != current:
+        with open(MANIFEST_PATH, encoding='utf-8') as fh:
+            manifest = json.load(fh)
+        models = {}
+        for target, spec in manifest['targets'].items():
+            booster = xgb.Booster()
+            booster.load_model(os.path.join(REGISTRY_DIR, spec['file']))
+            if booster.feature_names and booster.feature_names != manifest['features']:
+                raise ValueError(f"{spec['file']} was trained on {booster.feature_names}, "
+                                 f"manifest lists {manifest['features']}")
+            models[target] = booster
+        future = hxl_csv.read_csv(os.path.join(REGISTRY_DIR, manifest['future']['file']),
+                                  strings_can_be_null=False)
+        _LOADED.update(version=current, manifest=manifest, models=models, future=future)
+    return _LOADED['manifest'], _LOADED['models'], _LOADED['future']
+
+
+# ── Inference ─────────────────────────────────────────────────────────────────
+
+def predict(features, models=None):
+    """{forecast column: float64 array} for every row of `features`, one call per target."""
+    if models is None:
+        _, models, _ = load()
+    X = np.ascontiguousarray(features[FEATURES].to_numpy(dtype=np.float32))
+    return {PREDICTIONS[t]: b.inplace_predict(X).astype(float) for t, b in models.items()}
+
+
+@functools.lru_cache(maxsize=32)
+def _scenario(registry_version, scale):
+    _, models, future = load()
+    scenario = future.copy()
+    for feature, factor in scale:
+        scenario[feature] = scenario[feature] * factor
+    out = scenario[['iso3', 'year']].copy()
+    for col, values in predict(future, models).items():
+        out[f'Baseline_{col[len("Predicted_"):]}'] = values
+    for col, values in predict(scenario, models).items():
+        out[col] = values
+    return out
+
+
+def what_if(scale=None):
+    """
+    Needs forecasts for every country and horizon year with features rescaled,
+    e.g. scale={'Cost per Beneficiary': 1.2}. Columns: iso3 (as in the model
+    data), year, Baseline_In_Need, Baseline_Requirements, Predicted_In_Need,
+    Predicted_Requirements. Treat the result as read-only; it is cached.
+    """
+    scale = tuple(sorted((scale or {}).items()))
+    unknown = [f for f, _ in scale if f not in FEATURES or f == 'year']
+    if unknown:
+        raise KeyError(f'cannot rescale {unknown}; features: {FEATURES[1:]}')
+    return _scenario(version(), scale)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Train or inspect the persisted XGBoost needs models.')
+    parser.add_argument('cmd', choices=['train', 'info'])
+    args = parser.parse_args()
+
+    if args.cmd == 'train':
+        t0 = time.perf_counter()
+        df = forecast_data.load_features()
+        m = save(train(df), forecast_data.future_features(df), df, {'validation_rmse': validate(df)})
+        print(f"trained {len(m['targets'])} boosters on {m['train_rows']} rows "
+              f'in {time.perf_counter() - t0:.2f} s → {REGISTRY_DIR}')
+    else:
+        manifest, _, future = load()
+        print(json.dumps({k: v for k, v in manifest.items() if k != 'inputs'}, indent=2))
+        t0 = time.perf_counter()
+        what_if({'Cost per Beneficiary': 1.1})
+        print(f'what-if over {len(future)} rows: {(time.perf_counter() - t0) * 1e3:.1f} ms (uncached)')
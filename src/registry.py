@@ -0,0 +1,86 @@
+"""Process-wide, read-only dataset registry.
+
+`@st.cache_data` pickles a fresh DataFrame copy for every caller, so each
+Streamlit session on a worker carries its own copy of every dataset. The
+registry instead builds each dataset once per process (`st.cache_resource`),
+stores string columns Arrow-backed, and hands callers shallow views. Under
+copy-on-write a view never copies data until a caller writes to it, and such
+writes can never reach the shared frame. Copy-on-write is always on from
+pandas 3; on pandas 2 the app entry point (main.py) enables it, and
+get_dataset() refuses to hand out views without it.
+
+    @dataset('forecast')
+    def _forecast_data():
+        return ...
+
+    df = get_dataset('forecast')   # cheap view, safe to add columns to
+"""
+from importlib.util import find_spec
+
+import pandas as pd
+import streamlit as st
+
+# pyarrow backs the 'string[pyarrow]' dtype
+_STRING_DTYPE = 'string[pyarrow]' if find_spec('pyarrow') else None
+
+_BUILDERS = {}
+
+
+def dataset(name):
+    """Decorator registering a zero-argument builder under `name`."""
+    def _register(builder):
+        _BUILDERS[name] = builder
+        return builder
+    return _register
+
+
+def _to_arrow_strings(df):
+    if _STRING_DTYPE is None:
+        return df
+    obj_cols = [c for c in df.columns if df[c].dtype == object]
+    if not obj_cols:
+        return df
+    return df.astype({c: _STRING_DTYPE for c in obj_cols})
+
+
+@st.cache_resource(show_spinner=False)
+def _shared(name):
+    if name not in _BUILDERS:
+        raise KeyError(f"Unknown dataset '{name}'. Registered: {sorted(_BUILDERS)}")
+    df = _BUILDERS[name]()
+    return _to_arrow_strings(df.reset_index(drop=True))
+
+
+def _copy_on_write():
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return bool(pd.get_option('mode.copy_on_write'))
+
+
+def get_dataset(name):
+    """Shallow, copy-on-write view of the shared frame registered as `name`."""
+    if not _copy_on_write():
+        raise RuntimeError("get_dataset() needs pandas copy-on-write: "
+                           "pd.set_option('mode.copy_on_write', True) before loading datasets")
+    return _shared(name).copy(deep=False)
+
+
+def clear():
+    """Drop every shared frame; the next get_dataset() call rebuilds it."""
+    _shared.clear()
+
+
+def memory_report():
+    """Rows, columns and in-memory bytes per registered dataset (builds any not yet loaded)."""
+    rows = []
+    for name in sorted(_BUILDERS):
+        df = _shared(name)
+        rows.append({
+            'dataset': name,
+            'rows':    len(df),
+            'columns': df.shape[1],
+            'bytes':   int(df.memory_usage(index=True, deep=True).sum()),
+        })
+    report = pd.DataFrame(rows, columns=['dataset', 'rows', 'columns', 'bytes'])
+    report['MB'] = (report['bytes'] / 1e6).round(3)
+    return report
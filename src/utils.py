@@ -2,8 +2,13 @@ import os
 import streamlit as st
 import pandas as pd
 
+from data_store import read_table
+from metrics_snapshot import load_or_build as load_metrics_snapshot
+from registry import dataset, get_dataset
+
 DATA_DIR   = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
 MODELS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'models')
+BACKTEST_DIR = os.path.join(MODELS_DIR, 'backtest')
 
 FORECAST_COUNTRY_NAMES = {
     'AFG': 'Afghanistan', 'AGO': 'Angola', 'BDI': 'Burundi',
@@ -112,66 +117,95 @@ def _chart_layout(**overrides):
 
 
 # ── Data loaders ───────────────────────────────────────────────────────────────
+# Each dataset is built once per process by the registry (registry.py); the
+# public load_* functions hand out cheap copy-on-write views of it.
 
-@st.cache_data
-def load_country_metrics():
-    path = os.path.join(DATA_DIR, 'humanitarian_analysis_country_metrics.csv')
-    df = pd.read_csv(path)
-    df = df.dropna(subset=['Population', 'In Need', 'revisedRequirements'])
-    df = df[df['Population'] > 0]
-    df = df[df['In Need'] > 0]
-    df['Country Name'] = df['Country ISO3'].map(ISO3_TO_NAME).fillna(df['Country ISO3'])
-    df['Need Prevalence'] = df['In Need'] / df['Population']
-    df['Budget per PIN'] = df['revisedRequirements'] / df['In Need']
-    mn_np, mx_np = df['Need Prevalence'].min(), df['Need Prevalence'].max()
-    mn_bp, mx_bp = df['Budget per PIN'].min(), df['Budget per PIN'].max()
-    df['Normalized Need Prevalence'] = (df['Need Prevalence'] - mn_np) / (mx_np - mn_np)
-    df['Normalized Budget per PIN'] = (df['Budget per PIN'] - mn_bp) / (mx_bp - mn_bp)
-    df['Mismatch Score'] = df['Normalized Need Prevalence'] - df['Normalized Budget per PIN']
-    q25, q50, q75 = df['Need Prevalence'].quantile([0.25, 0.5, 0.75])
-
-    def _quartile(v):
-        if v <= q25:
-            return 'Low'
-        elif v <= q50:
-            return 'Medium'
-        elif v <= q75:
-            return 'High'
-        return 'Critical'
-
-    df['Severity Quartile'] = df['Need Prevalence'].apply(_quartile)
-    df['Targeting Efficiency'] = df['Targeted'] / df['In Need']
-    return df
+@dataset('country_metrics')
+def _country_metrics():
+    # Derived metrics come precomputed from the gold snapshot (metrics_snapshot.py)
+    return load_metrics_snapshot(ISO3_TO_NAME)
 
 
-@st.cache_data
-def load_forecast_data():
+@dataset('forecast')
+def _forecast_data():
     path = os.path.join(MODELS_DIR, 'forecast_results_2026_2030.csv')
-    df = pd.read_csv(path)
+    df = read_table(path)
     df['iso3'] = df['iso3'].str.strip().str[:3]
     df = df.drop_duplicates(subset=['iso3', 'year'], keep='first')
     df['Country'] = df['iso3'].map(FORECAST_COUNTRY_NAMES).fillna(df['iso3'])
     return df
 
 
-@st.cache_data
-def load_high_risk_data():
+@dataset('high_risk')
+def _high_risk_data():
     path = os.path.join(MODELS_DIR, 'high_neglect_risk_2026_2030.csv')
-    df = pd.read_csv(path)
+    df = read_table(path)
     df['iso3'] = df['iso3'].str.strip().str[:3]
     df = df.drop_duplicates(subset=['iso3', 'year'], keep='first')
     df['Country'] = df['iso3'].map(FORECAST_COUNTRY_NAMES).fillna(df['iso3'])
     return df
 
 
-@st.cache_data
-def load_sector_benchmarking():
+@dataset('sector_benchmarking')
+def _sector_benchmarking():
     path = os.path.join(DATA_DIR, 'humanitarian_analysis_sector_benchmarking.csv')
-    df = pd.read_csv(path)
+    df = read_table(path)
     df['Sector Name'] = df['Cluster'].map(SECTOR_TO_NAME).fillna(df['Cluster'])
     return df
 
 
+def _backtest_table(name):
+    # Written by src/backtest.py; empty until the first backtest run
+    path = os.path.join(BACKTEST_DIR, name)
+    return read_table(path) if os.path.exists(path) else pd.DataFrame()
+
+
+@dataset('backtest_summary')
+def _backtest_summary():
+    return _backtest_table('errors_summary.csv')
+
+
+@dataset('backtest_by_year')
+def _backtest_by_year():
+    return _backtest_table('errors_by_year.csv')
+
+
+@dataset('backtest_by_country')
+def _backtest_by_country():
+    df = _backtest_table('errors_by_country.csv')
+    if not df.empty:
+        df['Country'] = df['iso3'].map(FORECAST_COUNTRY_NAMES).fillna(df['iso3'])
+    return df
+
+
+def load_country_metrics():
+    return get_dataset('country_metrics')
+
+
+def load_forecast_data():
+    return get_dataset('forecast')
+
+
+def load_high_risk_data():
+    return get_dataset('high_risk')
+
+
+def load_sector_benchmarking():
+    return get_dataset('sector_benchmarking')
+
+
+def load_backtest_summary():
+    return get_dataset('backtest_summary')
+
+
+def load_backtest_by_year():
+    return get_dataset('backtest_by_year')
+
+
+def load_backtest_by_country():
+    return get_dataset('backtest_by_country')
+
+
 # ── Shared UI helpers ──────────────────────────────────────────────────────────
 
 def chart_caption(text):